@@ -1,5 +1,6 @@
 from pathlib import Path
 import os
+import tempfile
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -18,6 +19,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "employees.instrumentation.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -29,30 +31,109 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = "employee_mgmt.urls"
 
+TEMPLATE_LOADERS = [
+    "django.template.loaders.filesystem.Loader",
+    "django.template.loaders.app_directories.Loader",
+]
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [ BASE_DIR / "templates" ],
-        "APP_DIRS": True,
         "OPTIONS": {
             "context_processors": [
                 "django.template.context_processors.debug",
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+                "employees.context_processors.notifications",
+                "employees.context_processors.fragment_cache",
             ],
+            # Compiled templates are kept in memory outside development
+            "loaders": TEMPLATE_LOADERS if DEBUG else [("django.template.loaders.cached.Loader", TEMPLATE_LOADERS)],
         },
     },
 ]
 
+# Cache backend: "locmem" (default, per process), "file" or "redis"
+# (EMS_CACHE_LOCATION, e.g. redis://127.0.0.1:6379/1; needs the redis package)
+CACHE_BACKEND = os.environ.get("EMS_CACHE_BACKEND", "locmem")
+if CACHE_BACKEND == "redis":
+    CACHES = {"default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ.get("EMS_CACHE_LOCATION", "redis://127.0.0.1:6379/1"),
+    }}
+elif CACHE_BACKEND == "file":
+    CACHES = {"default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get("EMS_CACHE_LOCATION", os.path.join(tempfile.gettempdir(), "ems-cache")),
+    }}
+else:
+    CACHES = {"default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "ems",
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    }}
+
+# Seconds cached page fragments (sidebar, department list, directory pages) live
+FRAGMENT_CACHE_TIMEOUT = 600
+
 WSGI_APPLICATION = "employee_mgmt.wsgi.application"
 
-DATABASES = {
-    "default": {
+# EMS_DB_ENGINE picks SQLite (default) or PostgreSQL; EMS_DB_PROFILE=production
+# tunes either for many concurrent writers
+DB_ENGINE = os.environ.get("EMS_DB_ENGINE", "sqlite")
+DB_PROFILE = os.environ.get("EMS_DB_PROFILE", "development")
+if DB_ENGINE == "postgres":
+    DATABASES = {"default": {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": os.environ.get("EMS_DB_NAME", "ems"),
+        "USER": os.environ.get("EMS_DB_USER", "ems"),
+        "PASSWORD": os.environ.get("EMS_DB_PASSWORD", ""),
+        "HOST": os.environ.get("EMS_DB_HOST", "127.0.0.1"),
+        "PORT": os.environ.get("EMS_DB_PORT", "5432"),
+        "OPTIONS": {},
+    }}
+    if DB_PROFILE == "production" and os.environ.get("EMS_DB_POOL", "1") == "1":
+        # Needs psycopg[pool]; Django refuses CONN_MAX_AGE together with a pool
+        pool = {
+            "min_size": int(os.environ.get("EMS_DB_POOL_MIN", 2)),
+            "max_size": int(os.environ.get("EMS_DB_POOL_MAX", 10)),
+            "timeout": 10,
+            "max_idle": 300,
+        }
+        try:
+            from psycopg_pool import ConnectionPool
+        except ImportError:
+            pass
+        else:
+            # Ping each connection as it leaves the pool so a restarted server is survived
+            pool["check"] = ConnectionPool.check_connection
+        DATABASES["default"]["OPTIONS"]["pool"] = pool
+    elif DB_PROFILE == "production":
+        DATABASES["default"]["CONN_MAX_AGE"] = int(os.environ.get("EMS_DB_CONN_MAX_AGE", 600))
+        DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+else:
+    DATABASES = {"default": {
         "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
-    }
-}
+        "NAME": os.environ.get("EMS_DB_NAME", BASE_DIR / "db.sqlite3"),
+    }}
+    if DB_PROFILE == "production":
+        DATABASES["default"]["OPTIONS"] = {
+            # Wait up to 20s for the write lock instead of failing with "database is locked"
+            "timeout": 20,
+            # Take the write lock when the transaction starts, so a reader never has to
+            # upgrade to a writer mid-transaction (which fails without waiting)
+            "transaction_mode": "IMMEDIATE",
+            # WAL lets readers run alongside the writer; NORMAL syncs only at checkpoints
+            "init_command": (
+                "PRAGMA journal_mode=WAL;"
+                "PRAGMA synchronous=NORMAL;"
+                "PRAGMA mmap_size=268435456;"
+                "PRAGMA cache_size=-65536;"
+                "PRAGMA temp_store=MEMORY"
+            ),
+        }
 
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
@@ -70,6 +151,9 @@ STATIC_URL = "/static/"
 STATICFILES_DIRS = [ BASE_DIR / "static" ]
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
+# Generated exports hold salaries, so they live outside MEDIA_ROOT and are only
+# served through the permission-checked export_job_download view
+EXPORT_ROOT = os.environ.get("EMS_EXPORT_ROOT", BASE_DIR / "private" / "exports")
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -77,3 +161,98 @@ LOGIN_URL = "/login/"
 LOGIN_REDIRECT_URL = "/"
 
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
+
+# Threads delivering notification emails in the background
+NOTIFICATION_EMAIL_WORKERS = int(os.environ.get("EMS_NOTIFICATION_EMAIL_WORKERS", 4))
+
+# Uploaded photos are downscaled to fit PHOTO_MAX_SIZE pixels and re-encoded as JPEG by
+# PHOTO_WORKERS background threads; lists and dashboards show PHOTO_THUMBNAIL_SIZE square crops
+PHOTO_MAX_SIZE = 800
+PHOTO_THUMBNAIL_SIZE = 96
+PHOTO_JPEG_QUALITY = 85
+PHOTO_WORKERS = int(os.environ.get("EMS_PHOTO_WORKERS", 2))
+
+# Background exports (python manage.py run_export_worker)
+EXPORT_WORKERS = int(os.environ.get("EMS_EXPORT_WORKERS", 2))
+EXPORT_JOB_STALE_MINUTES = 60
+
+# Processes used to render large salary PDFs
+PDF_RENDER_WORKERS = int(os.environ.get("EMS_PDF_RENDER_WORKERS", os.cpu_count() or 1))
+
+# Seconds a user's group names stay cached (cleared whenever their groups change).
+# Only used with a shared "file" or "redis" cache; with locmem they are loaded once per request
+ROLE_CACHE_TIMEOUT = 300
+
+# Seconds a user's unread notification count stays cached (cleared on every change).
+# Only used with a shared "file" or "redis" cache, like ROLE_CACHE_TIMEOUT
+NOTIFICATION_CACHE_TIMEOUT = 300
+
+# Leave days each employee may take per calendar year
+LEAVE_ANNUAL_ALLOWANCE = 24
+
+# Processes used to hash passwords supplied in bulk employee imports
+PASSWORD_HASH_WORKERS = int(os.environ.get("EMS_PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
+
+# Requests kept for the per-view percentiles at /admin/metrics/
+REQUEST_METRICS_BUFFER = 1000
+
+# Rows per page of the JSON API at /api/v1/ (clients may ask for up to API_MAX_PAGE_SIZE with ?limit=)
+API_PAGE_SIZE = 500
+API_MAX_PAGE_SIZE = 5000
+# Most items accepted by one bulk POST to the JSON API
+API_MAX_BATCH = 5000
+
+# Seconds a change log entry waits before /api/v1/changes/ and stream_changes serve it,
+# so entries from transactions still committing are not skipped
+CHANGE_FEED_LAG = 5
+
+# Most SQL queries each view may run; python manage.py check_query_budgets enforces them
+# (measured with caching disabled; POST-only endpoints are measured on a bulk POST)
+QUERY_BUDGETS = {
+    "home": 5,
+    "login": 5,
+    "logout": 6,
+    "accept_invite": 6,
+    "no_permission": 6,
+    "admin_dashboard": 9,
+    "department_list": 8,
+    "department_create": 7,
+    "department_update": 8,
+    "department_delete": 7,
+    "request_metrics": 4,
+    "manager_list": 8,
+    "manager_create": 6,
+    "manager_dashboard": 11,
+    "employee_dashboard": 14,
+    "employee_profile_edit": 7,
+    "employee_list": 8,
+    "employee_lookup": 4,
+    "employee_import": 6,
+    "employee_create": 7,
+    "employee_update": 8,
+    "employee_delete": 8,
+    "manager_employee_create": 8,
+    "mark_attendance": 11,
+    "bulk_attendance": 9,
+    "bulk_attendance_api": 14,
+    "process_salary": 11,
+    "approve_leave": 22,
+    "leave_queue": 7,
+    "leave_decisions_api": 36,
+    "apply_leave": 8,
+    "export_attendance_csv": 4,
+    "export_salary_excel": 5,
+    "export_salary_pdf": 6,
+    "export_jobs": 9,
+    "export_job_status": 5,
+    "export_job_download": 5,
+    "attendance_matrix": 7,
+    "attendance_events": 8,
+    "notifications": 7,
+    "send_announcement": 8,
+    "mark_all_notifications_read": 10,
+    "mark_notification_read": 6,
+    "api_collection": 5,
+    "api_item": 5,
+    "api_changes": 5,
+}
@@ -1,12 +1,15 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from employees.views import serve_photo
+
 urlpatterns = [
     path("admin-site/", admin.site.urls),
     path("", include("employees.urls")),
 ]
 
 if settings.DEBUG:
+    urlpatterns += [re_path(rf"^{settings.MEDIA_URL.lstrip('/')}(?P<path>photos/.+)$", serve_photo)]
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
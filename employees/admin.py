@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Department, EmployeeProfile, Attendance, Leave, Salary, Notification
+from .models import Department, EmployeeProfile, Attendance, Leave, Salary, Notification, ExportJob, SalaryTemplate, PayrollRun, LeaveBalance, ApiToken, ChangeLogEntry
 
 @admin.register(Department)
 class DepartmentAdmin(admin.ModelAdmin):
@@ -13,3 +13,34 @@ admin.site.register(Attendance)
 admin.site.register(Leave)
 admin.site.register(Salary)
 admin.site.register(Notification)
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "status", "progress", "requested_by", "created")
+    list_filter = ("kind", "status")
+
+@admin.register(SalaryTemplate)
+class SalaryTemplateAdmin(admin.ModelAdmin):
+    list_display = ("employee", "base_salary", "bonus", "deductions")
+    raw_id_fields = ("employee",)
+
+@admin.register(PayrollRun)
+class PayrollRunAdmin(admin.ModelAdmin):
+    list_display = ("id", "month", "department", "status", "processed", "created_rows", "skipped_rows", "created")
+    list_filter = ("status", "month")
+
+@admin.register(LeaveBalance)
+class LeaveBalanceAdmin(admin.ModelAdmin):
+    list_display = ("employee", "year", "allowance", "used", "pending")
+    list_filter = ("year",)
+    raw_id_fields = ("employee",)
+
+@admin.register(ApiToken)
+class ApiTokenAdmin(admin.ModelAdmin):
+    list_display = ("name", "user", "created", "last_used")
+    readonly_fields = ("key_digest", "created", "last_used")
+
+@admin.register(ChangeLogEntry)
+class ChangeLogEntryAdmin(admin.ModelAdmin):
+    list_display = ("seq", "model", "object_id", "action", "changed")
+    list_filter = ("model", "action")
@@ -0,0 +1,576 @@
+"""JSON API for integrations, served under /api/v1/<resource>/.
+
+Lists use keyset pagination (``after``/``before`` cursors, ``limit``),
+sparse fieldsets (``fields=id,status``) and incremental sync
+(``updated_since=<ISO datetime>`` walks the indexed ``(updated, id)`` pair).
+Rows are read with ``values()``, and writes go through the same bulk helpers
+as the web views, so no forms or model instances are built per row.
+
+Clients authenticate with a session (writes then need the CSRF token) or an
+``Authorization: Bearer <key>`` header holding a key from ``create_api_token``.
+Deletes are not reported by ``updated_since``; /api/v1/changes/ serves the
+change log from employees/changelog.py, which includes them.
+"""
+import hashlib
+import json
+import secrets
+from datetime import datetime, time, timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+from django.http import JsonResponse
+from django.middleware.csrf import CsrfViewMiddleware
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .attendance import allowed_employee_pks, parse_attendance_payload, upsert_attendance
+from .changelog import TRACKED, log_saved, read_changes
+from .decorators import in_groups
+from .leaves import apply_for_leave, decide_leaves, pending_leaves_for
+from .metrics import mark_employee_months
+from .models import ApiToken, Attendance, Department, EmployeeProfile, Leave, Notification, Salary
+from .notifications import mark_read, notify_many
+from .onboarding import EmployeeImporter
+from .pagination import InvalidCursor, keyset_page
+from .payroll import month_bounds
+from .roles import user_has_role
+from .search import filter_profiles
+
+TOKEN_TOUCH_INTERVAL = timedelta(minutes=5)
+ALL_ROLES = ("Admin", "Manager", "Employee")
+STAFF = ("Admin", "Manager")
+
+
+class ApiError(Exception):
+    def __init__(self, status, message, **extra):
+        super().__init__(message)
+        self.status = status
+        self.payload = {"error": message, **extra}
+
+
+def _digest(key):
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def issue_token(user, name):
+    """Create a token for ``user`` and return its key, which is not stored and cannot be shown again."""
+    key = secrets.token_urlsafe(32)
+    ApiToken.objects.create(user=user, name=name, key_digest=_digest(key))
+    return key
+
+
+def authenticate(request):
+    header = request.headers.get("Authorization", "")
+    if header.startswith("Bearer "):
+        token = ApiToken.objects.select_related("user").filter(key_digest=_digest(header[7:].strip())).first()
+        if token is None or not token.user.is_active:
+            raise ApiError(401, "Invalid API token")
+        now = timezone.now()
+        if token.last_used is None or now - token.last_used > TOKEN_TOUCH_INTERVAL:
+            ApiToken.objects.filter(pk=token.pk).update(last_used=now)
+        request.user = token.user
+        return
+    if not request.user.is_authenticated:
+        raise ApiError(401, "Authentication required")
+    if request.method not in ("GET", "HEAD", "OPTIONS"):
+        # Session clients get the same CSRF protection as the HTML views
+        if CsrfViewMiddleware(lambda r: None).process_view(request, None, (), {}) is not None:
+            raise ApiError(403, "CSRF token missing or incorrect")
+
+
+def require(user, groups):
+    if not in_groups(user, groups):
+        raise ApiError(403, "You do not have permission to do this")
+
+
+def read_json(request):
+    try:
+        return json.loads(request.body)
+    except ValueError:
+        raise ApiError(400, "Invalid JSON")
+
+
+def read_items(request):
+    payload = read_json(request)
+    items = payload.get("items") if isinstance(payload, dict) else payload
+    if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+        raise ApiError(400, 'Expected a list of objects (or {"items": [...]})')
+    if len(items) > settings.API_MAX_BATCH:
+        raise ApiError(400, f"At most {settings.API_MAX_BATCH} items per request")
+    return items
+
+
+def parse_since(value):
+    moment = parse_datetime(value)
+    if moment is None:
+        try:
+            day = parse_date(value)
+        except ValueError:
+            day = None
+        if day is None:
+            raise ApiError(400, "updated_since must be an ISO date or datetime")
+        moment = datetime.combine(day, time())
+    return timezone.make_aware(moment) if timezone.is_naive(moment) else moment
+
+
+def as_bool(value):
+    if value.lower() in ("1", "true", "yes"):
+        return True
+    if value.lower() in ("0", "false", "no"):
+        return False
+    raise ValueError(value)
+
+
+def resolve_employees(items):
+    """Profile pks for items naming an ``employee`` (pk) or ``employee_id`` (e.g. "EMP0001")."""
+    codes = {item["employee_id"] for item in items if isinstance(item.get("employee_id"), str)}
+    pk_by_code = dict(EmployeeProfile.objects.filter(employee_id__in=codes).values_list("employee_id", "pk"))
+    return [
+        item["employee"] if type(item.get("employee")) is int else pk_by_code.get(item.get("employee_id"))
+        for item in items
+    ]
+
+
+class Resource:
+    model = None
+    # Public name -> ORM lookup read with values()
+    fields = {}
+    # Query parameter -> (ORM lookup, parser)
+    filters = {}
+    # Lookup from the model to its EmployeeProfile ("" for profiles themselves);
+    # None means every role reads every row
+    employee_path = None
+
+    def queryset(self, user):
+        qs = self.model.objects.all()
+        if self.employee_path is None or in_groups(user, ("Admin",)):
+            return qs
+        prefix = f"{self.employee_path}__" if self.employee_path else ""
+        visible = Q(**{f"{prefix}user": user})
+        department = getattr(user, "managed_department", None) if user_has_role(user, "Manager") else None
+        if department:
+            visible |= Q(**{f"{prefix}department": department})
+        return qs.filter(visible)
+
+    def filter(self, qs, params):
+        for name, (lookup, parse) in self.filters.items():
+            if name in params:
+                try:
+                    qs = qs.filter(**{lookup: parse(params[name])})
+                except (TypeError, ValueError):
+                    raise ApiError(400, f"Invalid value for {name}")
+        return qs
+
+    def create(self, request, items):
+        raise ApiError(405, "This resource cannot be created through the API")
+
+    def update(self, request, pk, data):
+        raise ApiError(405, "This resource cannot be changed through the API")
+
+
+class EmployeeResource(Resource):
+    model = EmployeeProfile
+    employee_path = ""
+    fields = {
+        "id": "id", "employee_id": "employee_id", "username": "user__username",
+        "first_name": "user__first_name", "last_name": "user__last_name", "email": "user__email",
+        "department": "department_id", "designation": "designation", "phone": "phone",
+        "join_date": "join_date", "updated": "updated",
+    }
+    filters = {"department": ("department_id", int), "designation": ("designation", str)}
+    profile_fields = {"department": "department_id", "designation": "designation", "phone": "phone", "join_date": "join_date"}
+    user_fields = ("first_name", "last_name", "email")
+    # JSON type each field must arrive as (str when not listed); None is left to full_clean
+    value_types = {"department": int}
+
+    def filter(self, qs, params):
+        return filter_profiles(super().filter(qs, params), params.get("q"))
+
+    def create(self, request, items):
+        require(request.user, ("Admin",))
+        rows = [
+            (index, {key: "" if value is None else str(value) for key, value in item.items()})
+            for index, item in enumerate(items)
+        ]
+        result = EmployeeImporter(base_url=request.build_absolute_uri("/")).run(rows)
+        for entry in result.report:
+            entry["index"] = entry.pop("line")
+        status = 200 if result.created or not result.failed else 400
+        return {"created": result.created, "failed": result.failed, "results": result.report}, status
+
+    def update(self, request, pk, data):
+        require(request.user, ("Admin",))
+        profile = EmployeeProfile.objects.select_related("user").filter(pk=pk).first()
+        if profile is None:
+            raise ApiError(404, "Not found")
+        unknown = set(data) - set(self.profile_fields) - set(self.user_fields)
+        if unknown:
+            raise ApiError(400, f"Cannot change {', '.join(sorted(unknown))}")
+        for key, value in data.items():
+            if value is not None and type(value) is not self.value_types.get(key, str):
+                raise ApiError(400, f"Invalid value for {key}")
+            if key in self.profile_fields:
+                setattr(profile, self.profile_fields[key], value)
+            else:
+                setattr(profile.user, key, value)
+        try:
+            profile.full_clean(exclude=["user", "photo"])
+            profile.user.full_clean(exclude=["password"])
+        except ValidationError as exc:
+            raise ApiError(400, "Invalid data", errors=exc.message_dict)
+        with transaction.atomic():
+            if set(data) & set(self.user_fields):
+                profile.user.save(update_fields=[key for key in self.user_fields if key in data])
+            profile.save()
+        return None, 200
+
+
+class DepartmentResource(Resource):
+    model = Department
+    fields = {"id": "id", "name": "name", "manager": "manager_id", "updated": "updated"}
+
+    def save(self, department, data):
+        unknown = set(data) - {"name", "manager"}
+        if unknown:
+            raise ValidationError({key: "Unknown field" for key in unknown})
+        if "name" in data:
+            department.name = data["name"]
+        if "manager" in data:
+            department.manager_id = data["manager"]
+        department.full_clean()
+        department.save()
+        return department
+
+    def create(self, request, items):
+        require(request.user, ("Admin",))
+        created, errors = [], []
+        for index, item in enumerate(items):
+            try:
+                with transaction.atomic():
+                    created.append(self.save(Department(), item).pk)
+            except ValidationError as exc:
+                errors.append({"index": index, "error": exc.message_dict})
+        return {"created": created, "errors": errors}, 200 if created or not errors else 400
+
+    def update(self, request, pk, data):
+        require(request.user, ("Admin",))
+        department = Department.objects.filter(pk=pk).first()
+        if department is None:
+            raise ApiError(404, "Not found")
+        try:
+            self.save(department, data)
+        except ValidationError as exc:
+            raise ApiError(400, "Invalid data", errors=exc.message_dict)
+        return None, 200
+
+
+class AttendanceResource(Resource):
+    model = Attendance
+    employee_path = "employee"
+    fields = {"id": "id", "employee": "employee_id", "date": "date", "status": "status", "note": "note", "updated": "updated"}
+    filters = {
+        "employee": ("employee_id", int),
+        "department": ("employee__department_id", int),
+        "status": ("status", str),
+        "date_from": ("date__gte", parse_date),
+        "date_to": ("date__lte", parse_date),
+    }
+
+    def create(self, request, items):
+        require(request.user, STAFF)
+        return save_attendance(request.user, items)
+
+
+def save_attendance(user, payload):
+    """Upsert the punches in ``payload`` for the employees ``user`` may mark; returns (data, status)."""
+    records, errors = parse_attendance_payload(payload)
+    allowed = allowed_employee_pks(user, {record[0] for record in records})
+    accepted = []
+    for record in records:
+        if record[0] in allowed:
+            accepted.append(record)
+        else:
+            errors.append({"employee": record[0], "error": "Not allowed for this employee"})
+    saved = upsert_attendance(accepted) if accepted else 0
+    return {"saved": saved, "errors": errors}, 200 if saved or not errors else 400
+
+
+class LeaveResource(Resource):
+    model = Leave
+    employee_path = "employee"
+    fields = {
+        "id": "id", "employee": "employee_id", "start_date": "start_date", "end_date": "end_date",
+        "reason": "reason", "status": "status", "applied_on": "applied_on", "updated": "updated",
+    }
+    filters = {
+        "employee": ("employee_id", int),
+        "department": ("employee__department_id", int),
+        "status": ("status", str),
+    }
+
+    def create(self, request, items):
+        require(request.user, ALL_ROLES)
+        own = EmployeeProfile.objects.filter(user=request.user).first()
+        pks = resolve_employees(items)
+        requested = {pk for pk in pks if pk is not None}
+        allowed = allowed_employee_pks(request.user, requested) if requested and in_groups(request.user, STAFF) else set()
+        if own:
+            allowed.add(own.pk)
+        profiles = EmployeeProfile.objects.in_bulk(allowed)
+        created, errors = [], []
+        for index, (item, pk) in enumerate(zip(items, pks)):
+            named = "employee" in item or "employee_id" in item
+            employee = profiles.get(pk) if named else own
+            if employee is None:
+                errors.append({"index": index, "error": "Not allowed for this employee"})
+                continue
+            try:
+                start, end = parse_date(str(item.get("start_date"))), parse_date(str(item.get("end_date")))
+            except ValueError:
+                start = end = None
+            if start is None or end is None:
+                errors.append({"index": index, "error": "start_date and end_date must look like YYYY-MM-DD"})
+                continue
+            try:
+                created.append(apply_for_leave(employee, start, end, str(item.get("reason", ""))).pk)
+            except ValidationError as exc:
+                errors.append({"index": index, "error": " ".join(exc.messages)})
+        return {"created": created, "errors": errors}, 200 if created or not errors else 400
+
+    def update(self, request, pk, data):
+        require(request.user, STAFF)
+        if set(data) != {"status"} or data["status"] not in ("Approved", "Rejected"):
+            raise ApiError(400, 'Only {"status": "Approved" | "Rejected"} can be changed')
+        if not pending_leaves_for(request.user).filter(pk=pk).exists():
+            raise ApiError(409, "Not a pending leave you can decide")
+        decide_leaves([pk], data["status"])
+        return None, 200
+
+
+class SalaryResource(Resource):
+    model = Salary
+    employee_path = "employee"
+    fields = {
+        "id": "id", "employee": "employee_id", "month": "month", "base_salary": "base_salary",
+        "bonus": "bonus", "deductions": "deductions", "total_salary": "total_salary", "updated": "updated",
+    }
+    filters = {
+        "employee": ("employee_id", int),
+        "department": ("employee__department_id", int),
+        "month": ("month", str),
+    }
+    # DecimalField(max_digits=10, decimal_places=2)
+    amount_limit = Decimal("99999999.99")
+
+    def amount(self, value):
+        amount = Decimal(str(value)).quantize(Decimal("0.01"))
+        if not amount.is_finite() or not 0 <= amount <= self.amount_limit:
+            raise InvalidOperation
+        return amount
+
+    def create(self, request, items):
+        require(request.user, STAFF)
+        pks = resolve_employees(items)
+        allowed = allowed_employee_pks(request.user, {pk for pk in pks if pk is not None})
+        rows, errors = {}, []
+        for index, (item, pk) in enumerate(zip(items, pks)):
+            if pk not in allowed:
+                errors.append({"index": index, "error": "Unknown employee or not allowed for this employee"})
+                continue
+            try:
+                month_bounds(item.get("month"))
+                base = self.amount(item.get("base_salary"))
+                bonus = self.amount(item.get("bonus", 0))
+                deductions = self.amount(item.get("deductions", 0))
+            except ValueError as exc:
+                errors.append({"index": index, "error": str(exc)})
+                continue
+            except (InvalidOperation, TypeError):
+                errors.append({"index": index, "error": "Amounts must be numbers between 0 and 99999999.99"})
+                continue
+            # Last write wins for repeated (employee, month) pairs
+            rows[pk, item["month"]] = Salary(
+                employee_id=pk, month=item["month"], base_salary=base, bonus=bonus, deductions=deductions,
+                total_salary=Salary.compute_total(base, bonus, deductions),
+            )
+        with transaction.atomic():
+            Salary.objects.bulk_create(
+                rows.values(),
+                batch_size=1000,
+                update_conflicts=True,
+                unique_fields=["employee", "month"],
+                update_fields=["base_salary", "bonus", "deductions", "total_salary", "updated"],
+            )
+            log_saved(rows.values())
+            mark_employee_months(rows)
+        return {"saved": len(rows), "errors": errors}, 200 if rows or not errors else 400
+
+
+class NotificationResource(Resource):
+    model = Notification
+    fields = {
+        "id": "id", "user": "user_id", "title": "title", "message": "message",
+        "created": "created", "read": "read", "updated": "updated",
+    }
+    filters = {"read": ("read", as_bool), "user": ("user_id", int)}
+
+    def queryset(self, user):
+        qs = Notification.objects.all()
+        return qs if in_groups(user, ("Admin",)) else qs.filter(user=user)
+
+    def create(self, request, items):
+        require(request.user, ("Admin",))
+        user_ids = {item.get("user") for item in items}
+        # type() rather than isinstance(): JSON true/false would otherwise pass as users 1 and 0
+        known = set(User.objects.filter(pk__in=[pk for pk in user_ids if type(pk) is int]).values_list("pk", flat=True))
+        accepted, errors = [], []
+        for index, item in enumerate(items):
+            title, message = str(item.get("title", "")).strip(), str(item.get("message", "")).strip()
+            if type(item.get("user")) is not int or item["user"] not in known:
+                errors.append({"index": index, "error": "Unknown user"})
+            elif not title or not message or len(title) > 200:
+                errors.append({"index": index, "error": "title (up to 200 characters) and message are required"})
+            else:
+                accepted.append((item["user"], title, message))
+        created = notify_many(accepted)
+        return {"created": created, "errors": errors}, 200 if created or not errors else 400
+
+    def update(self, request, pk, data):
+        if data != {"read": True}:
+            raise ApiError(400, 'Only {"read": true} is supported')
+        if not Notification.objects.filter(pk=pk, user=request.user).exists():
+            raise ApiError(404, "Not found")
+        mark_read(request.user, pk)
+        return None, 200
+
+
+RESOURCES = {
+    "employees": EmployeeResource(),
+    "departments": DepartmentResource(),
+    "attendance": AttendanceResource(),
+    "leaves": LeaveResource(),
+    "salaries": SalaryResource(),
+    "notifications": NotificationResource(),
+}
+
+
+def selected_fields(resource, param):
+    if not param:
+        return resource.fields
+    names = [name.strip() for name in param.split(",") if name.strip()]
+    unknown = [name for name in names if name not in resource.fields]
+    if unknown:
+        raise ApiError(400, f"Unknown fields: {', '.join(unknown)}", available=list(resource.fields))
+    return {name: resource.fields[name] for name in ["id"] + [n for n in names if n != "id"]}
+
+
+def list_rows(request, resource):
+    params = request.GET
+    fields = selected_fields(resource, params.get("fields"))
+    qs = resource.filter(resource.queryset(request.user), params)
+    order = ["id"]
+    if params.get("updated_since"):
+        qs = qs.filter(updated__gte=parse_since(params["updated_since"]))
+        order = ["updated", "id"]
+    try:
+        size = min(max(int(params.get("limit", settings.API_PAGE_SIZE)), 1), settings.API_MAX_PAGE_SIZE)
+    except ValueError:
+        raise ApiError(400, "limit must be a number")
+    lookups = set(fields.values()) | set(order)
+    try:
+        page = keyset_page(
+            qs.values(*lookups), order, after=params.get("after"), before=params.get("before"), size=size, strict=True,
+        )
+    except InvalidCursor as exc:
+        raise ApiError(400, str(exc))
+    data = {
+        "results": [{name: row[lookup] for name, lookup in fields.items()} for row in page],
+        "next_cursor": page.next_cursor,
+        "previous_cursor": page.previous_cursor,
+    }
+    if page.next_cursor:
+        query = params.copy()
+        query.pop("before", None)
+        query["after"] = page.next_cursor
+        data["next"] = request.build_absolute_uri(f"{request.path}?{query.urlencode()}")
+    return data
+
+
+def get_row(request, resource, pk):
+    fields = selected_fields(resource, request.GET.get("fields"))
+    row = resource.queryset(request.user).filter(pk=pk).values(*set(fields.values())).first()
+    if row is None:
+        raise ApiError(404, "Not found")
+    return {name: row[lookup] for name, lookup in fields.items()}
+
+
+def change_feed(request):
+    """Serve /api/v1/changes/?since=<seq>&models=attendance,salary (admins only)."""
+    try:
+        authenticate(request)
+        require(request.user, ("Admin",))
+        if request.method != "GET":
+            raise ApiError(405, f"{request.method} is not supported here")
+        try:
+            since = int(request.GET.get("since", 0))
+            size = min(max(int(request.GET.get("limit", settings.API_PAGE_SIZE)), 1), settings.API_MAX_PAGE_SIZE)
+        except ValueError:
+            raise ApiError(400, "since and limit must be numbers")
+        models = [name.strip() for name in request.GET.get("models", "").split(",") if name.strip()]
+        unknown = [name for name in models if name not in TRACKED]
+        if unknown:
+            raise ApiError(400, f"Unknown models: {', '.join(unknown)}", available=list(TRACKED))
+        changes = read_changes(since, models, size)
+        checkpoint = changes[-1]["seq"] if changes else since
+        query = request.GET.copy()
+        query["since"] = checkpoint
+        return JsonResponse({
+            "results": changes,
+            "checkpoint": checkpoint,
+            "next": request.build_absolute_uri(f"{request.path}?{query.urlencode()}"),
+        })
+    except ApiError as exc:
+        return JsonResponse(exc.payload, status=exc.status)
+
+
+def bulk_attendance(request):
+    """Serve the kiosk endpoint /api/attendance/bulk/ (managers), with the API's token or session auth."""
+    try:
+        authenticate(request)
+        require(request.user, ("Manager",))
+        if request.method != "POST":
+            raise ApiError(405, f"{request.method} is not supported here")
+        data, status = save_attendance(request.user, read_json(request))
+        return JsonResponse(data, status=status)
+    except ApiError as exc:
+        return JsonResponse(exc.payload, status=exc.status)
+
+
+def dispatch(request, name, pk=None):
+    """Serve one API request; ``pk`` is None for the collection URL."""
+    try:
+        resource = RESOURCES.get(name)
+        if resource is None:
+            raise ApiError(404, f"Unknown resource {name!r}", resources=sorted(RESOURCES))
+        authenticate(request)
+        require(request.user, ALL_ROLES)
+        if pk is None and request.method == "GET":
+            return JsonResponse(list_rows(request, resource))
+        if pk is None and request.method == "POST":
+            data, status = resource.create(request, read_items(request))
+            return JsonResponse(data, status=status)
+        if pk is not None and request.method == "GET":
+            return JsonResponse(get_row(request, resource, pk))
+        if pk is not None and request.method == "PATCH":
+            data = read_json(request)
+            if not isinstance(data, dict):
+                raise ApiError(400, "Expected an object")
+            resource.update(request, pk, data)
+            return JsonResponse(get_row(request, resource, pk))
+        raise ApiError(405, f"{request.method} is not supported here")
+    except ApiError as exc:
+        return JsonResponse(exc.payload, status=exc.status)
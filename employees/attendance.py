@@ -0,0 +1,86 @@
+from django.utils.dateparse import parse_date
+
+from .changelog import log_saved
+from .decorators import in_groups
+from .metrics import mark_employee_months, month_key
+from .models import Attendance, EmployeeProfile
+
+ATTENDANCE_BATCH_SIZE = 1000
+ATTENDANCE_STATUSES = {value for value, _ in Attendance.STATUS_CHOICES}
+
+
+def upsert_attendance(records, batch_size=ATTENDANCE_BATCH_SIZE):
+    """Insert or overwrite (employee, date) rows with one statement per batch.
+
+    ``records`` are (employee_pk, date, status, note) tuples.
+    """
+    # Last write wins for repeated (employee, date) pairs; PostgreSQL rejects
+    # an upsert that touches the same row twice
+    latest = {(employee_pk, date): (status, note) for employee_pk, date, status, note in records}
+    rows = [
+        Attendance(employee_id=employee_pk, date=date, status=status, note=note)
+        for (employee_pk, date), (status, note) in latest.items()
+    ]
+    Attendance.objects.bulk_create(
+        rows,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=["employee", "date"],
+        update_fields=["status", "note", "updated"],
+    )
+    log_saved(rows)
+    mark_employee_months({(employee_pk, month_key(date)) for employee_pk, date in latest})
+    return len(rows)
+
+
+def allowed_employee_pks(user, pks):
+    """The profiles among ``pks`` that ``user`` may write: all for admins, their own department's for managers."""
+    qs = EmployeeProfile.objects.filter(pk__in=pks)
+    if not in_groups(user, ("Admin",)):
+        department = getattr(user, "managed_department", None)
+        if department is None:
+            # Without this, a manager with no department would match every unassigned employee
+            return set()
+        qs = qs.filter(department=department)
+    return set(qs.values_list("pk", flat=True))
+
+
+def parse_attendance_payload(payload):
+    """Validate kiosk/biometric punches.
+
+    Accepts ``{"date": ..., "records": [...]}`` or a bare list. Each record has
+    ``employee`` (profile pk) or ``employee_id`` (e.g. "EMP0001"), ``status``,
+    and optionally ``date`` and ``note``. Returns (records, errors) where
+    records are (employee_pk, date, status, note) tuples and errors carry the
+    index of the rejected item.
+    """
+    default_date = None
+    if isinstance(payload, dict):
+        default_date = payload.get("date")
+        payload = payload.get("records")
+    if not isinstance(payload, list):
+        return [], [{"index": None, "error": "Expected a list of records"}]
+
+    codes = {item.get("employee_id") for item in payload if isinstance(item, dict) and item.get("employee_id")}
+    pk_by_code = dict(EmployeeProfile.objects.filter(employee_id__in=codes).values_list("employee_id", "pk"))
+
+    records, errors = [], []
+    for index, item in enumerate(payload):
+        if not isinstance(item, dict):
+            errors.append({"index": index, "error": "Record must be an object"})
+            continue
+        employee_pk = item.get("employee") if "employee" in item else pk_by_code.get(item.get("employee_id"))
+        try:
+            date = parse_date(str(item.get("date") or default_date or ""))
+        except ValueError:
+            date = None
+        status = item.get("status", "Present")
+        if not isinstance(employee_pk, int) or isinstance(employee_pk, bool):
+            errors.append({"index": index, "error": "Unknown employee"})
+        elif date is None:
+            errors.append({"index": index, "error": "Invalid or missing date"})
+        elif status not in ATTENDANCE_STATUSES:
+            errors.append({"index": index, "error": f"Invalid status {status!r}"})
+        else:
+            records.append((employee_pk, date, status, str(item.get("note") or "")))
+    return records, errors
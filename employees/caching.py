@@ -0,0 +1,42 @@
+"""Version keys for cached page fragments.
+
+Fragments are cached under a key that includes a version number; bumping
+the version (from model signals) makes every old fragment unreachable
+without having to know which keys exist. The versions are IdSequence rows
+rather than cache entries, so a bump reaches every worker process even
+when each one has its own in-memory cache. A version row is created
+from the current time, so it can never repeat a value that an older
+database left behind in a shared cache.
+"""
+import time
+
+from django.db import transaction
+
+from .models import IdSequence
+from .sequences import next_values
+
+VERSION_PREFIX = "ems:version:"
+DEPARTMENTS = "departments"
+DIRECTORY = "directory"
+
+
+def _fresh():
+    return time.time_ns() // 1000
+
+
+def get_version(name):
+    key = VERSION_PREFIX + name
+    version = IdSequence.objects.filter(name=key).values_list("value", flat=True).first()
+    if version is None:
+        version = next_values(key, initial=_fresh)[-1]
+    return version
+
+
+def _bump(names):
+    for name in names:
+        next_values(VERSION_PREFIX + name, initial=_fresh)
+
+
+def bump_versions(*names):
+    # After commit, so a concurrent request cannot cache pre-commit rows under the new version
+    transaction.on_commit(lambda: _bump(names))
@@ -0,0 +1,123 @@
+import hashlib
+from datetime import timedelta
+
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .metrics import SUMMARY_MONTH, month_key
+from .models import Attendance, Department, DepartmentMetrics, EmployeeProfile
+from .roles import get_user_roles
+
+DEFAULT_WINDOW_DAYS = 42
+MAX_WINDOW_DAYS = 366
+
+
+def parse_window(params):
+    # FullCalendar sends ISO datetimes ("2025-01-26T00:00:00+05:30"); only the date matters
+    today = timezone.localdate()
+    try:
+        start = parse_date((params.get("start") or "")[:10])
+        end = parse_date((params.get("end") or "")[:10])
+    except ValueError:
+        start = end = None
+    end = end or today + timedelta(days=1)
+    start = start or end - timedelta(days=DEFAULT_WINDOW_DAYS)
+    if start >= end:
+        start = end - timedelta(days=1)
+    return max(start, end - timedelta(days=MAX_WINDOW_DAYS)), end
+
+
+class CalendarScope:
+    """Which attendance rows a user may see: everything, one department or one employee."""
+
+    def __init__(self, kind, department_id=None, employee_id=None):
+        self.kind = kind
+        self.department_id = department_id
+        self.employee_id = employee_id
+
+    @classmethod
+    def for_user(cls, user, department_param=None):
+        roles = get_user_roles(user)
+        if user.is_superuser or "Admin" in roles:
+            if department_param and str(department_param).isdigit():
+                return cls("department", department_id=int(department_param))
+            return cls("all")
+        if "Manager" in roles:
+            dept = Department.objects.filter(manager=user).values_list("pk", flat=True).first()
+            if dept:
+                return cls("department", department_id=dept)
+        profile = EmployeeProfile.objects.filter(user=user).values_list("pk", "department_id").first()
+        if profile:
+            return cls("employee", department_id=profile[1], employee_id=profile[0])
+        return cls("none")
+
+    @property
+    def key(self):
+        return f"{self.kind}:{self.department_id}:{self.employee_id}"
+
+    def attendance(self, start, end):
+        qs = Attendance.objects.filter(date__gte=start, date__lt=end)
+        if self.kind == "department":
+            return qs.filter(employee__department_id=self.department_id)
+        if self.kind == "employee":
+            return qs.filter(employee_id=self.employee_id)
+        if self.kind == "none":
+            return qs.none()
+        return qs
+
+    def last_modified(self, start, end):
+        """Latest change to any attendance in the window, read from the metrics rollups.
+
+        DepartmentMetrics rows are rewritten whenever attendance in their
+        department and month changes, so their newest ``updated`` stamp bounds
+        the window's attendance. Employees without a department are not tracked
+        there, so scopes that include them get no validator.
+        """
+        if self.kind == "none" or (self.kind == "employee" and not self.department_id):
+            return None
+        if self.kind == "all" and EmployeeProfile.objects.filter(department__isnull=True).exists():
+            return None
+        months = {month_key(start), month_key(end - timedelta(days=1))}
+        first, last = min(months), max(months)
+        qs = DepartmentMetrics.objects.filter(month__gte=first, month__lte=last).exclude(month=SUMMARY_MONTH)
+        if self.department_id:
+            qs = qs.filter(department_id=self.department_id)
+        return qs.aggregate(latest=Max("updated"))["latest"]
+
+
+def feed_validators(request):
+    """(scope, start, end, etag, last_modified) for the feed, computed once per request."""
+    if not hasattr(request, "_calendar_validators"):
+        start, end = parse_window(request.GET)
+        scope = CalendarScope.for_user(request.user, request.GET.get("department"))
+        last_modified = scope.last_modified(start, end)
+        etag = None
+        if last_modified:
+            raw = f"{scope.key}|{start}|{end}|{request.GET.get('mode', '')}|{last_modified.isoformat()}"
+            etag = hashlib.md5(raw.encode()).hexdigest()
+        request._calendar_validators = (scope, start, end, etag, last_modified)
+    return request._calendar_validators
+
+
+def detail_rows(scope, start, end):
+    return scope.attendance(start, end).order_by().values_list("employee__employee_id", "date", "status")
+
+
+def summary_counts(scope, start, end):
+    return scope.attendance(start, end).order_by("date", "status").values_list("date", "status").annotate(Count("id"))
+
+
+def detail_events(scope, start, end):
+    return [
+        {"title": f"{emp_id} - {status}", "start": day.isoformat(), "allDay": True}
+        for emp_id, day, status in detail_rows(scope, start, end).iterator(chunk_size=2000)
+    ]
+
+
+def summary_events(scope, start, end):
+    counts = summary_counts(scope, start, end)
+    return [
+        {"title": f"{status}: {count}", "start": day.isoformat(), "allDay": True}
+        for day, status, count in counts
+    ]
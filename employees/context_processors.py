@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+
+from .notifications import unread_count
+from .roles import get_user_roles
+
+def notifications(request):
+    # Lazy, so pages that never show the badge never look the count up
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        return {"unread_notifications": 0}
+    return {"unread_notifications": SimpleLazyObject(lambda: unread_count(user))}
+
+def fragment_cache(request):
+    # The sidebar links depend only on the user's roles, so it is cached per role set
+    context = {"fragment_timeout": settings.FRAGMENT_CACHE_TIMEOUT, "sidebar_key": "anonymous"}
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        roles = sorted(get_user_roles(user)) + (["superuser"] if user.is_superuser else [])
+        context["sidebar_key"] = "|".join(roles) or "none"
+    return context
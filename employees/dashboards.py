@@ -0,0 +1,39 @@
+"""Querysets behind the dashboards and the bulk attendance sheet.
+
+The views and check_query_plans both build their queries here, so the plans
+that command checks are the ones the pages actually run.
+"""
+from .metrics import SUMMARY_MONTH
+from .models import Attendance, DepartmentMetrics, EmployeeProfile, Leave, Notification, Salary
+
+
+def recent_notifications(user, limit=5):
+    return Notification.objects.filter(user=user).order_by("-created")[:limit]
+
+
+def department_employees(department):
+    return EmployeeProfile.objects.filter(department=department).select_related("user")
+
+
+def department_monthly_metrics(department):
+    return DepartmentMetrics.objects.filter(department=department).exclude(month=SUMMARY_MONTH)
+
+
+def department_recent_leaves(department, limit=10):
+    return Leave.objects.filter(employee__department=department).select_related("employee").order_by("-applied_on")[:limit]
+
+
+def employee_recent_attendance(profile, limit=30):
+    return Attendance.objects.filter(employee=profile).order_by("-date")[:limit]
+
+
+def employee_recent_salary(profile, limit=12):
+    return Salary.objects.filter(employee=profile).order_by("-month")[:limit]
+
+
+def employee_recent_leaves(profile, limit=10):
+    return Leave.objects.filter(employee=profile).order_by("-applied_on")[:limit]
+
+
+def department_day_attendance(department, day):
+    return Attendance.objects.filter(employee__department=department, date=day)
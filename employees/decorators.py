@@ -1,15 +1,18 @@
 from functools import wraps
 from django.shortcuts import redirect
 
-def group_required(group_name):
+from .roles import user_has_role
+
+def in_groups(user, group_names):
+    return user.is_superuser or any(user_has_role(user, name) for name in group_names)
+
+def group_required(*group_names):
     def decorator(view_func):
         @wraps(view_func)
         def wrapper(request, *args, **kwargs):
             if not request.user.is_authenticated:
                 return redirect("login")
-            if request.user.is_superuser:
-                return view_func(request, *args, **kwargs)
-            if request.user.groups.filter(name=group_name).exists():
+            if in_groups(request.user, group_names):
                 return view_func(request, *args, **kwargs)
             return redirect("no_permission")
         return wrapper
@@ -18,3 +21,4 @@ def group_required(group_name):
 admin_required = group_required("Admin")
 manager_required = group_required("Manager")
 employee_required = group_required("Employee")
+staff_required = group_required("Admin", "Manager")
@@ -0,0 +1,159 @@
+import csv
+import re
+import tempfile
+from itertools import groupby
+from operator import itemgetter
+
+from django.conf import settings
+from django.db.models import Count, F, Sum, Value
+from django.db.models.functions import Concat, Trim
+from openpyxl import Workbook
+
+from .pdf_reports import page_count, paginate, render_report
+
+EXPORT_CHUNK_SIZE = 2000
+CSV_ROWS_PER_CHUNK = 500
+
+# Workbooks smaller than this never touch the disk
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+ATTENDANCE_HEADER = ["EMP ID", "Name", "Date", "Status", "Note"]
+SALARY_HEADER = ["EMP ID", "Name", "Month", "Base", "Bonus", "Deductions", "Total"]
+
+
+class Echo:
+    # csv.writer needs a file; this one hands each line back instead of storing it
+    def write(self, value):
+        return value
+
+
+def full_name(prefix=""):
+    # Same result as User.get_full_name(), computed by the database
+    return Trim(Concat(F(f"{prefix}first_name"), Value(" "), F(f"{prefix}last_name")))
+
+
+def filter_attendance(qs, start=None, end=None, department=None, status=None):
+    if start:
+        qs = qs.filter(date__gte=start)
+    if end:
+        qs = qs.filter(date__lte=end)
+    if department:
+        qs = qs.filter(employee__department=department)
+    if status:
+        qs = qs.filter(status=status)
+    return qs
+
+
+def attendance_values(qs):
+    return qs.annotate(full_name=full_name("employee__user__")).values_list(
+        "employee__employee_id", "full_name", "date", "status", "note",
+    )
+
+
+def attendance_rows(qs):
+    return attendance_values(qs).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def attendance_csv_stream(qs, progress=None):
+    writer = csv.writer(Echo())
+    yield writer.writerow(ATTENDANCE_HEADER)
+    lines = []
+    done = 0
+    for row in attendance_rows(qs):
+        lines.append(writer.writerow(row))
+        if len(lines) >= CSV_ROWS_PER_CHUNK:
+            yield "".join(lines)
+            done += len(lines)
+            lines = []
+            if progress:
+                progress(done)
+    if lines:
+        yield "".join(lines)
+
+
+def filter_salary(qs, month=None, department=None):
+    if month:
+        qs = qs.filter(month=month)
+    if department:
+        qs = qs.filter(employee__department=department)
+    return qs
+
+
+def salary_values(qs):
+    return qs.annotate(full_name=full_name("employee__user__")).values_list(
+        "employee__employee_id", "full_name", "month",
+        "base_salary", "bonus", "deductions", "total_salary",
+    )
+
+
+def salary_rows(qs):
+    for emp_id, name, month, base, bonus, deductions, total in salary_values(qs).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield [emp_id, name, month, float(base), float(bonus), float(deductions), float(total)]
+
+
+def sheet_title(month):
+    return re.sub(r"[\\/*?:\[\]]", "-", month)[:31] or "Unknown"
+
+
+def write_salary_workbook(qs, fileobj, per_month=False, progress=None):
+    # write_only workbooks flush each row to disk instead of keeping cells in memory
+    wb = Workbook(write_only=True)
+    ws = None
+    current_month = None
+    if per_month:
+        qs = qs.order_by("-month", "employee__employee_id")
+    else:
+        ws = wb.create_sheet("Salary")
+        ws.append(SALARY_HEADER)
+    for done, row in enumerate(salary_rows(qs), 1):
+        if per_month and row[2] != current_month:
+            current_month = row[2]
+            ws = wb.create_sheet(sheet_title(current_month))
+            ws.append(SALARY_HEADER)
+        ws.append(row)
+        if progress and done % EXPORT_CHUNK_SIZE == 0:
+            progress(done)
+    if ws is None:
+        wb.create_sheet("Salary").append(SALARY_HEADER)
+    wb.save(fileobj)
+
+
+def salary_workbook_file(qs, per_month=False):
+    fileobj = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    write_salary_workbook(qs, fileobj, per_month=per_month)
+    fileobj.seek(0)
+    return fileobj
+
+
+def salary_pdf_sections(qs):
+    qs = qs.order_by("employee__department__name", "employee__employee_id", "month")
+    totals = {
+        name: (count, subtotal)
+        for name, count, subtotal in qs.order_by()
+        .values_list("employee__department__name")
+        .annotate(Count("id"), Sum("total_salary"))
+    }
+    rows = qs.annotate(full_name=full_name("employee__user__")).values_list(
+        "employee__department__name", "employee__employee_id", "full_name", "month", "total_salary",
+    )
+    sections = []
+    for name, group in groupby(rows.iterator(chunk_size=EXPORT_CHUNK_SIZE), key=itemgetter(0)):
+        count, subtotal = totals[name]
+        sections.append((
+            name or "No department",
+            count,
+            float(subtotal),
+            [(emp_id, full, month, float(total)) for _, emp_id, full, month, total in group],
+        ))
+    return sections
+
+
+def write_salary_pdf(qs, fileobj, progress=None, workers=None):
+    # Pages are planned here; shards of them are drawn in parallel and merged
+    sections = salary_pdf_sections(qs)
+    total_pages = sum(page_count(count) for _, count, _, _ in sections)
+    if sections:
+        pages = paginate(sections, total_pages)
+    else:
+        pages = [(1, 1, "No salary records", [], None)]
+    render_report(pages, fileobj, workers=workers or settings.PDF_RENDER_WORKERS, progress=progress)
@@ -1,6 +1,7 @@
 from django import forms
-from django.contrib.auth.models import User
+from django.contrib.auth.models import Group, User
 from django.contrib.auth.forms import UserCreationForm
+from django.core.validators import FileExtensionValidator
 from .models import EmployeeProfile, Attendance, Salary, Leave, Department
 
 class UserCreateForm(UserCreationForm):
@@ -26,11 +27,16 @@ class EmployeeSelfProfileForm(forms.ModelForm):
         fields = ["photo", "phone"]
 
 class AttendanceForm(forms.ModelForm):
+    # Option labels show each employee's name, so load the users with the profiles
+    employee = forms.ModelChoiceField(queryset=EmployeeProfile.objects.select_related("user"))
+
     class Meta:
         model = Attendance
         fields = ["employee", "date", "status", "note"]
 
 class SalaryForm(forms.ModelForm):
+    employee = forms.ModelChoiceField(queryset=EmployeeProfile.objects.select_related("user"))
+
     class Meta:
         model = Salary
         fields = ["employee", "month", "base_salary", "bonus", "deductions"]
@@ -44,3 +50,42 @@ class DepartmentForm(forms.ModelForm):
     class Meta:
         model = Department
         fields = ["name", "manager"]
+
+class AttendanceExportFilterForm(forms.Form):
+    start = forms.DateField(required=False)
+    end = forms.DateField(required=False)
+    department = forms.ModelChoiceField(queryset=Department.objects.all(), required=False)
+    status = forms.ChoiceField(choices=(("", "Any"),) + Attendance.STATUS_CHOICES, required=False)
+
+class SalaryExportFilterForm(forms.Form):
+    month = forms.CharField(max_length=20, required=False)
+    department = forms.ModelChoiceField(queryset=Department.objects.all(), required=False)
+    per_month = forms.BooleanField(required=False)
+
+class BulkAttendanceDateForm(forms.Form):
+    date = forms.DateField(widget=forms.DateInput(attrs={"type": "date"}))
+
+class BulkAttendanceRowForm(forms.Form):
+    employee = forms.IntegerField(widget=forms.HiddenInput)
+    status = forms.ChoiceField(choices=Attendance.STATUS_CHOICES)
+    note = forms.CharField(required=False)
+
+BulkAttendanceFormSet = forms.formset_factory(BulkAttendanceRowForm, extra=0)
+
+class EmployeeImportForm(forms.Form):
+    file = forms.FileField(
+        validators=[FileExtensionValidator(["csv", "xlsx"])],
+        help_text="Columns: username, email, first_name, last_name, password, employee_id, department, designation, phone, join_date",
+    )
+    report = forms.BooleanField(required=False, label="Download the per-row report (CSV) instead of a summary")
+
+class AnnouncementForm(forms.Form):
+    title = forms.CharField(max_length=200)
+    message = forms.CharField(widget=forms.Textarea)
+    department = forms.ModelChoiceField(queryset=Department.objects.all(), required=False, help_text="Leave both empty to notify everyone")
+    group = forms.ModelChoiceField(queryset=Group.objects.all(), required=False)
+    email = forms.BooleanField(required=False, label="Also send by email")
+
+class AttendanceMatrixForm(forms.Form):
+    month = forms.RegexField(regex=r"^\d{4}-(0[1-9]|1[0-2])$", error_messages={"invalid": "Use YYYY-MM."})
+    department = forms.ModelChoiceField(queryset=Department.objects.all(), required=False)
@@ -0,0 +1,164 @@
+"""Per-view SQL query counts and timings.
+
+RequestMetricsMiddleware times every request and counts the queries it runs.
+Recent requests are kept in a ring buffer (for percentiles) next to running
+per-view totals (for Prometheus counters). Both live in process memory, so
+every worker process reports its own figures.
+"""
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+_lock = threading.Lock()
+_recent = deque(maxlen=settings.REQUEST_METRICS_BUFFER)
+_totals = defaultdict(lambda: {"requests": 0, "queries": 0, "db_seconds": 0.0, "seconds": 0.0, "bytes": 0})
+
+
+class QueryCounter:
+    """Execute wrapper that counts queries and the time spent in them."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+            self.statements.append(sql)
+
+
+@contextmanager
+def count_queries():
+    counter = QueryCounter()
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(counter))
+        yield counter
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        with count_queries() as counter:
+            response = self.get_response(request)
+        match = getattr(request, "resolver_match", None)
+        record(
+            view=match.view_name if match else "<unresolved>",
+            method=request.method,
+            status=response.status_code,
+            queries=counter.count,
+            db_seconds=counter.seconds,
+            seconds=time.perf_counter() - started,
+            # Streamed bodies are produced after the middleware returns
+            size=0 if response.streaming else len(response.content),
+        )
+        return response
+
+
+def record(view, method, status, queries, db_seconds, seconds, size):
+    entry = {
+        "view": view, "method": method, "status": status, "queries": queries,
+        "db_seconds": db_seconds, "seconds": seconds, "bytes": size, "at": time.time(),
+    }
+    with _lock:
+        _recent.append(entry)
+        totals = _totals[view]
+        totals["requests"] += 1
+        totals["queries"] += queries
+        totals["db_seconds"] += db_seconds
+        totals["seconds"] += seconds
+        totals["bytes"] += size
+
+
+def reset():
+    with _lock:
+        _recent.clear()
+        _totals.clear()
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def summary():
+    """Per-view figures: totals since start-up plus max/p95 over the recent buffer."""
+    with _lock:
+        recent = list(_recent)
+        totals = {view: dict(values) for view, values in _totals.items()}
+    by_view = defaultdict(list)
+    for entry in recent:
+        by_view[entry["view"]].append(entry)
+    views = {}
+    for view, values in sorted(totals.items()):
+        entries = by_view.get(view, [])
+        views[view] = dict(values, budget=settings.QUERY_BUDGETS.get(view), recent=len(entries))
+        if entries:
+            queries = [e["queries"] for e in entries]
+            durations = [e["seconds"] for e in entries]
+            views[view].update(
+                max_queries=max(queries),
+                p95_queries=_percentile(queries, 0.95),
+                p95_seconds=_percentile(durations, 0.95),
+                max_seconds=max(durations),
+            )
+    return {"buffer_size": _recent.maxlen, "views": views, "recent": recent[-50:]}
+
+
+PROMETHEUS_COUNTERS = [
+    ("ems_view_requests_total", "requests", "Requests served"),
+    ("ems_view_queries_total", "queries", "SQL queries executed"),
+    ("ems_view_db_seconds_total", "db_seconds", "Seconds spent in SQL queries"),
+    ("ems_view_seconds_total", "seconds", "Seconds spent handling requests"),
+    ("ems_view_response_bytes_total", "bytes", "Response body bytes (streamed responses excluded)"),
+]
+PROMETHEUS_GAUGES = [
+    ("ems_view_p95_queries", "p95_queries", "95th percentile queries per request over the recent buffer"),
+    ("ems_view_p95_seconds", "p95_seconds", "95th percentile request seconds over the recent buffer"),
+    ("ems_view_query_budget", "budget", "Configured query budget"),
+]
+
+
+def prometheus_text(data):
+    lines = []
+    for metrics, kind in ((PROMETHEUS_COUNTERS, "counter"), (PROMETHEUS_GAUGES, "gauge")):
+        for name, key, help_text in metrics:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            for view, values in data["views"].items():
+                if values.get(key) is not None:
+                    label = view.replace("\\", "\\\\").replace('"', '\\"')
+                    lines.append(f'{name}{{view="{label}"}} {values[key]}')
+    return "\n".join(lines) + "\n"
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def query_budget(view_name, budget=None):
+    """Fail if the block runs more queries than the view's budget in QUERY_BUDGETS.
+
+        with query_budget("manager_dashboard"):
+            client.get(reverse("manager_dashboard"))
+    """
+    budget = settings.QUERY_BUDGETS.get(view_name) if budget is None else budget
+    if budget is None:
+        raise QueryBudgetExceeded(f"{view_name} has no entry in QUERY_BUDGETS")
+    with count_queries() as counter:
+        yield counter
+    if counter.count > budget:
+        statements = "\n".join(f"  {sql}" for sql in counter.statements)
+        raise QueryBudgetExceeded(f"{view_name} ran {counter.count} queries, budget is {budget}:\n{statements}")
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import logging
+import tempfile
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import IntegrityError, close_old_connections, connection, transaction
+from django.utils import timezone
+
+from .exports import (
+    attendance_csv_stream,
+    filter_attendance,
+    filter_salary,
+    write_salary_pdf,
+    write_salary_workbook,
+)
+from .forms import AttendanceExportFilterForm, SalaryExportFilterForm
+from .models import Attendance, ExportJob, Salary
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FILE_EXTENSIONS = {
+    "attendance_csv": "csv",
+    "salary_excel": "xlsx",
+    "salary_pdf": "pdf",
+}
+
+EXPORT_FILTER_FORMS = {
+    "attendance_csv": AttendanceExportFilterForm,
+    "salary_excel": SalaryExportFilterForm,
+    "salary_pdf": SalaryExportFilterForm,
+}
+
+
+def normalize_params(cleaned_data):
+    # Turn cleaned form data into plain JSON so equal requests hash equally
+    params = {}
+    for key, value in cleaned_data.items():
+        if value in (None, "", False):
+            continue
+        if hasattr(value, "pk"):
+            value = value.pk
+        elif hasattr(value, "isoformat"):
+            value = value.isoformat()
+        params[key] = value
+    return params
+
+
+def params_hash(params):
+    return hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()
+
+
+def enqueue_export(kind, params, user=None):
+    """Return (job, created); an identical Pending/Running job is reused."""
+    digest = params_hash(params)
+    active = ExportJob.objects.filter(kind=kind, params_hash=digest, status__in=ExportJob.ACTIVE_STATUSES)
+    job = active.first()
+    if job:
+        return job, False
+    try:
+        with transaction.atomic():
+            job = ExportJob.objects.create(kind=kind, params=params, params_hash=digest, requested_by=user)
+    except IntegrityError:
+        # Lost the race against an identical request
+        return active.get(), False
+    return job, True
+
+
+def claim_next_job():
+    while True:
+        job = ExportJob.objects.filter(status="Pending").order_by("created").first()
+        if job is None:
+            return None
+        claimed = ExportJob.objects.filter(pk=job.pk, status="Pending").update(
+            status="Running", started_at=timezone.now(),
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+
+
+def requeue_stale_jobs():
+    cutoff = timezone.now() - timedelta(minutes=settings.EXPORT_JOB_STALE_MINUTES)
+    return ExportJob.objects.filter(status="Running", started_at__lt=cutoff).update(
+        status="Pending", progress=0, started_at=None,
+    )
+
+
+def export_queryset(job):
+    form = EXPORT_FILTER_FORMS[job.kind](job.params)
+    if not form.is_valid():
+        raise ValueError(form.errors.as_text())
+    filters = form.cleaned_data
+    if job.kind == "attendance_csv":
+        return filter_attendance(Attendance.objects.all(), **filters), filters
+    qs = filter_salary(Salary.objects.all(), month=filters["month"], department=filters["department"])
+    return qs, filters
+
+
+def run_job(job):
+    try:
+        qs, filters = export_queryset(job)
+        total = qs.count() or 1
+
+        def progress(done):
+            ExportJob.objects.filter(pk=job.pk).update(progress=min(99, done * 100 // total))
+
+        with tempfile.TemporaryFile() as fileobj:
+            if job.kind == "attendance_csv":
+                for chunk in attendance_csv_stream(qs, progress=progress):
+                    fileobj.write(chunk.encode())
+            elif job.kind == "salary_excel":
+                write_salary_workbook(qs, fileobj, per_month=filters["per_month"], progress=progress)
+            else:
+                write_salary_pdf(qs, fileobj, progress=progress)
+            fileobj.seek(0)
+            job.file.save(f"{job.kind}-{job.pk}.{EXPORT_FILE_EXTENSIONS[job.kind]}", File(fileobj), save=False)
+        job.status = "Done"
+        job.progress = 100
+    except Exception as exc:
+        logger.exception("Export job %s failed", job.pk)
+        job.status = "Failed"
+        job.error = str(exc)
+    job.finished_at = timezone.now()
+    job.save(update_fields=["file", "status", "progress", "error", "finished_at"])
+    return job
+
+
+def worker_loop(poll_interval=2.0, once=False):
+    try:
+        while True:
+            close_old_connections()
+            job = claim_next_job()
+            if job is not None:
+                run_job(job)
+            elif once:
+                return
+            else:
+                time.sleep(poll_interval)
+    finally:
+        connection.close()
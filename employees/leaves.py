@@ -0,0 +1,197 @@
+"""Leave accounting: overlap checks, yearly balances and decisions.
+
+Active (Pending or Approved) leaves of one employee never overlap, which
+``apply_for_leave`` enforces under a per-employee row lock. That invariant
+means the only active leave that can overlap a new range is the latest one
+starting on or before its end, so the check is a single index seek.
+
+LeaveBalance rows hold used and pending days per employee and year. A
+missing row is rebuilt from the employee's leaves for that year.
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from .attendance import upsert_attendance
+from .changelog import log_rows
+from .metrics import mark_employee_summaries
+from .models import EmployeeProfile, Leave, LeaveBalance
+from .notifications import notify_many
+from .roles import get_user_roles
+
+ACTIVE_STATUSES = ("Pending", "Approved")
+DECISIONS = {"Approve": "Approved", "Reject": "Rejected"}
+# Keyset order of the leave queue, oldest application first
+QUEUE_ORDER = ["applied_on", "id"]
+
+
+def days_by_year(start, end):
+    days = defaultdict(int)
+    year = start.year
+    while year <= end.year:
+        first = max(start, date(year, 1, 1))
+        last = min(end, date(year, 12, 31))
+        days[year] += (last - first).days + 1
+        year += 1
+    return dict(days)
+
+
+def overlap_candidates(employee_id, end, exclude=None):
+    """Active leaves starting on or before ``end``, latest first."""
+    candidates = Leave.objects.filter(employee_id=employee_id, status__in=ACTIVE_STATUSES, start_date__lte=end)
+    if exclude:
+        candidates = candidates.exclude(pk=exclude)
+    return candidates.order_by("-start_date")
+
+
+def find_overlap(employee_id, start, end, exclude=None):
+    latest = overlap_candidates(employee_id, end, exclude).first()
+    return latest if latest and latest.end_date >= start else None
+
+
+def recount_balances(buckets, create=True):
+    """Rebuild the (employee_id, year) balances in ``buckets`` from their leaves.
+
+    With ``create=False`` only existing rows are updated (used while the
+    employee may be mid-way through a cascade delete).
+    """
+    buckets = set(buckets)
+    rows = {(employee_id, year): LeaveBalance(employee_id=employee_id, year=year) for employee_id, year in buckets}
+    if not rows:
+        return rows
+    years = {year for _, year in buckets}
+    leaves = Leave.objects.filter(
+        employee_id__in={employee_id for employee_id, _ in buckets},
+        status__in=ACTIVE_STATUSES,
+        start_date__lte=date(max(years), 12, 31),
+        end_date__gte=date(min(years), 1, 1),
+    ).values_list("employee_id", "start_date", "end_date", "status")
+    for employee_id, start, end, status in leaves.iterator(chunk_size=2000):
+        for year, days in days_by_year(start, end).items():
+            balance = rows.get((employee_id, year))
+            if balance is None:
+                continue
+            if status == "Approved":
+                balance.used += days
+            else:
+                balance.pending += days
+    if create:
+        # The allowance is kept when the row already exists
+        LeaveBalance.objects.bulk_create(
+            rows.values(),
+            update_conflicts=True,
+            unique_fields=["employee", "year"],
+            update_fields=["used", "pending"],
+        )
+        return rows
+    existing = LeaveBalance.objects.filter(
+        employee_id__in={employee_id for employee_id, _ in rows},
+        year__in={year for _, year in rows},
+    )
+    existing = [b for b in existing if (b.employee_id, b.year) in rows]
+    for balance in existing:
+        fresh = rows[balance.employee_id, balance.year]
+        balance.used, balance.pending = fresh.used, fresh.pending
+    LeaveBalance.objects.bulk_update(existing, ["used", "pending"])
+    return rows
+
+
+def get_balances(buckets, lock=False):
+    buckets = set(buckets)
+    qs = LeaveBalance.objects.filter(
+        employee_id__in={employee_id for employee_id, _ in buckets},
+        year__in={year for _, year in buckets},
+    )
+    if lock:
+        qs = qs.select_for_update()
+    balances = {(b.employee_id, b.year): b for b in qs if (b.employee_id, b.year) in buckets}
+    missing = buckets - balances.keys()
+    if missing:
+        recount_balances(missing)
+        balances.update(get_balances(missing, lock))
+    return balances
+
+
+def apply_for_leave(employee, start, end, reason):
+    if end < start:
+        raise ValidationError("The leave cannot end before it starts.")
+    needed = days_by_year(start, end)
+    with transaction.atomic():
+        # One application at a time per employee keeps active leaves disjoint
+        EmployeeProfile.objects.select_for_update().filter(pk=employee.pk).exists()
+        clash = find_overlap(employee.pk, start, end)
+        if clash:
+            raise ValidationError(
+                f"Overlaps your {clash.status.lower()} leave from {clash.start_date} to {clash.end_date}."
+            )
+        balances = get_balances([(employee.pk, year) for year in needed], lock=True)
+        for year, days in needed.items():
+            available = balances[employee.pk, year].available
+            if days > available:
+                raise ValidationError(f"Only {available} leave days left in {year}; this request needs {days}.")
+        leave = Leave.objects.create(employee=employee, start_date=start, end_date=end, reason=reason)
+    return leave
+
+
+def pending_leaves_for(user):
+    """Pending leaves ``user`` may decide: all for admins, their department's for managers."""
+    qs = Leave.objects.filter(status="Pending")
+    if user.is_superuser or "Admin" in get_user_roles(user):
+        return qs
+    department = getattr(user, "managed_department", None)
+    return qs.filter(employee__department=department) if department else qs.none()
+
+
+def decide_leaves(leave_ids, status):
+    """Approve or reject Pending leaves; returns the leaves that changed.
+
+    Statuses change with one UPDATE, balances with one bulk UPDATE, and
+    approved days become Leave attendance in one bulk upsert.
+    """
+    if status not in ("Approved", "Rejected"):
+        raise ValueError(f"Unknown decision {status!r}")
+    with transaction.atomic():
+        leaves = list(
+            Leave.objects.select_for_update()
+            .filter(pk__in=list(leave_ids), status="Pending")
+            .select_related("employee")
+        )
+        if not leaves:
+            return []
+        changes = defaultdict(int)
+        for leave in leaves:
+            for year, days in days_by_year(leave.start_date, leave.end_date).items():
+                changes[leave.employee_id, year] += days
+        # Read (or rebuild) balances before the status change so the leaves still count as pending
+        balances = get_balances(changes, lock=True)
+        decided = Leave.objects.filter(pk__in=[leave.pk for leave in leaves])
+        decided.update(status=status, updated=timezone.now())
+        log_rows(decided)
+        for bucket, days in changes.items():
+            balance = balances[bucket]
+            balance.pending = max(balance.pending - days, 0)
+            if status == "Approved":
+                balance.used += days
+        LeaveBalance.objects.bulk_update(balances.values(), ["used", "pending"])
+
+        if status == "Approved":
+            upsert_attendance(
+                (leave.employee_id, leave.start_date + timedelta(days=offset), "Leave", "Approved leave")
+                for leave in leaves
+                for offset in range((leave.end_date - leave.start_date).days + 1)
+            )
+        mark_employee_summaries({leave.employee_id for leave in leaves})
+        notify_many(
+            (
+                leave.employee.user_id,
+                f"Leave {status.lower()}",
+                f"Your leave from {leave.start_date} to {leave.end_date} was {status.lower()}.",
+            )
+            for leave in leaves
+        )
+    for leave in leaves:
+        leave.status = status
+    return leaves
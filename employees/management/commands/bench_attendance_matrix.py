@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.template.loader import render_to_string
+
+from employees.matrix import AttendanceMatrix
+from employees.models import Department
+from employees.payroll import month_bounds
+from employees.seeding import scratch_database, seed_company
+
+class Command(BaseCommand):
+    help = "Build and render a department's monthly attendance matrix in a throwaway test database"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--employees", type=int, default=2000)
+        parser.add_argument("--month", default="2025-01")
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        try:
+            _, last_day, days = month_bounds(options["month"])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        with scratch_database():
+            # One department whose weekday attendance covers the whole month
+            seed_company(departments=1, employees=options["employees"], days=days, months=0, prefix="matrix", end=last_day)
+            department = Department.objects.get()
+            build, render = [], []
+            for _ in range(options["repeat"]):
+                started = time.perf_counter()
+                matrix = AttendanceMatrix(department, options["month"])
+                build.append(time.perf_counter() - started)
+                started = time.perf_counter()
+                render_to_string("employees/attendance_matrix.html", {
+                    "matrix": matrix, "department": department, "form": None, "is_admin": True,
+                })
+                render.append(time.perf_counter() - started)
+        self.stdout.write(
+            f"{len(matrix.employees)} x {matrix.days} grid: "
+            f"query+pivot {min(build) * 1000:.0f} ms, render {min(render) * 1000:.0f} ms (best of {options['repeat']})"
+        )
@@ -0,0 +1,141 @@
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from employees.models import Department, EmployeeProfile
+from employees.seeding import scratch_database, seed_company
+
+SQLITE_PROFILES = ["sqlite:development", "sqlite:production"]
+POSTGRES_PROFILES = ["postgres:development", "postgres:production"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive parallel managers marking attendance through the mark_attendance view "
+        "and compare write throughput across database profiles"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--writers", type=int, default=8, help="Concurrent managers, one thread each")
+        parser.add_argument("--writes", type=int, default=50, help="Attendance rows each manager marks")
+        parser.add_argument("--employees", type=int, default=20, help="Employees in each manager's department")
+        parser.add_argument(
+            "--profiles", nargs="+",
+            help="engine:profile pairs; defaults to both SQLite profiles, plus PostgreSQL when EMS_DB_ENGINE=postgres",
+        )
+        parser.add_argument("--run-profile", action="store_true", help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options["run_profile"]:
+            self.stdout.write(json.dumps(self.run_profile(options)))
+            return
+        profiles = options["profiles"] or SQLITE_PROFILES + (POSTGRES_PROFILES if settings.DB_ENGINE == "postgres" else [])
+        self.stdout.write(f"{'profile':22} {'writes/s':>9} {'p95 ms':>8} {'errors':>7}")
+        for spec in profiles:
+            result = self.spawn(spec, options)
+            self.stdout.write(
+                f"{spec:22} {result['throughput']:9.1f} {result['p95_ms']:8.1f} {result['errors']:7}"
+                + (f"  e.g. {result['first_error']}" if result["first_error"] else "")
+            )
+
+    def spawn(self, spec, options):
+        engine, _, profile = spec.partition(":")
+        if engine not in ("sqlite", "postgres") or profile not in ("development", "production"):
+            raise CommandError(f"Profiles look like sqlite:production or postgres:development, got {spec!r}")
+        env = dict(os.environ, EMS_DB_ENGINE=engine, EMS_DB_PROFILE=profile)
+        command = [
+            sys.executable, str(settings.BASE_DIR / "manage.py"), "bench_concurrent_writes", "--run-profile",
+            "--writers", str(options["writers"]), "--writes", str(options["writes"]),
+            "--employees", str(options["employees"]),
+        ]
+        child = subprocess.run(command, env=env, capture_output=True, text=True)
+        if child.returncode:
+            raise CommandError(f"{spec} failed:\n{child.stderr}")
+        return json.loads(child.stdout.strip().splitlines()[-1])
+
+    def run_profile(self, options):
+        # On disk for SQLite, so each forked writer opens its own connection to the same file
+        with scratch_database(on_disk=True):
+            managers = self.seed(options["writers"], options["employees"])
+            with override_settings(ALLOWED_HOSTS=["testserver"]):
+                return self.drive(managers, options["writes"])
+
+    def seed(self, writers, employees):
+        # One department per writer, each with its manager and ``employees`` employees
+        seed_company(departments=writers, employees=writers * employees, days=0, months=0, prefix="writer")
+        managers = [
+            (dept.manager, list(EmployeeProfile.objects.filter(department=dept).values_list("pk", flat=True)))
+            for dept in Department.objects.select_related("manager").order_by("pk")
+        ]
+        connection.close()
+        return managers
+
+    def drive(self, managers, writes):
+        # Forked processes, like the workers of a production app server; the
+        # parent's connection is closed so each child opens its own
+        context = multiprocessing.get_context("fork")
+        barrier = context.Barrier(len(managers) + 1)
+        results = context.Queue()
+        workers = [
+            context.Process(target=write_attendance, args=(manager, employee_pks, writes, barrier, results))
+            for manager, employee_pks in managers
+        ]
+        for worker in workers:
+            worker.start()
+        barrier.wait()
+        started = time.perf_counter()
+        latencies, errors = [], []
+        for _ in workers:
+            worker_latencies, worker_errors = results.get()
+            latencies += worker_latencies
+            errors += worker_errors
+        elapsed = time.perf_counter() - started
+        for worker in workers:
+            worker.join()
+        latencies.sort()
+        return {
+            "throughput": len(latencies) / elapsed,
+            "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0,
+            "errors": len(errors),
+            "first_error": errors[0] if errors else "",
+        }
+
+
+def write_attendance(manager, employee_pks, writes, barrier, results):
+    client = Client(raise_request_exception=True)
+    client.force_login(manager)
+    today = date.today()
+    latencies, errors = [], []
+    barrier.wait()
+    for i in range(writes):
+        pk = employee_pks[i % len(employee_pks)]
+        data = {
+            "employee": pk,
+            "date": (today - timedelta(days=i // len(employee_pks))).isoformat(),
+            "status": "Present",
+            "note": "",
+        }
+        started = time.perf_counter()
+        try:
+            response = client.post(reverse("mark_attendance", args=[pk]), data)
+        except DatabaseError as exc:
+            errors.append(str(exc))
+            continue
+        if response.status_code == 302:
+            latencies.append(time.perf_counter() - started)
+        else:
+            errors.append(f"HTTP {response.status_code}")
+    connection.close()
+    results.put((latencies, errors))
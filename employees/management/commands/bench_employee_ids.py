@@ -0,0 +1,60 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection
+
+from employees.seeding import scratch_database
+from employees.sequences import next_values
+
+class Command(BaseCommand):
+    help = "Allocate IDs from many threads at once and verify none are duplicated or skipped"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--per-thread", type=int, default=200)
+        parser.add_argument("--block-size", type=int, default=1, help="IDs reserved per call (bulk inserts use >1)")
+        parser.add_argument("--retries", type=int, default=20, help="Attempts per call when the database is locked")
+
+    def handle(self, *args, **options):
+        threads, per_thread, block = options["threads"], options["per_thread"], options["block_size"]
+        errors = []
+
+        def allocate():
+            values = []
+            try:
+                for _ in range(per_thread):
+                    for attempt in range(options["retries"]):
+                        try:
+                            values.extend(next_values("bench", block))
+                            break
+                        except OperationalError as exc:
+                            # SQLite without WAL/busy timeout tuning can refuse a writer; back off and retry
+                            errors.append(str(exc))
+                            time.sleep(min(0.005 * 2 ** attempt, 0.5))
+                    else:
+                        raise CommandError(f"Gave up after {options['retries']} locked attempts: {errors[-1]}")
+            finally:
+                connection.close()
+            return values
+
+        # A scratch database, so the real employee_id counter is never touched; on disk,
+        # since the threads need separate connections to one database
+        with scratch_database(on_disk=True):
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                results = list(pool.map(lambda _: allocate(), range(threads)))
+            elapsed = time.perf_counter() - started
+
+        allocated = [v for values in results for v in values]
+        expected = threads * per_thread * block
+        if len(set(allocated)) != len(allocated):
+            raise CommandError(f"Duplicate IDs allocated: {len(allocated) - len(set(allocated))}")
+        if sorted(allocated) != list(range(1, expected + 1)):
+            raise CommandError("Allocated IDs are not contiguous")
+        calls = threads * per_thread
+        self.stdout.write(
+            f"{expected} IDs in {calls} calls from {threads} threads: {elapsed:.2f}s, "
+            f"{calls / elapsed:.0f} calls/s, {expected / elapsed:.0f} IDs/s, {len(errors)} lock retries"
+        )
+        self.stdout.write(self.style.SUCCESS("No duplicates, no gaps"))
@@ -0,0 +1,77 @@
+import io
+import time
+
+from django.contrib.auth.models import Group
+from django.core.management.base import BaseCommand
+
+from employees.forms import EmployeeProfileForm, UserCreateForm
+from employees.models import Department
+from employees.onboarding import IMPORT_COLUMNS, import_employees
+from employees.seeding import scratch_database
+
+PASSWORD = "Onboard-2024!x"
+
+def synthetic_csv(prefix, count, departments, passwords):
+    out = io.StringIO()
+    out.write(",".join(IMPORT_COLUMNS) + "\n")
+    for i in range(count):
+        out.write(
+            f"{prefix}{i},{prefix}{i}@example.com,First{i},Last{i},{PASSWORD if passwords else ''},,"
+            f"{departments[i % len(departments)]},Engineer,555{i:07d},2024-01-01\n"
+        )
+    out.seek(0)
+    return out
+
+class Command(BaseCommand):
+    help = (
+        "Import synthetic employees into a throwaway test database and compare "
+        "throughput with the one-form-per-employee path"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=5000)
+        parser.add_argument("--form-rows", type=int, default=50, help="Rows created through the forms for comparison")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--workers", type=int, default=None, help="Password hashing processes")
+
+    def handle(self, *args, **options):
+        with scratch_database():
+            departments = [f"Bench {i}" for i in range(10)]
+            Department.objects.bulk_create([Department(name=name) for name in departments])
+            self.bench_forms(options["form_rows"], departments)
+            for label, passwords in (("invites", False), ("passwords", True)):
+                result = import_employees(
+                    synthetic_csv(label, options["rows"], departments, passwords),
+                    "bench.csv",
+                    batch_size=options["batch_size"],
+                    workers=options["workers"],
+                )
+                self.stdout.write(
+                    f"importer ({label}): {result.created} created, {result.failed} rejected, "
+                    f"{result.elapsed:.2f}s, {result.rows_per_second:.0f} rows/s"
+                )
+
+    def bench_forms(self, count, departments):
+        if not count:
+            return
+        group, _ = Group.objects.get_or_create(name="Employee")
+        dept_pks = list(Department.objects.filter(name__in=departments).values_list("pk", flat=True))
+        started = time.perf_counter()
+        for i in range(count):
+            # What views.employee_create does for every posted employee
+            user_form = UserCreateForm({
+                "username": f"form{i}", "email": f"form{i}@example.com", "first_name": "First", "last_name": "Last",
+                "password1": PASSWORD, "password2": PASSWORD,
+            })
+            profile_form = EmployeeProfileForm({
+                "department": dept_pks[i % len(dept_pks)], "designation": "Engineer", "join_date": "2024-01-01",
+            })
+            if not (user_form.is_valid() and profile_form.is_valid()):
+                raise ValueError(user_form.errors or profile_form.errors)
+            user = user_form.save()
+            user.groups.add(group)
+            profile = profile_form.save(commit=False)
+            profile.user = user
+            profile.save()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"forms: {count} created, {elapsed:.2f}s, {count / elapsed:.0f} rows/s")
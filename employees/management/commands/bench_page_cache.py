@@ -0,0 +1,42 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from employees.seeding import scratch_database, seed_company
+
+PAGES = ["admin_dashboard", "department_list", "employee_list"]
+NO_CACHE = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+class Command(BaseCommand):
+    help = "Compare requests/sec on the dashboard pages with the configured cache and with caching disabled"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--employees", type=int, default=2000)
+        parser.add_argument("--departments", type=int, default=50)
+        parser.add_argument("--requests", type=int, default=200, help="Requests per page and mode")
+
+    def handle(self, *args, **options):
+        with scratch_database():
+            seed_company(departments=options["departments"], employees=options["employees"], days=0, months=0, prefix="bench")
+            results = {}
+            for mode, caches in (("no cache", NO_CACHE), ("cached", None)):
+                with override_settings(ALLOWED_HOSTS=["testserver"], **({"CACHES": caches} if caches else {})):
+                    client = Client()
+                    client.force_login(User.objects.get(username="bench-admin"))
+                    results[mode] = {page: self.measure(client, page, options["requests"]) for page in PAGES}
+        for page in PAGES:
+            before, after = results["no cache"][page], results["cached"][page]
+            self.stdout.write(f"{page:16} {before:8.0f} req/s -> {after:8.0f} req/s  ({after / before:.1f}x)")
+
+    def measure(self, client, page, count):
+        url = reverse(page)
+        client.get(url)
+        started = time.perf_counter()
+        for _ in range(count):
+            response = client.get(url)
+            assert response.status_code == 200, (url, response.status_code)
+        return count / (time.perf_counter() - started)
@@ -0,0 +1,183 @@
+import json
+import os
+import resource
+import threading
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from employees.instrumentation import count_queries
+from employees.seeding import sample_fixtures, sample_requests, scratch_database, seed_company
+
+# A result is a regression when it is this much worse than the baseline...
+DEFAULT_TOLERANCE = 0.25
+# ...and worse by more than this, so sub-millisecond jitter never trips it
+LATENCY_FLOOR_MS = 5
+RSS_FLOOR_MB = 10
+
+
+def export_requests(fx):
+    today = timezone.localdate()
+    month = today.strftime("%Y-%m")
+    matrix = f"{reverse('attendance_matrix')}?month={month}&department={fx['dept'].pk}"
+    return [
+        ("export_attendance_csv (30 days)", f"{reverse('export_attendance_csv')}?start={today - timedelta(days=30)}&end={today}", None),
+        ("export_salary_excel (month)", f"{reverse('export_salary_excel')}?month={month}", None),
+        ("attendance_matrix (csv)", f"{matrix}&format=csv", None),
+        ("attendance_matrix (xlsx)", f"{matrix}&format=xlsx", None),
+    ]
+
+
+def _current_rss_mb():
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        # No procfs: fall back to the process high-water mark (KiB on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if peak > 2 ** 32 else peak / 2 ** 10
+
+
+class RssSampler:
+    """Highest resident set size seen while the block runs, sampled every few milliseconds."""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.peak = 0
+
+    def __enter__(self):
+        self.peak = _current_rss_mb()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, _current_rss_mb())
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _current_rss_mb())
+
+
+class Command(BaseCommand):
+    help = (
+        "Time every view in employees/urls.py and the exports against seeded companies of "
+        "several sizes, recording query counts, latency percentiles and peak RSS, and flag "
+        "regressions against a baseline JSON"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="Employee counts to seed")
+        parser.add_argument("--departments", type=int, default=20)
+        parser.add_argument("--days", type=int, default=90, help="Days of attendance history")
+        parser.add_argument("--months", type=int, default=6, help="Months of salaries, leaves and notifications")
+        parser.add_argument("--repeat", type=int, default=5, help="Timed runs per GET, after one warm-up")
+        parser.add_argument("--only", nargs="+", default=[], help="Benchmark only these route names")
+        parser.add_argument("--output", help="Write the results to this JSON file")
+        parser.add_argument("--baseline", help="Compare against results saved earlier with --output")
+        parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options["baseline"]:
+            with open(options["baseline"]) as f:
+                baseline = json.load(f)["results"]
+        results = {}
+        for size in options["sizes"]:
+            results.update(self.run_size(size, options))
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump({"options": {k: options[k] for k in ("sizes", "departments", "days", "months", "repeat")},
+                           "results": results}, f, indent=2, sort_keys=True)
+            self.stdout.write(f"Results written to {options['output']}")
+        if baseline is not None:
+            regressions = self.compare(results, baseline, options["tolerance"])
+            if regressions:
+                raise CommandError(f"{regressions} regressions against {options['baseline']}")
+            self.stdout.write(self.style.SUCCESS(f"No regressions against {options['baseline']}"))
+
+    def run_size(self, size, options):
+        # On disk, so the database is not counted in the process's RSS
+        with scratch_database(on_disk=True):
+            started = time.perf_counter()
+            counts = seed_company(
+                departments=min(options["departments"], max(1, size // 10)),
+                employees=size, days=options["days"], months=options["months"], password="bench",
+            )
+            self.stdout.write(f"\n{size:,} employees: seeded {sum(counts.values()):,} rows in {time.perf_counter() - started:.1f}s")
+            with override_settings(ALLOWED_HOSTS=["testserver"]):
+                return self.run_requests(size, options)
+
+    def run_requests(self, size, options):
+        fx = sample_fixtures()
+        users = {"/manager/": fx["manager"], "/employee/": fx["employee"]}
+        requests = sample_requests(fx) + export_requests(fx)
+        if options["only"]:
+            requests = [r for r in requests if r[0].split(" ")[0] in options["only"]]
+        client = Client()
+        results = {}
+        self.stdout.write(f"{'view':36} {'status':>6} {'queries':>7} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'KiB':>8} {'RSS MB':>7}")
+        for name, url, data in requests:
+            user = next((u for prefix, u in users.items() if url.startswith(prefix)), fx["admin"])
+            # Mutating POSTs are timed once; GETs get a warm-up run first
+            runs = 1 if data is not None else options["repeat"] + 1
+            timings = []
+            for run in range(runs):
+                client.force_login(user)
+                with RssSampler() as rss, count_queries() as queries:
+                    started = time.perf_counter()
+                    response = self.request(client, url, data)
+                    body = b"".join(response.streaming_content) if response.streaming else response.content
+                    elapsed = (time.perf_counter() - started) * 1000
+                if runs == 1 or run:
+                    timings.append(elapsed)
+            timings.sort()
+            result = {
+                "status": response.status_code,
+                "queries": queries.count,
+                "p50_ms": round(timings[len(timings) // 2], 2),
+                "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+                "max_ms": round(timings[-1], 2),
+                "bytes": len(body),
+                "peak_rss_mb": round(rss.peak, 1),
+            }
+            results[f"{size}:{name}"] = result
+            self.stdout.write(
+                f"{name:36} {result['status']:6} {result['queries']:7} {result['p50_ms']:8.1f} {result['p95_ms']:8.1f} "
+                f"{result['max_ms']:8.1f} {result['bytes'] / 1024:8.1f} {result['peak_rss_mb']:7.1f}"
+            )
+        return results
+
+    def request(self, client, url, data):
+        if data is None:
+            return client.get(url)
+        if isinstance(data, str):
+            return client.post(url, data, content_type="application/json")
+        return client.post(url, data)
+
+    def compare(self, results, baseline, tolerance):
+        regressions = 0
+        for key, result in sorted(results.items()):
+            base = baseline.get(key)
+            if base is None:
+                continue
+            problems = []
+            if result["queries"] > base["queries"]:
+                problems.append(f"queries {base['queries']} -> {result['queries']}")
+            # The median is compared; a p95 over a handful of runs is mostly scheduler noise
+            if result["p50_ms"] > base["p50_ms"] * (1 + tolerance) + LATENCY_FLOOR_MS:
+                problems.append(f"p50 {base['p50_ms']:.1f}ms -> {result['p50_ms']:.1f}ms")
+            if result["peak_rss_mb"] > base["peak_rss_mb"] * (1 + tolerance) + RSS_FLOOR_MB:
+                problems.append(f"peak RSS {base['peak_rss_mb']:.0f}MB -> {result['peak_rss_mb']:.0f}MB")
+            if problems:
+                regressions += 1
+                self.stdout.write(self.style.ERROR(f"REGRESSION {key}: {'; '.join(problems)}"))
+        return regressions
@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.contrib.auth.models import Group, User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+
+from employees.instrumentation import QueryBudgetExceeded, query_budget
+from employees.models import Department, EmployeeProfile, Notification
+from employees.notifications import recount_unread
+from employees.seeding import sample_fixtures, sample_requests, scratch_database, seed_company
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database, request every view in employees/urls.py and fail "
+        "if any runs more SQL queries than its QUERY_BUDGETS entry"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--employees", type=int, default=60, help="Employees in the manager's department")
+
+    def handle(self, *args, **options):
+        self.verbosity = options["verbosity"]
+        with scratch_database():
+            fixtures = self.seed(options["employees"])
+            # Measure the views themselves, not how warm the role and fragment caches happen to be
+            no_cache = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+            with override_settings(CACHES=no_cache, ALLOWED_HOSTS=["testserver"]):
+                failures = self.check_budgets(fixtures)
+        if failures:
+            raise CommandError(f"{failures} views are over their query budget")
+        self.stdout.write(self.style.SUCCESS("Every view is within its query budget"))
+
+    def check_budgets(self, fixtures):
+        client = Client()
+        failures = 0
+        for name, url, data in sample_requests(fixtures):
+            # Logged in afresh each time so logout and invite views see the same state
+            client.force_login(fixtures["admin"])
+            try:
+                with query_budget(name) as counter:
+                    if data is None:
+                        response = client.get(url)
+                    elif isinstance(data, str):
+                        response = client.post(url, data, content_type="application/json")
+                    else:
+                        response = client.post(url, data)
+            except QueryBudgetExceeded as exc:
+                failures += 1
+                self.stdout.write(self.style.ERROR(str(exc) if self.verbosity > 1 else str(exc).splitlines()[0]))
+                continue
+            self.stdout.write(f"ok {name:30} {counter.count:3} / {settings.QUERY_BUDGETS[name]:3}  ({response.status_code})")
+        return failures
+
+    def seed(self, employee_count):
+        seed_company(departments=1, employees=employee_count, days=30, months=1, prefix="budget")
+        fixtures = sample_fixtures("budget")
+        admin, dept = fixtures["admin"], fixtures["dept"]
+        # The admin also manages the department and is one of its employees, so every role's views run in full
+        admin.groups.set(Group.objects.all())
+        Department.objects.filter(pk=dept.pk).update(manager=admin)
+        EmployeeProfile.objects.create(user=admin, department=dept)
+        Notification.objects.bulk_create([Notification(user=admin, title=f"Note {i}", message="-") for i in range(60)])
+        recount_unread([admin.pk])
+        fixtures["admin"] = User.objects.get(pk=admin.pk)
+        fixtures["dept"] = Department.objects.get(pk=dept.pk)
+        return fixtures
@@ -0,0 +1,137 @@
+import re
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from employees import dashboards
+from employees.calendar_feed import DEFAULT_WINDOW_DAYS, CalendarScope, detail_rows, summary_counts
+from employees.exports import attendance_values, filter_attendance, filter_salary, salary_values
+from employees.leaves import QUEUE_ORDER, overlap_candidates, pending_leaves_for
+from employees.metrics import summary_rows
+from employees.models import Attendance, EmployeeProfile, Leave, Notification, Salary
+from employees.notifications import LIST_ORDER, unread_counts
+from employees.pagination import page_query
+from employees.seeding import scratch_database, seed_company
+from employees.views import LEAVE_QUEUE_PAGE_SIZE, NOTIFICATION_PAGE_SIZE
+
+# Tables that grow with headcount or history; a plain scan of one of these is a failure
+LARGE_TABLES = {
+    model._meta.db_table
+    for model in (Attendance, EmployeeProfile, Leave, Notification, Salary, User)
+}
+SQLITE_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(.*)$")
+POSTGRES_SCAN = re.compile(r"Seq Scan on (\w+)")
+
+
+def view_queries(dept, profile, user, manager, day):
+    """The queries behind each view, keyed by view name, built with the views' own helpers."""
+    start, end = day - timedelta(days=DEFAULT_WINDOW_DAYS), day + timedelta(days=1)
+    admin = User(is_superuser=True)
+    scopes = [
+        CalendarScope("all"),
+        CalendarScope("department", department_id=dept.pk),
+        CalendarScope("employee", department_id=dept.pk, employee_id=profile.pk),
+    ]
+    return {
+        "admin_dashboard": [
+            summary_rows([dept.pk]),
+            dashboards.recent_notifications(user),
+        ],
+        "manager_dashboard": [
+            dashboards.department_employees(dept),
+            dashboards.department_monthly_metrics(dept),
+            dashboards.department_recent_leaves(dept),
+        ],
+        "employee_dashboard": [
+            dashboards.employee_recent_attendance(profile),
+            dashboards.employee_recent_salary(profile),
+            dashboards.employee_recent_leaves(profile),
+        ],
+        "bulk_attendance": [
+            dashboards.department_day_attendance(dept, day),
+        ],
+        "apply_leave (overlap check)": [
+            overlap_candidates(profile.pk, day)[:1],
+        ],
+        "leave_queue": [
+            page_query(pending_leaves_for(admin), QUEUE_ORDER, LEAVE_QUEUE_PAGE_SIZE),
+            page_query(pending_leaves_for(manager), QUEUE_ORDER, LEAVE_QUEUE_PAGE_SIZE),
+        ],
+        "export_attendance_csv (date range)": [
+            attendance_values(filter_attendance(Attendance.objects.all(), start=day - timedelta(days=7), end=day)),
+        ],
+        "export_salary_excel (month)": [
+            salary_values(filter_salary(Salary.objects.all(), month=day.strftime("%Y-%m"))),
+        ],
+        "attendance_events": [
+            rows(scope, start, end) for scope in scopes for rows in (detail_rows, summary_counts)
+        ],
+        "notifications": [
+            page_query(Notification.objects.filter(user=user), LIST_ORDER, NOTIFICATION_PAGE_SIZE),
+            unread_counts([user.pk]),
+        ],
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database and EXPLAIN every view's queries, "
+        "failing if any of them scans a large table"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000, help="Attendance rows to seed")
+        parser.add_argument("--employees", type=int, default=2000)
+        parser.add_argument("--keepdb", action="store_true", help="Reuse the test database if it exists")
+
+    def handle(self, *args, **options):
+        self.verbosity = options["verbosity"]
+        if connection.vendor not in ("sqlite", "postgresql"):
+            raise CommandError(f"Query plans can only be checked on SQLite or PostgreSQL, not {connection.vendor}")
+        with scratch_database(keepdb=options["keepdb"]):
+            if not EmployeeProfile.objects.exists():
+                started = time.perf_counter()
+                self.seed(options["employees"], options["rows"])
+                self.stdout.write(f"Seeded in {time.perf_counter() - started:.1f}s")
+            failures = self.check_plans()
+        if failures:
+            raise CommandError(f"{failures} queries fall back to a full table scan")
+        self.stdout.write(self.style.SUCCESS("All view queries use an index"))
+
+    def seed(self, employee_count, attendance_rows):
+        # seed_company marks weekdays only, so cover enough calendar days for ``attendance_rows``
+        days = max(1, attendance_rows // employee_count * 7 // 5)
+        seed_company(departments=max(1, employee_count // 40), employees=employee_count, days=days, months=24, prefix="plan")
+
+    def explain(self, qs):
+        sql, params = qs.query.sql_with_params()
+        with connection.cursor() as cursor:
+            if connection.vendor == "sqlite":
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+                lines = [row[-1] for row in cursor.fetchall()]
+                scans = [m.group(1) for m in map(SQLITE_SCAN.match, lines) if m and "INDEX" not in m.group(2)]
+            else:
+                cursor.execute(f"EXPLAIN {sql}", params)
+                lines = [row[0] for row in cursor.fetchall()]
+                scans = [m.group(1) for line in lines for m in [POSTGRES_SCAN.search(line)] if m]
+        return lines, [table for table in scans if table in LARGE_TABLES]
+
+    def check_plans(self):
+        profile = EmployeeProfile.objects.select_related("user", "department__manager").order_by("pk").first()
+        day = Attendance.objects.order_by("-date").values_list("date", flat=True).first() or date.today()
+        dept = profile.department
+        failures = 0
+        for view, querysets in view_queries(dept, profile, profile.user, dept.manager, day).items():
+            for qs in querysets:
+                lines, scans = self.explain(qs)
+                if scans:
+                    failures += 1
+                    self.stdout.write(self.style.ERROR(f"FULL SCAN in {view}: {', '.join(scans)}"))
+                    for line in lines:
+                        self.stdout.write(f"    {line}")
+                elif self.verbosity > 1:
+                    self.stdout.write(f"ok {view}: {' | '.join(lines)}")
+        return failures
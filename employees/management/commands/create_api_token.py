@@ -0,0 +1,19 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from employees.api import issue_token
+
+
+class Command(BaseCommand):
+    help = "Create a bearer token for the JSON API at /api/v1/; the key is printed once and only its digest is stored"
+
+    def add_arguments(self, parser):
+        parser.add_argument("username")
+        parser.add_argument("--name", default="api", help="Label shown in the admin, e.g. the integration using it")
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=options["username"]).first()
+        if user is None:
+            raise CommandError(f"No user named {options['username']!r}")
+        key = issue_token(user, options["name"])
+        self.stdout.write(key)
@@ -0,0 +1,50 @@
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from employees.onboarding import IMPORT_BATCH_SIZE, import_employees
+
+class Command(BaseCommand):
+    help = "Bulk-create employees (user, Employee group, profile) from a CSV or XLSX file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+        parser.add_argument("--workers", type=int, default=None, help="Password hashing processes")
+        parser.add_argument("--report", help="Write the per-row report (CSV) here; '-' for stdout")
+        parser.add_argument("--base-url", default="", help="Prefix for invite links, e.g. https://ems.example.com")
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        if not path.exists():
+            raise CommandError(f"{path} does not exist")
+
+        def progress(result):
+            if options["verbosity"] > 1:
+                self.stderr.write(f"{result.created} created, {result.failed} rejected")
+
+        with path.open("rb") as fileobj:
+            try:
+                result = import_employees(
+                    fileobj,
+                    path.name,
+                    batch_size=options["batch_size"],
+                    workers=options["workers"],
+                    base_url=options["base_url"],
+                    progress=progress,
+                )
+            except ValueError as exc:
+                raise CommandError(str(exc))
+
+        if options["report"] == "-":
+            result.write_report(sys.stdout)
+        elif options["report"]:
+            with open(options["report"], "w", newline="") as out:
+                result.write_report(out)
+        self.stdout.write(
+            f"{result.created} created, {result.failed} rejected in {result.elapsed:.1f}s "
+            f"({result.rows_per_second:.0f} rows/s)"
+        )
+        for row in result.errors()[:20]:
+            self.stdout.write(self.style.WARNING(f"line {row['line']}: {row['errors']}"))
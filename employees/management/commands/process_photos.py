@@ -0,0 +1,31 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from employees.models import EmployeeProfile
+from employees.photos import PHOTO_DIR, run_in_worker
+
+
+class Command(BaseCommand):
+    help = (
+        "Downscale, re-encode and thumbnail employee photos that were uploaded before the photo "
+        "pipeline existed or whose background processing did not finish"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=settings.PHOTO_WORKERS)
+
+    def handle(self, *args, **options):
+        pending = list(
+            EmployeeProfile.objects.exclude(photo__isnull=True).exclude(photo="")
+            .exclude(photo__startswith=PHOTO_DIR).values_list("pk", "photo")
+        )
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, options["workers"])) as pool:
+            done = sum(pool.map(lambda item: run_in_worker(*item), pending))
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {done} of {len(pending)} photos in {elapsed:.1f}s" + (" (see the log for failures)" if done < len(pending) else "")
+        ))
@@ -0,0 +1,16 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from employees.metrics import rebuild
+
+class Command(BaseCommand):
+    help = "Recompute all department dashboard metrics from the source tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--department", type=int, action="append", help="Only rebuild these department ids")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        rows = rebuild(department_ids=options["department"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} metric rows in {time.perf_counter() - started:.2f}s"))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from employees.search import fts_enabled, rebuild_index
+
+class Command(BaseCommand):
+    help = "Rebuild the employee directory full-text index (SQLite FTS5)"
+
+    def handle(self, *args, **options):
+        if not fts_enabled():
+            self.stdout.write("Full-text index is only used on SQLite; nothing to do")
+            return
+        count = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} employee profiles"))
@@ -0,0 +1,25 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from employees.jobs import requeue_stale_jobs, worker_loop
+
+class Command(BaseCommand):
+    help = "Run a pool of workers that generate queued export files"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=settings.EXPORT_WORKERS)
+        parser.add_argument("--poll-interval", type=float, default=2.0)
+        parser.add_argument("--once", action="store_true", help="Exit when the queue is empty")
+
+    def handle(self, *args, **options):
+        requeued = requeue_stale_jobs()
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} stale job(s)")
+        workers = max(1, options["workers"])
+        self.stdout.write(self.style.SUCCESS(f"Export worker started with {workers} thread(s)"))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(worker_loop, options["poll_interval"], options["once"]) for _ in range(workers)]
+            for future in futures:
+                future.result()
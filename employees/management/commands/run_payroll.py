@@ -0,0 +1,67 @@
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from employees.models import Department, PayrollRun
+from employees.payroll import PAYROLL_CHUNK_SIZE, execute_payroll_run, month_bounds
+
+class Command(BaseCommand):
+    help = "Generate Salary rows for a month from salary templates (idempotent and resumable)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--month", help="Month to pay, e.g. 2025-01")
+        parser.add_argument("--department", type=int, help="Department id (default: whole company)")
+        parser.add_argument("--bonus-percent", type=Decimal, default=Decimal("0"))
+        parser.add_argument("--deduct-absences", action="store_true")
+        parser.add_argument("--overwrite", action="store_true", help="Replace existing salaries for the month")
+        parser.add_argument("--chunk-size", type=int, default=PAYROLL_CHUNK_SIZE)
+        parser.add_argument("--resume", type=int, metavar="RUN_ID", help="Continue an interrupted run")
+
+    def handle(self, *args, **options):
+        if options["resume"]:
+            run = PayrollRun.objects.filter(pk=options["resume"]).first()
+            if run is None:
+                raise CommandError(f"Payroll run {options['resume']} does not exist")
+            if run.status == "Done":
+                raise CommandError(f"Payroll run {run.pk} already finished")
+        else:
+            try:
+                month_bounds(options["month"])
+            except ValueError as exc:
+                raise CommandError(str(exc))
+            department = None
+            if options["department"]:
+                department = Department.objects.filter(pk=options["department"]).first()
+                if department is None:
+                    raise CommandError(f"Department {options['department']} does not exist")
+            run = PayrollRun.objects.create(
+                month=options["month"],
+                department=department,
+                bonus_percent=options["bonus_percent"],
+                deduct_absences=options["deduct_absences"],
+                overwrite=options["overwrite"],
+            )
+        self.stdout.write(f"Payroll run {run.pk}: {run.month}, {run.department or 'all departments'}")
+
+        chunks = []
+
+        def progress(count, seconds):
+            chunks.append(seconds)
+            if options["verbosity"] > 1:
+                self.stdout.write(f"  chunk {len(chunks)}: {count} employees in {seconds * 1000:.0f} ms")
+
+        started = time.perf_counter()
+        run = execute_payroll_run(run, chunk_size=options["chunk_size"], progress=progress)
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"Employees processed: {run.processed}, salaries created: {run.created_rows}, "
+            f"skipped (already paid): {run.skipped_rows}"
+        )
+        if chunks:
+            self.stdout.write(
+                f"{len(chunks)} chunk(s) in {elapsed:.2f}s, slowest {max(chunks) * 1000:.0f} ms, "
+                f"{sum(chunks) / len(chunks) * 1000:.0f} ms avg, {run.processed / elapsed:.0f} employees/s"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Payroll run {run.pk} done"))
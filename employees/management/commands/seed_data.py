@@ -0,0 +1,49 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from employees.seeding import seed_company
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with a synthetic company: departments, employees, weekday attendance "
+        "and monthly salaries, leaves and notifications"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--departments", type=int, default=50)
+        parser.add_argument("--employees", type=int, default=100_000)
+        parser.add_argument("--days", type=int, default=365, help="Days of attendance history")
+        parser.add_argument("--months", type=int, default=12, help="Months of salaries, leaves and notifications")
+        parser.add_argument("--seed", type=int, default=42, help="Random seed, for repeatable data")
+        parser.add_argument("--password", default="password", help="Password for every seeded user")
+        parser.add_argument("--prefix", default="emp", help="Username prefix (<prefix>-admin, <prefix>-manager0, <prefix>0, ...)")
+
+    def handle(self, *args, **options):
+        prefix = options["prefix"]
+        if User.objects.filter(username=f"{prefix}-admin").exists():
+            raise CommandError(f"A company with prefix {prefix!r} is already seeded; pass another --prefix")
+        if options["departments"] < 1 or options["employees"] < 2:
+            raise CommandError("Seed at least one department and two employees")
+        started = time.perf_counter()
+
+        def progress(stage, count):
+            self.stdout.write(f"{time.perf_counter() - started:7.1f}s  {stage}" + (f": {count:,} rows" if count else ""))
+
+        counts = seed_company(
+            departments=options["departments"],
+            employees=options["employees"],
+            days=options["days"],
+            months=options["months"],
+            seed=options["seed"],
+            password=options["password"],
+            prefix=prefix,
+            progress=progress,
+        )
+        total = sum(counts.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {total:,} rows in {time.perf_counter() - started:.1f}s. "
+            f"Log in as {prefix}-admin, {prefix}-manager0 or {prefix}0 with password {options['password']!r}."
+        ))
@@ -0,0 +1,55 @@
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+
+from employees.changelog import TRACKED, read_changes
+
+
+class Command(BaseCommand):
+    help = (
+        "Write change log entries after a checkpoint to stdout as NDJSON, one change per line, "
+        "so a sync job can apply only what changed since its last run"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", type=int, default=0, help="Last seq already applied")
+        parser.add_argument(
+            "--checkpoint",
+            help="File holding the last seq applied: read at start (overriding --since) and rewritten after each batch",
+        )
+        parser.add_argument("--models", nargs="+", choices=sorted(TRACKED), help="Only these models")
+        parser.add_argument("--batch", type=int, default=5000, help="Entries read per query")
+        parser.add_argument("--follow", action="store_true", help="Keep polling for new changes instead of exiting")
+        parser.add_argument("--interval", type=float, default=5, help="Seconds between polls with --follow")
+
+    def handle(self, *args, **options):
+        since = options["since"]
+        path = options["checkpoint"]
+        if path and os.path.exists(path):
+            with open(path) as f:
+                try:
+                    since = int(f.read().strip() or 0)
+                except ValueError:
+                    raise CommandError(f"{path} does not hold a change log seq")
+        streamed = 0
+        while True:
+            changes = read_changes(since, options["models"], options["batch"])
+            for change in changes:
+                self.stdout.write(json.dumps(change, cls=DjangoJSONEncoder))
+            if changes:
+                since = changes[-1]["seq"]
+                streamed += len(changes)
+                self.stdout.flush()
+                if path:
+                    # Written after the batch is out, so a crash repeats changes rather than losing them
+                    with open(f"{path}.tmp", "w") as f:
+                        f.write(str(since))
+                    os.replace(f"{path}.tmp", path)
+            if len(changes) < options["batch"]:
+                if not options["follow"]:
+                    break
+                time.sleep(options["interval"])
+        self.stderr.write(f"Streamed {streamed} changes; checkpoint {since}")
@@ -0,0 +1,94 @@
+"""Employee x day attendance grid for one department and month.
+
+Attendance comes back from a single query as (employee, day, status) tuples
+and is scattered into a small integer matrix; totals per employee and
+headcounts per day are column/row sums over it.
+"""
+import csv
+import tempfile
+
+import numpy as np
+from django.utils.safestring import mark_safe
+from openpyxl import Workbook
+
+from .exports import SPOOL_MAX_SIZE, full_name
+from .metrics import month_range
+from .models import Attendance, EmployeeProfile
+
+STATUSES = ["Present", "Absent", "Leave"]
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES, start=1)}
+STATUS_LETTERS = ["", "P", "A", "L"]
+# Pre-rendered cells: a 2,000 x 31 grid is 62,000 cells, too many for template loops
+CELL_HTML = ['<td class="att-none"></td>'] + [
+    f'<td class="att-{letter.lower()}" title="{status}">{letter}</td>'
+    for letter, status in zip(STATUS_LETTERS[1:], STATUSES)
+]
+
+
+class AttendanceMatrix:
+    def __init__(self, department, month):
+        self.department = department
+        self.month = month
+        first, following = month_range(month)
+        self.days = (following - first).days
+        self.employees = list(
+            EmployeeProfile.objects.filter(department=department)
+            .order_by("employee_id", "pk")
+            .values_list("pk", "employee_id", full_name("user__"))
+        )
+        index = {pk: row for row, (pk, _, _) in enumerate(self.employees)}
+        records = list(
+            Attendance.objects.filter(employee__department=department, date__gte=first, date__lt=following)
+            .order_by()
+            .values_list("employee_id", "date", "status")
+        )
+        self.grid = np.zeros((len(self.employees), self.days), dtype=np.uint8)
+        if records:
+            employee_pks, days, statuses = zip(*records)
+            rows = np.fromiter((index[pk] for pk in employee_pks), dtype=np.intp, count=len(records))
+            columns = np.fromiter((day.day for day in days), dtype=np.intp, count=len(records)) - 1
+            self.grid[rows, columns] = np.fromiter(
+                (STATUS_CODES[s] for s in statuses), dtype=np.uint8, count=len(records),
+            )
+        # counts[e, k] and headcounts[d, k]: how often status k+1 occurs per employee / per day
+        codes = np.arange(1, len(STATUSES) + 1, dtype=np.uint8)
+        marks = self.grid[:, :, None] == codes
+        self.totals = marks.sum(axis=1)
+        self.headcounts = marks.sum(axis=0)
+
+    def day_numbers(self):
+        return range(1, self.days + 1)
+
+    def rows(self):
+        """(employee_id, name, status letters, [present, absent, leave]) per employee."""
+        for (_, employee_id, name), codes, totals in zip(self.employees, self.grid.tolist(), self.totals.tolist()):
+            yield employee_id, name, [STATUS_LETTERS[c] for c in codes], totals
+
+    def html_rows(self):
+        for (_, employee_id, name), codes, totals in zip(self.employees, self.grid.tolist(), self.totals.tolist()):
+            yield employee_id, name, mark_safe("".join([CELL_HTML[c] for c in codes])), totals
+
+    def header(self):
+        return ["EMP ID", "Name"] + [str(day) for day in self.day_numbers()] + STATUSES
+
+    def footer(self):
+        return ["", "Headcount"] + [f"{p}/{a}/{l}" for p, a, l in self.headcounts.tolist()] + self.totals.sum(axis=0).tolist()
+
+    def write_csv(self, fileobj):
+        writer = csv.writer(fileobj)
+        writer.writerow(self.header())
+        for employee_id, name, letters, totals in self.rows():
+            writer.writerow([employee_id, name, *letters, *totals])
+        writer.writerow(self.footer())
+
+    def workbook_file(self):
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet(f"{self.month}"[:31])
+        ws.append(self.header())
+        for employee_id, name, letters, totals in self.rows():
+            ws.append([employee_id, name, *letters, *totals])
+        ws.append(self.footer())
+        fileobj = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        wb.save(fileobj)
+        fileobj.seek(0)
+        return fileobj
@@ -0,0 +1,190 @@
+"""Per-department rollups behind the dashboards.
+
+Writes only mark (employee, month) buckets as dirty. The dirty buckets are
+recomputed once when the surrounding transaction commits, so a cascade
+delete or a bulk upsert costs one refresh per bucket rather than one per row.
+Bulk writers that bypass model signals (bulk_create, update()) call
+``mark_employee_months`` / ``mark_employee_summaries`` themselves.
+"""
+import threading
+from collections import defaultdict
+from datetime import date
+
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+
+from .models import Attendance, Department, DepartmentMetrics, EmployeeProfile, Leave, Salary
+
+SUMMARY_MONTH = ""
+ATTENDANCE_FIELDS = {"Present": "present", "Absent": "absent", "Leave": "on_leave"}
+MONTH_FIELDS = ["present", "absent", "on_leave", "payroll_total", "payroll_count"]
+SUMMARY_FIELDS = ["headcount", "pending_leaves"]
+
+_pending = threading.local()
+
+
+def month_key(day):
+    # Works for date objects and ISO strings alike
+    return str(day)[:7]
+
+
+def month_range(month):
+    year, number = (int(part) for part in month.split("-"))
+    first = date(year, number, 1)
+    following = date(year + number // 12, number % 12 + 1, 1)
+    return first, following
+
+
+def _dirty():
+    if not hasattr(_pending, "state"):
+        _pending.state = {"months": set(), "summaries": set(), "departments": set()}
+    return _pending.state
+
+
+def _schedule():
+    if not connection.in_atomic_block:
+        flush()
+    elif not any(entry[1] is flush for entry in connection.run_on_commit):
+        transaction.on_commit(flush)
+
+
+def mark_employee_months(pairs):
+    _dirty()["months"].update((pk, month) for pk, month in pairs if pk and month)
+    _schedule()
+
+
+def mark_employee_summaries(employee_pks):
+    _dirty()["summaries"].update(pk for pk in employee_pks if pk)
+    _schedule()
+
+
+def mark_departments(department_pks):
+    _dirty()["departments"].update(pk for pk in department_pks if pk)
+    _schedule()
+
+
+def flush():
+    state = _dirty()
+    months, summaries, departments = state["months"], state["summaries"], state["departments"]
+    del _pending.state
+    employee_pks = {pk for pk, _ in months} | summaries
+    dept_of = dict(
+        EmployeeProfile.objects.filter(pk__in=employee_pks, department__isnull=False)
+        .values_list("pk", "department_id")
+    ) if employee_pks else {}
+    # Departments deleted in the same transaction have nothing left to rebuild
+    departments = set(Department.objects.filter(pk__in=departments).values_list("pk", flat=True)) if departments else set()
+    if departments:
+        rebuild(department_ids=departments)
+    buckets = {(dept_of[pk], month) for pk, month in months if pk in dept_of}
+    summary_depts = {dept_of[pk] for pk in summaries if pk in dept_of}
+    for dept_id, month in buckets:
+        if dept_id not in departments:
+            refresh_month(dept_id, month)
+    for dept_id in summary_depts - departments:
+        refresh_summary(dept_id)
+
+
+def _upsert(rows, fields):
+    DepartmentMetrics.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["department", "month"],
+        update_fields=fields + ["updated"],
+    )
+
+
+def refresh_summary(dept_id):
+    row = DepartmentMetrics(
+        department_id=dept_id,
+        month=SUMMARY_MONTH,
+        headcount=EmployeeProfile.objects.filter(department_id=dept_id).count(),
+        pending_leaves=Leave.objects.filter(employee__department_id=dept_id, status="Pending").count(),
+    )
+    _upsert([row], SUMMARY_FIELDS)
+
+
+def refresh_month(dept_id, month):
+    row = DepartmentMetrics(department_id=dept_id, month=month)
+    try:
+        first, following = month_range(month)
+    except ValueError:
+        first = None
+    if first:
+        counts = (
+            Attendance.objects.filter(employee__department_id=dept_id, date__gte=first, date__lt=following)
+            .order_by()
+            .values_list("status")
+            .annotate(Count("id"))
+        )
+        for status, count in counts:
+            setattr(row, ATTENDANCE_FIELDS[status], count)
+    payroll = Salary.objects.filter(employee__department_id=dept_id, month=month).aggregate(
+        total=Sum("total_salary"), count=Count("id"),
+    )
+    row.payroll_total = payroll["total"] or 0
+    row.payroll_count = payroll["count"]
+    _upsert([row], MONTH_FIELDS)
+
+
+def rebuild(department_ids=None):
+    """Recompute every rollup from scratch with a handful of GROUP BY queries."""
+    profiles = EmployeeProfile.objects.filter(department__isnull=False)
+    attendance = Attendance.objects.filter(employee__department__isnull=False)
+    salaries = Salary.objects.filter(employee__department__isnull=False)
+    leaves = Leave.objects.filter(employee__department__isnull=False, status="Pending")
+    existing = DepartmentMetrics.objects.all()
+    if department_ids is not None:
+        profiles = profiles.filter(department_id__in=department_ids)
+        attendance = attendance.filter(employee__department_id__in=department_ids)
+        salaries = salaries.filter(employee__department_id__in=department_ids)
+        leaves = leaves.filter(employee__department_id__in=department_ids)
+        existing = existing.filter(department_id__in=department_ids)
+
+    rows = defaultdict(dict)
+    for dept_id, count in profiles.order_by().values_list("department_id").annotate(Count("id")):
+        rows[dept_id, SUMMARY_MONTH]["headcount"] = count
+    for dept_id, count in leaves.order_by().values_list("employee__department_id").annotate(Count("id")):
+        rows[dept_id, SUMMARY_MONTH]["pending_leaves"] = count
+    by_month = (
+        attendance.order_by()
+        .annotate(month=TruncMonth("date"))
+        .values_list("employee__department_id", "month", "status")
+        .annotate(Count("id"))
+    )
+    for dept_id, month, status, count in by_month:
+        rows[dept_id, month_key(month)][ATTENDANCE_FIELDS[status]] = count
+    payroll = (
+        salaries.order_by()
+        .values_list("employee__department_id", "month")
+        .annotate(Sum("total_salary"), Count("id"))
+    )
+    for dept_id, month, total, count in payroll:
+        rows[dept_id, month].update(payroll_total=total, payroll_count=count)
+    for dept_id in department_ids if department_ids is not None else Department.objects.values_list("pk", flat=True):
+        # Every department gets a summary row, even an empty one
+        rows[dept_id, SUMMARY_MONTH]
+
+    with transaction.atomic():
+        existing.delete()
+        DepartmentMetrics.objects.bulk_create(
+            [DepartmentMetrics(department_id=dept_id, month=month, **values) for (dept_id, month), values in rows.items()],
+            batch_size=1000,
+        )
+    return len(rows)
+
+
+def summary_rows(department_ids):
+    return DepartmentMetrics.objects.filter(department_id__in=department_ids, month=SUMMARY_MONTH)
+
+
+def department_summaries(departments):
+    """Summary rows keyed by department pk, rebuilding any that are missing."""
+    pks = [d.pk for d in departments]
+    summaries = {m.department_id: m for m in summary_rows(pks)}
+    missing = [pk for pk in pks if pk not in summaries]
+    if missing:
+        rebuild(department_ids=missing)
+        summaries.update((m.department_id, m) for m in summary_rows(missing))
+    return summaries
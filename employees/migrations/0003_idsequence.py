@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-17 14:05
+
+import re
+
+from django.db import migrations, models
+
+
+def seed_employee_id_sequence(apps, schema_editor):
+    EmployeeProfile = apps.get_model("employees", "EmployeeProfile")
+    IdSequence = apps.get_model("employees", "IdSequence")
+    highest = 0
+    for employee_id in EmployeeProfile.objects.values_list("employee_id", flat=True):
+        match = re.match(r"^EMP(\d+)$", employee_id or "")
+        if match:
+            highest = max(highest, int(match.group(1)))
+    IdSequence.objects.update_or_create(name="employee_id", defaults={"value": highest})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("employees", "0002_exportjob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IdSequence",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=50, unique=True)),
+                ("value", models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_employee_id_sequence, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-17 14:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("employees", "0004_payroll"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DepartmentMetrics",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("month", models.CharField(blank=True, max_length=20)),
+                ("headcount", models.PositiveIntegerField(default=0)),
+                ("pending_leaves", models.PositiveIntegerField(default=0)),
+                ("present", models.PositiveIntegerField(default=0)),
+                ("absent", models.PositiveIntegerField(default=0)),
+                ("on_leave", models.PositiveIntegerField(default=0)),
+                (
+                    "payroll_total",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=16),
+                ),
+                ("payroll_count", models.PositiveIntegerField(default=0)),
+                ("updated", models.DateTimeField(auto_now=True)),
+                (
+                    "department",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="metrics",
+                        to="employees.department",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["department", "month"],
+                "unique_together": {("department", "month")},
+            },
+        ),
+    ]
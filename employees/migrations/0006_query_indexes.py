@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-17 14:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("employees", "0005_departmentmetrics"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="attendance",
+            index=models.Index(fields=["-date"], name="attendance_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="leave",
+            index=models.Index(
+                fields=["employee", "-applied_on"], name="leave_employee_applied_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="leave",
+            index=models.Index(
+                fields=["status", "-applied_on"], name="leave_status_applied_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="leave",
+            index=models.Index(
+                condition=models.Q(("status", "Pending")),
+                fields=["employee"],
+                name="leave_pending_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["user", "-created"], name="notification_user_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                condition=models.Q(("read", False)),
+                fields=["user"],
+                name="notification_unread_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="salary",
+            index=models.Index(fields=["month"], name="salary_month_idx"),
+        ),
+    ]
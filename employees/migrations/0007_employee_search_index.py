@@ -0,0 +1,38 @@
+from django.db import migrations
+
+FTS_TABLE = "employees_employee_fts"
+
+
+def create_search_index(apps, schema_editor):
+    # FTS5 is SQLite-only; other databases search with LIKE instead
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+        "USING fts5(employee_id, name, designation, department, tokenize='unicode61')"
+    )
+    schema_editor.execute(
+        f"INSERT INTO {FTS_TABLE} (rowid, employee_id, name, designation, department) "
+        "SELECT p.id, COALESCE(p.employee_id, ''), "
+        "TRIM(u.first_name || ' ' || u.last_name || ' ' || u.username), "
+        "p.designation, COALESCE(d.name, '') "
+        "FROM employees_employeeprofile p "
+        "JOIN auth_user u ON u.id = p.user_id "
+        "LEFT JOIN employees_department d ON d.id = p.department_id"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("employees", "0006_query_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-17 14:26
+
+import django.db.models.deletion
+import employees.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("employees", "0008_notificationcounter"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LeaveBalance",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("year", models.PositiveSmallIntegerField()),
+                (
+                    "allowance",
+                    models.PositiveSmallIntegerField(
+                        default=employees.models.default_leave_allowance
+                    ),
+                ),
+                ("used", models.PositiveSmallIntegerField(default=0)),
+                ("pending", models.PositiveSmallIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="leave",
+            index=models.Index(
+                fields=["employee", "start_date", "end_date"], name="leave_interval_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="leavebalance",
+            name="employee",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="leave_balances",
+                to="employees.employeeprofile",
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="leavebalance",
+            unique_together={("employee", "year")},
+        ),
+    ]
@@ -0,0 +1,99 @@
+# Generated by Django 5.2.18 on 2026-10-17 14:53
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("employees", "0009_leave_balances"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ApiToken",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100)),
+                ("key_digest", models.CharField(max_length=64, unique=True)),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("last_used", models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="attendance",
+            name="updated",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="department",
+            name="updated",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="employeeprofile",
+            name="updated",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="leave",
+            name="updated",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="notification",
+            name="updated",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="salary",
+            name="updated",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name="attendance",
+            index=models.Index(fields=["updated", "id"], name="attendance_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="department",
+            index=models.Index(fields=["updated", "id"], name="department_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="employeeprofile",
+            index=models.Index(fields=["updated", "id"], name="profile_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="leave",
+            index=models.Index(fields=["updated", "id"], name="leave_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["updated", "id"], name="notification_updated_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="salary",
+            index=models.Index(fields=["updated", "id"], name="salary_updated_idx"),
+        ),
+        migrations.AddField(
+            model_name="apitoken",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="api_tokens",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
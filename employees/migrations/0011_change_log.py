@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-17 14:55
+
+import django.core.serializers.json
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("employees", "0010_api_sync"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="salarytemplate",
+            name="updated",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.CreateModel(
+            name="ChangeLogEntry",
+            fields=[
+                ("seq", models.BigAutoField(primary_key=True, serialize=False)),
+                ("model", models.CharField(max_length=30)),
+                ("object_id", models.BigIntegerField()),
+                (
+                    "action",
+                    models.CharField(
+                        choices=[("save", "Save"), ("delete", "Delete")], max_length=6
+                    ),
+                ),
+                ("changed", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "data",
+                    models.JSONField(
+                        encoder=django.core.serializers.json.DjangoJSONEncoder,
+                        null=True,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["model", "seq"], name="changelog_model_seq_idx"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-17 14:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("employees", "0011_change_log"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="employeeprofile",
+            name="photo_thumbnail",
+            field=models.ImageField(
+                blank=True, editable=False, null=True, upload_to="photos/"
+            ),
+        ),
+    ]
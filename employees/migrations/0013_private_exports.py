@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:16
+
+import employees.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("employees", "0012_photo_thumbnail"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="exportjob",
+            name="file",
+            field=models.FileField(
+                blank=True,
+                null=True,
+                storage=employees.models.export_storage,
+                upload_to=employees.models.export_file_path,
+            ),
+        ),
+    ]
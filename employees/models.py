@@ -1,10 +1,23 @@
+import secrets
+
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import User
+from django.core.files.storage import FileSystemStorage
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
 
 def employee_photo_path(instance, filename):
     return f"employees/{instance.employee_id or 'unknown'}/{filename}"
 
+def export_storage():
+    # No base_url: export files have no public URL
+    return FileSystemStorage(location=settings.EXPORT_ROOT, base_url=None)
+
+def export_file_path(instance, filename):
+    # A random directory keeps names unguessable while the download keeps its readable filename
+    return f"{secrets.token_hex(16)}/{filename}"
+
 class Department(models.Model):
     name = models.CharField(max_length=100, unique=True)
     manager = models.OneToOneField(
@@ -14,6 +27,12 @@ class Department(models.Model):
         blank=True,
         related_name="managed_department",
     )
+    # Set on every write (bulk updates and raw inserts pass it explicitly) so
+    # API clients can sync with ?updated_since=
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["updated", "id"], name="department_updated_idx")]
 
     def __str__(self):
         return self.name
@@ -22,10 +41,16 @@ class EmployeeProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     employee_id = models.CharField(max_length=20, unique=True, blank=True, null=True)
     photo = models.ImageField(upload_to=employee_photo_path, null=True, blank=True)
+    # Square crop of the processed photo, set by employees/photos.py
+    photo_thumbnail = models.ImageField(upload_to="photos/", null=True, blank=True, editable=False)
     department = models.ForeignKey(Department, on_delete=models.SET_NULL, null=True, blank=True)
     designation = models.CharField(max_length=100, blank=True)
     phone = models.CharField(max_length=15, blank=True)
     join_date = models.DateField(default=timezone.now)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["updated", "id"], name="profile_updated_idx")]
 
     def __str__(self):
         return f"{self.employee_id or self.user.username} - {self.user.get_full_name() or self.user.username}"
@@ -40,10 +65,16 @@ class Attendance(models.Model):
     date = models.DateField()
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="Present")
     note = models.TextField(blank=True)
+    updated = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ("employee", "date")
         ordering = ["-date"]
+        indexes = [
+            # Company-wide "latest first" listings and date-range exports
+            models.Index(fields=["-date"], name="attendance_date_idx"),
+            models.Index(fields=["updated", "id"], name="attendance_updated_idx"),
+        ]
 
     def __str__(self):
         return f"{self.employee.employee_id} - {self.date} - {self.status}"
@@ -60,10 +91,43 @@ class Leave(models.Model):
     reason = models.TextField()
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="Pending")
     applied_on = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["updated", "id"], name="leave_updated_idx"),
+            models.Index(fields=["employee", "-applied_on"], name="leave_employee_applied_idx"),
+            models.Index(fields=["status", "-applied_on"], name="leave_status_applied_idx"),
+            models.Index(fields=["employee"], condition=models.Q(status="Pending"), name="leave_pending_idx"),
+            # Overlap checks seek the latest leave starting on or before a date
+            models.Index(fields=["employee", "start_date", "end_date"], name="leave_interval_idx"),
+        ]
 
     def __str__(self):
         return f"{self.employee.employee_id} {self.start_date} to {self.end_date} ({self.status})"
 
+def default_leave_allowance():
+    from django.conf import settings
+    return settings.LEAVE_ANNUAL_ALLOWANCE
+
+class LeaveBalance(models.Model):
+    """Leave days for one employee and calendar year, maintained by employees.leaves."""
+    employee = models.ForeignKey(EmployeeProfile, on_delete=models.CASCADE, related_name="leave_balances")
+    year = models.PositiveSmallIntegerField()
+    allowance = models.PositiveSmallIntegerField(default=default_leave_allowance)
+    used = models.PositiveSmallIntegerField(default=0)
+    pending = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("employee", "year")
+
+    @property
+    def available(self):
+        return self.allowance - self.used - self.pending
+
+    def __str__(self):
+        return f"{self.employee_id} {self.year}: {self.used}+{self.pending}/{self.allowance}"
+
 class Salary(models.Model):
     employee = models.ForeignKey(EmployeeProfile, on_delete=models.CASCADE)
     month = models.CharField(max_length=20)  # e.g., "2025-01"
@@ -71,13 +135,22 @@ class Salary(models.Model):
     bonus = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     deductions = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     total_salary = models.DecimalField(max_digits=12, decimal_places=2, editable=False)
+    updated = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ("employee", "month")
         ordering = ["-month"]
+        indexes = [
+            models.Index(fields=["month"], name="salary_month_idx"),
+            models.Index(fields=["updated", "id"], name="salary_updated_idx"),
+        ]
+
+    @staticmethod
+    def compute_total(base_salary, bonus, deductions):
+        return (base_salary + bonus) - deductions
 
     def save(self, *args, **kwargs):
-        self.total_salary = (self.base_salary + self.bonus) - self.deductions
+        self.total_salary = self.compute_total(self.base_salary, self.bonus, self.deductions)
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -89,6 +162,172 @@ class Notification(models.Model):
     message = models.TextField()
     created = models.DateTimeField(auto_now_add=True)
     read = models.BooleanField(default=False)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["updated", "id"], name="notification_updated_idx"),
+            models.Index(fields=["user", "-created"], name="notification_user_created_idx"),
+            models.Index(fields=["user"], condition=models.Q(read=False), name="notification_unread_idx"),
+        ]
 
     def __str__(self):
         return f"Notif to {self.user.username}: {self.title}"
+
+class NotificationCounter(models.Model):
+    """Unread notification count per user, kept in step by employees.notifications."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="notification_counter")
+    unread = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.unread} unread"
+
+class ExportJob(models.Model):
+    KIND_CHOICES = (
+        ("attendance_csv", "Attendance CSV"),
+        ("salary_excel", "Salary Excel"),
+        ("salary_pdf", "Salary PDF"),
+    )
+    STATUS_CHOICES = (
+        ("Pending", "Pending"),
+        ("Running", "Running"),
+        ("Done", "Done"),
+        ("Failed", "Failed"),
+    )
+    ACTIVE_STATUSES = ("Pending", "Running")
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    params = models.JSONField(default=dict, blank=True)
+    params_hash = models.CharField(max_length=40)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="Pending")
+    progress = models.PositiveSmallIntegerField(default=0)
+    file = models.FileField(upload_to=export_file_path, storage=export_storage, null=True, blank=True)
+    error = models.TextField(blank=True)
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created"]
+        constraints = [
+            # Identical in-flight requests share one job
+            models.UniqueConstraint(
+                fields=["kind", "params_hash"],
+                condition=models.Q(status__in=("Pending", "Running")),
+                name="unique_active_export_job",
+            ),
+        ]
+        indexes = [models.Index(fields=["status", "created"])]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.pk} ({self.status})"
+
+class IdSequence(models.Model):
+    # Counter rows for allocators in employees/sequences.py
+    name = models.CharField(max_length=50, unique=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
+
+class SalaryTemplate(models.Model):
+    # Standing monthly pay used by payroll runs
+    employee = models.OneToOneField(EmployeeProfile, on_delete=models.CASCADE, related_name="salary_template")
+    base_salary = models.DecimalField(max_digits=10, decimal_places=2)
+    bonus = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    deductions = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.employee.employee_id} - {self.base_salary}"
+
+class PayrollRun(models.Model):
+    STATUS_CHOICES = (
+        ("Pending", "Pending"),
+        ("Running", "Running"),
+        ("Done", "Done"),
+        ("Failed", "Failed"),
+    )
+    month = models.CharField(max_length=20)  # e.g., "2025-01"
+    department = models.ForeignKey(Department, on_delete=models.SET_NULL, null=True, blank=True)
+    bonus_percent = models.DecimalField(max_digits=5, decimal_places=2, default=0)
+    deduct_absences = models.BooleanField(default=False)
+    overwrite = models.BooleanField(default=False)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="Pending")
+    # Resume point: templates are processed in employee pk order
+    last_employee_pk = models.BigIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    created_rows = models.PositiveIntegerField(default=0)
+    skipped_rows = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created"]
+
+    def __str__(self):
+        return f"Payroll {self.month} ({self.department or 'All departments'}) - {self.status}"
+
+class DepartmentMetrics(models.Model):
+    # Rollups kept current by employees/metrics.py. The row with month ""
+    # holds department-wide figures (headcount, pending leaves); the others
+    # hold attendance and payroll for one "YYYY-MM" month.
+    department = models.ForeignKey(Department, on_delete=models.CASCADE, related_name="metrics")
+    month = models.CharField(max_length=20, blank=True)
+    headcount = models.PositiveIntegerField(default=0)
+    pending_leaves = models.PositiveIntegerField(default=0)
+    present = models.PositiveIntegerField(default=0)
+    absent = models.PositiveIntegerField(default=0)
+    on_leave = models.PositiveIntegerField(default=0)
+    payroll_total = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    payroll_count = models.PositiveIntegerField(default=0)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("department", "month")
+        ordering = ["department", "month"]
+
+    @property
+    def attendance_total(self):
+        return self.present + self.absent + self.on_leave
+
+    @property
+    def payroll_average(self):
+        return self.payroll_total / self.payroll_count if self.payroll_count else 0
+
+    def __str__(self):
+        return f"{self.department} {self.month or 'summary'}"
+
+class ApiToken(models.Model):
+    """Bearer token for the JSON API; only a SHA-256 digest of the key is stored."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="api_tokens")
+    name = models.CharField(max_length=100)
+    key_digest = models.CharField(max_length=64, unique=True)
+    created = models.DateTimeField(auto_now_add=True)
+    last_used = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.user.username})"
+
+class ChangeLogEntry(models.Model):
+    """One write to a synced model, in commit order; see employees/changelog.py."""
+    ACTION_CHOICES = (
+        ("save", "Save"),
+        ("delete", "Delete"),
+    )
+    seq = models.BigAutoField(primary_key=True)
+    model = models.CharField(max_length=30)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=6, choices=ACTION_CHOICES)
+    changed = models.DateTimeField(default=timezone.now)
+    # Field values after the write; null for deletes
+    data = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+
+    class Meta:
+        indexes = [models.Index(fields=["model", "seq"], name="changelog_model_seq_idx")]
+
+    def __str__(self):
+        return f"#{self.seq} {self.action} {self.model} {self.object_id}"
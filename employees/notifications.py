@@ -0,0 +1,232 @@
+"""Notification bookkeeping and fan-out.
+
+Each user's unread count lives in a NotificationCounter row that is moved
+with single UPDATEs as notifications are created and read, so the badge on
+every page is one primary-key read, or none when a shared cache backend
+holds it. A missing counter row is rebuilt from the notifications
+themselves on first read.
+
+``notify`` sends one notification to many users: recipients are resolved
+with a single query, rows are bulk-inserted in chunks, and optional emails
+are handed to a small thread pool once the rows are committed.
+"""
+import logging
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .changelog import log_rows, log_saved
+from .models import Notification, NotificationCounter
+from .roles import shared_cache
+
+UNREAD_CACHE_PREFIX = "ems:unread:"
+COUNTER_CHUNK_SIZE = 1000
+NOTIFICATION_CHUNK_SIZE = 1000
+EMAIL_BATCH_SIZE = 100
+# Keyset order of the notifications page, newest first
+LIST_ORDER = ["-created", "-id"]
+
+logger = logging.getLogger(__name__)
+
+
+def unread_cache_key(user_id):
+    return f"{UNREAD_CACHE_PREFIX}{user_id}"
+
+
+def _invalidate(user_ids):
+    keys = [unread_cache_key(user_id) for user_id in user_ids]
+    # After commit, so a concurrent reader cannot cache the pre-commit value
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def unread_counts(user_ids):
+    """(user_id, unread) pairs for users with unread notifications."""
+    return (
+        Notification.objects.filter(user_id__in=user_ids, read=False)
+        .order_by()
+        .values_list("user_id")
+        .annotate(Count("id"))
+    )
+
+
+def recount_unread(user_ids):
+    """Rewrite the counters for ``user_ids`` from the notifications table."""
+    user_ids = list(user_ids)
+    counts = dict.fromkeys(user_ids, 0)
+    counts.update(unread_counts(user_ids))
+    NotificationCounter.objects.bulk_create(
+        [NotificationCounter(user_id=user_id, unread=count) for user_id, count in counts.items()],
+        update_conflicts=True,
+        unique_fields=["user"],
+        update_fields=["unread"],
+    )
+    _invalidate(user_ids)
+    return counts
+
+
+def unread_count(user):
+    if not user.is_authenticated:
+        return 0
+    # A per-process cache would keep showing the old badge in other workers
+    # after a read, so without a shared backend the counter row is read each time
+    key = unread_cache_key(user.pk)
+    count = cache.get(key) if shared_cache() else None
+    if count is None:
+        count = NotificationCounter.objects.filter(user_id=user.pk).values_list("unread", flat=True).first()
+        if count is None:
+            count = recount_unread([user.pk])[user.pk]
+        if shared_cache():
+            cache.set(key, count, settings.NOTIFICATION_CACHE_TIMEOUT)
+    return count
+
+
+def adjust_unread(user_ids, delta):
+    """Add ``delta`` to each user's counter with one UPDATE per chunk of users.
+
+    Users without a counter row are skipped; their count is rebuilt on first read.
+    """
+    user_ids = list(set(user_ids))
+    for start in range(0, len(user_ids), COUNTER_CHUNK_SIZE):
+        NotificationCounter.objects.filter(user_id__in=user_ids[start:start + COUNTER_CHUNK_SIZE]).update(
+            unread=Greatest(F("unread") + delta, 0)
+        )
+    _invalidate(user_ids)
+
+
+def mark_read(user, notification_id):
+    # Conditional UPDATE of the one column: a second click never decrements twice
+    with transaction.atomic():
+        updated = Notification.objects.filter(pk=notification_id, user=user, read=False).update(read=True, updated=timezone.now())
+        if updated:
+            log_rows(Notification.objects.filter(pk=notification_id))
+    if updated:
+        adjust_unread([user.pk], -updated)
+    return updated
+
+
+def mark_all_read(user):
+    with transaction.atomic():
+        pks = list(Notification.objects.filter(user=user, read=False).values_list("pk", flat=True))
+        updated = Notification.objects.filter(pk__in=pks, read=False).update(read=True, updated=timezone.now())
+        log_rows(Notification.objects.filter(pk__in=pks))
+        NotificationCounter.objects.filter(user=user).update(unread=0)
+    _invalidate([user.pk])
+    return updated
+
+
+def recipients(user_ids=None, department=None, group=None, everyone=False):
+    """Active users matching any of the selectors, as one queryset.
+
+    ``user_ids`` may be a list or a values() queryset (used as a subquery);
+    ``department`` covers its employees and its manager; ``group`` is a Group
+    or a group name.
+    """
+    if everyone:
+        return User.objects.filter(is_active=True)
+    condition = Q(pk__in=[])
+    if user_ids is not None:
+        condition |= Q(pk__in=user_ids)
+    if department is not None:
+        condition |= Q(employeeprofile__department=department) | Q(managed_department=department)
+    if group is not None:
+        condition |= Q(groups__name=group) if isinstance(group, str) else Q(groups=group)
+    return User.objects.filter(condition, is_active=True).distinct()
+
+
+class FanOut:
+    def __init__(self):
+        self.recipients = 0
+        self.resolve_seconds = 0.0
+        self.write_seconds = 0.0
+        self.emails_queued = 0
+
+
+def notify(title, message, user_ids=None, department=None, group=None, everyone=False, email=False,
+           chunk_size=NOTIFICATION_CHUNK_SIZE):
+    """Create a notification for every selected user; see ``recipients``."""
+    result = FanOut()
+    started = time.perf_counter()
+    targets = list(
+        recipients(user_ids, department, group, everyone).order_by("pk").values_list("pk", "email")
+    )
+    result.recipients = len(targets)
+    result.resolve_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for start in range(0, len(targets), chunk_size):
+        chunk = [pk for pk, _ in targets[start:start + chunk_size]]
+        with transaction.atomic():
+            log_saved(Notification.objects.bulk_create(
+                [Notification(user_id=pk, title=title, message=message) for pk in chunk]
+            ))
+            adjust_unread(chunk, 1)
+    result.write_seconds = time.perf_counter() - started
+
+    if email:
+        addresses = [address for _, address in targets if address]
+        result.emails_queued = len(addresses)
+        transaction.on_commit(lambda: queue_emails(title, message, addresses))
+    logger.info(
+        "notification fan-out: recipients=%d resolve_ms=%.1f write_ms=%.1f emails=%d",
+        result.recipients, result.resolve_seconds * 1000, result.write_seconds * 1000, result.emails_queued,
+    )
+    return result
+
+
+def notify_many(items, chunk_size=NOTIFICATION_CHUNK_SIZE):
+    """Create individual notifications from (user_id, title, message) tuples in bulk."""
+    items = list(items)
+    for start in range(0, len(items), chunk_size):
+        chunk = items[start:start + chunk_size]
+        with transaction.atomic():
+            log_saved(Notification.objects.bulk_create(
+                [Notification(user_id=user_id, title=title, message=message) for user_id, title, message in chunk]
+            ))
+            by_count = {}
+            for user_id, count in Counter(user_id for user_id, _, _ in chunk).items():
+                by_count.setdefault(count, []).append(user_id)
+            for count, user_ids in by_count.items():
+                adjust_unread(user_ids, count)
+    return len(items)
+
+
+_email_executor = None
+
+
+def _executor():
+    global _email_executor
+    if _email_executor is None:
+        _email_executor = ThreadPoolExecutor(
+            max_workers=settings.NOTIFICATION_EMAIL_WORKERS, thread_name_prefix="ems-email",
+        )
+    return _email_executor
+
+
+def send_email_batch(subject, body, addresses):
+    started = time.perf_counter()
+    # One backend connection for the whole batch
+    with get_connection(fail_silently=True) as connection:
+        sent = connection.send_messages([
+            EmailMessage(subject, body, settings.DEFAULT_FROM_EMAIL, [address]) for address in addresses
+        ])
+    logger.info(
+        "notification email batch: sent=%d of %d, send_ms=%.1f",
+        sent or 0, len(addresses), (time.perf_counter() - started) * 1000,
+    )
+    return sent or 0
+
+
+def queue_emails(subject, body, addresses):
+    return [
+        _executor().submit(send_email_batch, subject, body, addresses[start:start + EMAIL_BATCH_SIZE])
+        for start in range(0, len(addresses), EMAIL_BATCH_SIZE)
+    ]
@@ -0,0 +1,296 @@
+"""Bulk employee onboarding from CSV or XLSX files.
+
+Rows are streamed from the file and handled in batches: each batch is
+validated with a few set-based queries, passwords (when supplied) are hashed
+in a process pool, and users, group memberships and profiles are inserted
+with ``bulk_create`` inside one transaction per batch. Rows without a
+password get an unusable one plus an invite link to choose their own.
+"""
+import csv
+import io
+import time
+import zipfile
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher, make_password
+from django.contrib.auth.models import Group, User
+from django.contrib.auth.password_validation import validate_password
+from django.contrib.auth.tokens import default_token_generator
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import DatabaseError, transaction
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from openpyxl import load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
+
+from . import search
+from .caching import DEPARTMENTS, DIRECTORY, bump_versions
+from .changelog import log_rows
+from .metrics import mark_employee_summaries
+from .models import Department, EmployeeProfile
+from .passwords import PasswordHashPool, hasher_path
+from .sequences import EMPLOYEE_ID_SEQUENCE, advance_to, assign_employee_ids, parse_employee_id
+
+IMPORT_BATCH_SIZE = 500
+IMPORT_COLUMNS = (
+    "username", "email", "first_name", "last_name", "password",
+    "employee_id", "department", "designation", "phone", "join_date",
+)
+REQUIRED_COLUMNS = ("username", "email")
+MAX_LENGTHS = {
+    "username": 150, "first_name": 150, "last_name": 150, "email": 254,
+    "employee_id": 20, "designation": 100, "phone": 15,
+}
+REPORT_COLUMNS = ("line", "username", "status", "employee_id", "invite_url", "errors")
+username_validator = UnicodeUsernameValidator()
+
+
+def _clean_header(value):
+    return str(value or "").strip().lower().replace(" ", "_")
+
+
+def _clean_cell(value):
+    if value is None:
+        return ""
+    if hasattr(value, "date") and callable(value.date):
+        # openpyxl returns datetimes for date cells
+        return value.date().isoformat()
+    return str(value).strip()
+
+
+def _check_header(header):
+    missing = [column for column in REQUIRED_COLUMNS if column not in header]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+    return header
+
+
+def read_rows(fileobj, filename):
+    """Yield (line_number, row_dict) from an uploaded CSV or XLSX file.
+
+    A file that cannot be parsed raises ValueError, like a bad header.
+    """
+    try:
+        yield from _parse_rows(fileobj, filename)
+    except (csv.Error, zipfile.BadZipFile, InvalidFileException) as exc:
+        raise ValueError(f"Could not read {filename}: {exc}") from exc
+
+
+def _parse_rows(fileobj, filename):
+    if filename.lower().endswith(".xlsx"):
+        try:
+            workbook = load_workbook(fileobj, read_only=True, data_only=True)
+        except KeyError as exc:
+            # A zip archive without the workbook parts
+            raise InvalidFileException(f"not an Excel workbook ({exc})") from exc
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = _check_header([_clean_header(h) for h in next(rows, ())])
+            for line, values in enumerate(rows, start=2):
+                if any(v not in (None, "") for v in values):
+                    yield line, dict(zip(header, map(_clean_cell, values)))
+        finally:
+            workbook.close()
+        return
+    if not isinstance(fileobj, io.TextIOBase):
+        fileobj = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    reader = csv.reader(fileobj)
+    header = _check_header([_clean_header(h) for h in next(reader, [])])
+    for line, values in enumerate(reader, start=2):
+        if any(v.strip() for v in values):
+            yield line, dict(zip(header, map(_clean_cell, values)))
+
+
+def invite_path(user):
+    uid = urlsafe_base64_encode(force_bytes(user.pk))
+    return reverse("accept_invite", args=[uid, default_token_generator.make_token(user)])
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        self.failed = 0
+        self.elapsed = 0.0
+        self.report = []
+
+    @property
+    def rows_per_second(self):
+        return (self.created + self.failed) / self.elapsed if self.elapsed else 0.0
+
+    def errors(self):
+        return [row for row in self.report if row["status"] == "error"]
+
+    def write_report(self, fileobj):
+        writer = csv.DictWriter(fileobj, fieldnames=REPORT_COLUMNS)
+        writer.writeheader()
+        writer.writerows(sorted(self.report, key=lambda row: row["line"]))
+
+
+class EmployeeImporter:
+    def __init__(self, batch_size=IMPORT_BATCH_SIZE, workers=None, base_url="", progress=None):
+        self.batch_size = batch_size
+        self.base_url = base_url.rstrip("/")
+        self.progress = progress
+        self.result = ImportResult()
+        self.departments = {name.lower(): pk for pk, name in Department.objects.values_list("pk", "name")}
+        self.group, _ = Group.objects.get_or_create(name="Employee")
+        self.seen_usernames = set()
+        self.seen_employee_ids = set()
+        self.hashers = PasswordHashPool(
+            hasher_path(get_hasher()),
+            workers if workers is not None else settings.PASSWORD_HASH_WORKERS,
+        )
+
+    def run(self, rows):
+        started = time.perf_counter()
+        try:
+            batch = []
+            for item in rows:
+                batch.append(item)
+                if len(batch) == self.batch_size:
+                    self.import_batch(batch)
+                    batch = []
+            if batch:
+                self.import_batch(batch)
+        finally:
+            self.hashers.close()
+            self.result.elapsed = time.perf_counter() - started
+        return self.result
+
+    def validate_batch(self, batch):
+        usernames = {row.get("username", "") for _, row in batch}
+        employee_ids = {row.get("employee_id", "") for _, row in batch} - {""}
+        taken_usernames = set(User.objects.filter(username__in=usernames).values_list("username", flat=True))
+        taken_ids = set(EmployeeProfile.objects.filter(employee_id__in=employee_ids).values_list("employee_id", flat=True))
+
+        valid = []
+        for line, row in batch:
+            errors = []
+            for column in REQUIRED_COLUMNS:
+                if not row.get(column):
+                    errors.append(f"{column} is required")
+            for column, limit in MAX_LENGTHS.items():
+                if len(row.get(column, "")) > limit:
+                    errors.append(f"{column} is longer than {limit} characters")
+            username = row.get("username", "")
+            if username:
+                try:
+                    username_validator(username)
+                except ValidationError as exc:
+                    errors.extend(exc.messages)
+                if username in taken_usernames or username in self.seen_usernames:
+                    errors.append(f"username {username!r} already exists")
+            if row.get("email"):
+                try:
+                    validate_email(row["email"])
+                except ValidationError as exc:
+                    errors.extend(exc.messages)
+            employee_id = row.get("employee_id", "")
+            if employee_id and (employee_id in taken_ids or employee_id in self.seen_employee_ids):
+                errors.append(f"employee_id {employee_id!r} already exists")
+            department = row.get("department", "")
+            if department and department.lower() not in self.departments:
+                errors.append(f"unknown department {department!r}")
+            join_date = timezone.localdate()
+            if row.get("join_date"):
+                try:
+                    join_date = parse_date(row["join_date"])
+                except ValueError:
+                    join_date = None
+                if join_date is None:
+                    errors.append("join_date must look like YYYY-MM-DD")
+            if row.get("password"):
+                try:
+                    validate_password(row["password"], User(username=username, email=row.get("email", "")))
+                except ValidationError as exc:
+                    errors.extend(exc.messages)
+
+            if errors:
+                self.fail(line, row, "; ".join(errors))
+                continue
+            self.seen_usernames.add(username)
+            if employee_id:
+                self.seen_employee_ids.add(employee_id)
+            valid.append((line, row, join_date))
+        return valid
+
+    def import_batch(self, batch):
+        valid = self.validate_batch(batch)
+        if valid:
+            with_password = [row["password"] for _, row, _ in valid if row.get("password")]
+            hashed = iter(self.hashers.hash(with_password))
+            users = [
+                User(
+                    username=row["username"],
+                    email=row["email"],
+                    first_name=row.get("first_name", ""),
+                    last_name=row.get("last_name", ""),
+                    password=next(hashed) if row.get("password") else make_password(None),
+                )
+                for _, row, _ in valid
+            ]
+            try:
+                self.create_batch(valid, users)
+            except DatabaseError as exc:
+                for line, row, _ in valid:
+                    self.fail(line, row, f"batch rolled back: {exc}")
+        if self.progress:
+            self.progress(self.result)
+
+    def create_batch(self, valid, users):
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+            if any(user.pk is None for user in users):
+                # Backends that cannot return ids from a bulk insert
+                pks = dict(User.objects.filter(username__in=[u.username for u in users]).values_list("username", "pk"))
+                for user in users:
+                    user.pk = pks[user.username]
+            Membership = User.groups.through
+            Membership.objects.bulk_create([Membership(user_id=user.pk, group_id=self.group.pk) for user in users])
+
+            manual = [parse_employee_id(row.get("employee_id")) for _, row, _ in valid]
+            manual = [number for number in manual if number is not None]
+            if manual:
+                # Move the counter past hand-picked IDs before allocating the rest
+                advance_to(EMPLOYEE_ID_SEQUENCE, max(manual))
+            profiles = assign_employee_ids([
+                EmployeeProfile(
+                    user_id=user.pk,
+                    employee_id=row.get("employee_id") or None,
+                    department_id=self.departments.get(row.get("department", "").lower()),
+                    designation=row.get("designation", ""),
+                    phone=row.get("phone", ""),
+                    join_date=join_date,
+                )
+                for user, (_, row, join_date) in zip(users, valid)
+            ])
+            EmployeeProfile.objects.bulk_create(profiles)
+            profile_pks = list(EmployeeProfile.objects.filter(user_id__in=[u.pk for u in users]).values_list("pk", flat=True))
+            search.index_profiles(profile_pks)
+            log_rows(EmployeeProfile.objects.filter(pk__in=profile_pks))
+            mark_employee_summaries(profile_pks)
+            bump_versions(DEPARTMENTS, DIRECTORY)
+
+        for user, profile, (line, row, _) in zip(users, profiles, valid):
+            invite = "" if row.get("password") else self.base_url + invite_path(user)
+            self.result.report.append({
+                "line": line, "username": user.username, "status": "created",
+                "employee_id": profile.employee_id, "invite_url": invite, "errors": "",
+            })
+        self.result.created += len(users)
+
+    def fail(self, line, row, message):
+        self.result.failed += 1
+        self.result.report.append({
+            "line": line, "username": row.get("username", ""), "status": "error",
+            "employee_id": row.get("employee_id", ""), "invite_url": "", "errors": message,
+        })
+
+
+def import_employees(fileobj, filename, **options):
+    return EmployeeImporter(**options).run(read_rows(fileobj, filename))
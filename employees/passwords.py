@@ -0,0 +1,52 @@
+"""Password hashing for bulk imports.
+
+Kept free of model imports so chunks can be hashed in spawned worker
+processes without setting Django up there; the parent picks the configured
+hasher and passes its dotted path along.
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from importlib import import_module
+
+HASH_CHUNK_SIZE = 25
+
+
+def hasher_path(hasher):
+    return f"{type(hasher).__module__}.{type(hasher).__qualname__}"
+
+
+def hash_chunk(path, passwords):
+    module, name = path.rsplit(".", 1)
+    hasher = getattr(import_module(module), name)()
+    return [hasher.encode(password, hasher.salt()) for password in passwords]
+
+
+class PasswordHashPool:
+    """Hash many passwords at full cost across ``workers`` processes."""
+
+    def __init__(self, path, workers=1):
+        self.path = path
+        self.workers = workers
+        self.executor = None
+
+    def hash(self, passwords):
+        chunks = [passwords[i:i + HASH_CHUNK_SIZE] for i in range(0, len(passwords), HASH_CHUNK_SIZE)]
+        if self.workers <= 1 or len(chunks) <= 1:
+            results = (hash_chunk(self.path, chunk) for chunk in chunks)
+        else:
+            if self.executor is None:
+                # spawn keeps forked copies of DB connections and threads out of the workers
+                self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+            results = self.executor.map(hash_chunk, [self.path] * len(chunks), chunks)
+        return [encoded for chunk in results for encoded in chunk]
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,130 @@
+import calendar
+import re
+import time
+from datetime import date
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .changelog import log_rows, log_saved
+from .metrics import mark_employee_months
+from .models import Attendance, EmployeeProfile, PayrollRun, Salary, SalaryTemplate
+from .notifications import notify
+
+PAYROLL_CHUNK_SIZE = 1000
+MONTH_PATTERN = re.compile(r"^(\d{4})-(\d{2})$")
+CENT = Decimal("0.01")
+
+
+def month_bounds(month):
+    match = MONTH_PATTERN.match(month or "")
+    if not match or not 1 <= int(match.group(2)) <= 12:
+        raise ValueError(f"Month must look like YYYY-MM, got {month!r}")
+    year, number = int(match.group(1)), int(match.group(2))
+    days = calendar.monthrange(year, number)[1]
+    return date(year, number, 1), date(year, number, days), days
+
+
+def compute_salaries(month, chunk, absences, run, days_in_month):
+    """Build Salary rows for one chunk of (employee_pk, base, bonus, deductions).
+
+    Rules are applied column-wise over the whole chunk: a bonus percentage of
+    base pay and, optionally, one day of base pay per Absent day.
+    """
+    pks, bases, bonuses, deductions = zip(*chunk)
+    percent = Decimal(run.bonus_percent) / 100
+    bonuses = [(bonus + base * percent).quantize(CENT, ROUND_HALF_UP) for base, bonus in zip(bases, bonuses)]
+    if run.deduct_absences:
+        deductions = [
+            (deduction + base * absences.get(pk, 0) / days_in_month).quantize(CENT, ROUND_HALF_UP)
+            for pk, base, deduction in zip(pks, bases, deductions)
+        ]
+    totals = map(Salary.compute_total, bases, bonuses, deductions)
+    return [
+        Salary(employee_id=pk, month=month, base_salary=base, bonus=bonus, deductions=deduction, total_salary=total)
+        for pk, base, bonus, deduction, total in zip(pks, bases, bonuses, deductions, totals)
+    ]
+
+
+def process_chunk(run, chunk, first_day, last_day, days_in_month):
+    pks = [row[0] for row in chunk]
+    absences = {}
+    if run.deduct_absences:
+        absences = dict(
+            Attendance.objects.filter(employee_id__in=pks, date__range=(first_day, last_day), status="Absent")
+            .order_by()
+            .values_list("employee_id")
+            .annotate(Count("id"))
+        )
+    existing = set(Salary.objects.filter(month=run.month, employee_id__in=pks).values_list("employee_id", flat=True))
+    if not run.overwrite:
+        chunk = [row for row in chunk if row[0] not in existing]
+    rows = compute_salaries(run.month, chunk, absences, run, days_in_month) if chunk else []
+    created = len([row for row in rows if row.employee_id not in existing])
+    with transaction.atomic():
+        if run.overwrite:
+            Salary.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=["employee", "month"],
+                update_fields=["base_salary", "bonus", "deductions", "total_salary", "updated"],
+            )
+            log_saved(rows)
+        elif rows:
+            # ignore_conflicts covers rows added by hand since the existence check
+            # (and leaves primary keys unset, so the log reads the rows back)
+            Salary.objects.bulk_create(rows, ignore_conflicts=True)
+            log_rows(Salary.objects.filter(month=run.month, employee_id__in=[row.employee_id for row in rows]))
+        # The cursor moves in the same transaction, so a crash never half-applies a chunk
+        PayrollRun.objects.filter(pk=run.pk).update(
+            last_employee_pk=pks[-1],
+            processed=F("processed") + len(pks),
+            created_rows=F("created_rows") + created,
+            skipped_rows=F("skipped_rows") + len(pks) - len(rows),
+        )
+        mark_employee_months((row.employee_id, run.month) for row in rows)
+        if rows:
+            # Only the employees this chunk paid, in its transaction, so a rerun or
+            # resumed run never notifies anyone twice
+            notify(
+                f"Salary for {run.month}",
+                f"Your salary for {run.month} has been processed.",
+                user_ids=EmployeeProfile.objects.filter(pk__in=[row.employee_id for row in rows]).values("user_id"),
+            )
+    return len(pks)
+
+
+def execute_payroll_run(run, chunk_size=PAYROLL_CHUNK_SIZE, progress=None):
+    """Generate Salary rows for every templated employee in the run's scope.
+
+    Safe to call again on a failed or interrupted run: it resumes after
+    ``last_employee_pk`` and (employee, month) rows that already exist are
+    skipped unless the run overwrites.
+    """
+    first_day, last_day, days_in_month = month_bounds(run.month)
+    PayrollRun.objects.filter(pk=run.pk).update(status="Running", error="")
+    templates = SalaryTemplate.objects.order_by("employee_id")
+    if run.department_id:
+        templates = templates.filter(employee__department_id=run.department_id)
+    cursor = run.last_employee_pk
+    try:
+        while True:
+            chunk = list(
+                templates.filter(employee_id__gt=cursor)
+                .values_list("employee_id", "base_salary", "bonus", "deductions")[:chunk_size]
+            )
+            if not chunk:
+                break
+            started = time.perf_counter()
+            done = process_chunk(run, chunk, first_day, last_day, days_in_month)
+            cursor = chunk[-1][0]
+            if progress:
+                progress(done, time.perf_counter() - started)
+    except Exception as exc:
+        PayrollRun.objects.filter(pk=run.pk).update(status="Failed", error=str(exc))
+        raise
+    PayrollRun.objects.filter(pk=run.pk).update(status="Done", finished_at=timezone.now())
+    run.refresh_from_db()
+    return run
@@ -0,0 +1,114 @@
+"""Salary PDF rendering.
+
+Kept free of Django imports so shards can be rendered in spawned worker
+processes. Rows are plain tuples of (emp_id, name, month, total).
+"""
+import io
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+from pypdf import PdfWriter
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+ROWS_PER_PAGE = 36
+PAGES_PER_SHARD = 40
+REPORT_TITLE = "Salary Report"
+
+
+def page_count(row_count):
+    return max(1, -(-row_count // ROWS_PER_PAGE))
+
+
+def draw_page(p, page):
+    number, total_pages, department, rows, subtotal = page
+    width, height = letter
+    p.setFont("Helvetica-Bold", 14)
+    p.drawString(30, height - 40, REPORT_TITLE)
+    p.setFont("Helvetica", 9)
+    p.drawRightString(width - 30, height - 40, f"Page {number} of {total_pages}")
+    p.setFont("Helvetica-Bold", 11)
+    p.drawString(30, height - 62, department)
+    p.setFont("Helvetica-Bold", 10)
+    y = height - 90
+    p.drawString(30, y, "EMP ID")
+    p.drawString(100, y, "Name")
+    p.drawString(300, y, "Month")
+    p.drawRightString(440, y, "Total")
+    p.line(30, y - 4, 440, y - 4)
+    p.setFont("Helvetica", 10)
+    y -= 20
+    for emp_id, name, month, total in rows:
+        p.drawString(30, y, str(emp_id))
+        p.drawString(100, y, name)
+        p.drawString(300, y, month)
+        p.drawRightString(440, y, f"{total:.2f}")
+        y -= 17
+    if subtotal is not None:
+        p.setFont("Helvetica-Bold", 10)
+        p.drawString(300, y - 4, "Department total")
+        p.drawRightString(440, y - 4, f"{subtotal:.2f}")
+    p.showPage()
+
+
+def render_pages(pages):
+    buffer = io.BytesIO()
+    p = canvas.Canvas(buffer, pagesize=letter)
+    p.setTitle(REPORT_TITLE)
+    for page in pages:
+        draw_page(p, page)
+    p.save()
+    return buffer.getvalue()
+
+
+def paginate(sections, total_pages):
+    """Yield page tuples from (department, row_count, subtotal, rows) sections.
+
+    Every department starts on a fresh page; its subtotal goes on its last page.
+    """
+    number = 0
+    for department, row_count, subtotal, rows in sections:
+        pages_left = page_count(row_count)
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == ROWS_PER_PAGE and pages_left > 1:
+                number += 1
+                pages_left -= 1
+                yield (number, total_pages, department, batch, None)
+                batch = []
+        number += 1
+        yield (number, total_pages, department, batch, subtotal)
+
+
+def render_report(pages, fileobj, workers=1, progress=None):
+    shards = []
+    shard = []
+    for page in pages:
+        shard.append(page)
+        if len(shard) == PAGES_PER_SHARD:
+            shards.append(shard)
+            shard = []
+    if shard:
+        shards.append(shard)
+
+    writer = PdfWriter()
+    if workers <= 1 or len(shards) <= 1:
+        parts = map(render_pages, shards)
+        executor = None
+    else:
+        # spawn keeps forked copies of DB connections and threads out of the workers
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        parts = executor.map(render_pages, shards)
+    done = 0
+    try:
+        for index, part in enumerate(parts):
+            writer.append(io.BytesIO(part))
+            done += sum(len(page[3]) for page in shards[index])
+            if progress:
+                progress(done)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    writer.add_metadata({"/Title": REPORT_TITLE})
+    writer.write(fileobj)
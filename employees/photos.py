@@ -0,0 +1,115 @@
+"""Employee photo pipeline.
+
+Uploads are saved as-is by the profile forms. Once the transaction commits,
+a background thread downscales the photo to fit PHOTO_MAX_SIZE, re-encodes
+it as JPEG and crops a PHOTO_THUMBNAIL_SIZE square thumbnail. Both files are
+named after the SHA-256 of their bytes under photos/, so identical photos are
+stored once and the URLs can be cached forever. The profile is only switched
+over if it still points at the upload that was processed, so a newer upload
+always wins.
+"""
+import hashlib
+import io
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from . import caching
+from .changelog import log_rows
+from .models import EmployeeProfile
+
+logger = logging.getLogger(__name__)
+
+PHOTO_DIR = "photos/"
+
+_photo_executor = None
+
+
+def is_processed(name):
+    return bool(name) and name.startswith(PHOTO_DIR)
+
+
+def _encode(image):
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=settings.PHOTO_JPEG_QUALITY, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def render_photo(fileobj):
+    """Return JPEG bytes for the downscaled photo and its square thumbnail."""
+    limit = settings.PHOTO_MAX_SIZE
+    with Image.open(fileobj) as image:
+        # JPEGs decode straight at a reduced scale, so a 12MP photo is never fully decoded
+        image.draft("RGB", (limit, limit))
+        image = ImageOps.exif_transpose(image)
+        if image.mode != "RGB":
+            # Transparent PNGs go on white rather than JPEG's default black
+            rgba = image.convert("RGBA")
+            image = Image.new("RGB", rgba.size, "white")
+            image.paste(rgba, mask=rgba.getchannel("A"))
+        image.thumbnail((limit, limit), Image.LANCZOS)
+        size = settings.PHOTO_THUMBNAIL_SIZE
+        thumbnail = ImageOps.fit(image, (size, size), Image.LANCZOS)
+        return _encode(image), _encode(thumbnail)
+
+
+def store(content):
+    """Save ``content`` under its SHA-256 and return the name; existing files are reused."""
+    digest = hashlib.sha256(content).hexdigest()
+    name = f"{PHOTO_DIR}{digest[:2]}/{digest}.jpg"
+    if not default_storage.exists(name):
+        saved = default_storage.save(name, ContentFile(content))
+        if saved != name:
+            # Lost a race with an identical upload; keep one copy
+            default_storage.delete(saved)
+    return name
+
+
+def process_photo(profile_pk, source):
+    """Replace upload ``source`` on the profile with the processed photo and thumbnail."""
+    started = time.perf_counter()
+    with default_storage.open(source, "rb") as fileobj:
+        photo, thumbnail = render_photo(fileobj)
+    photo_name, thumbnail_name = store(photo), store(thumbnail)
+    with transaction.atomic():
+        profiles = EmployeeProfile.objects.filter(pk=profile_pk, photo=source)
+        switched = profiles.update(photo=photo_name, photo_thumbnail=thumbnail_name, updated=timezone.now())
+        if switched:
+            log_rows(EmployeeProfile.objects.filter(pk=profile_pk))
+            caching.bump_versions(caching.DIRECTORY)
+    if not EmployeeProfile.objects.filter(photo=source).exists():
+        default_storage.delete(source)
+    logger.info(
+        "photo processed: profile=%s bytes=%d thumbnail_bytes=%d ms=%.1f",
+        profile_pk, len(photo), len(thumbnail), (time.perf_counter() - started) * 1000,
+    )
+    return bool(switched)
+
+
+def run_in_worker(profile_pk, source):
+    close_old_connections()
+    try:
+        return process_photo(profile_pk, source)
+    except Exception:
+        logger.exception("Processing photo %s of profile %s failed", source, profile_pk)
+        return False
+    finally:
+        connection.close()
+
+
+def _executor():
+    global _photo_executor
+    if _photo_executor is None:
+        _photo_executor = ThreadPoolExecutor(max_workers=settings.PHOTO_WORKERS, thread_name_prefix="ems-photo")
+    return _photo_executor
+
+
+def schedule(profile_pk, source):
+    return _executor().submit(run_in_worker, profile_pk, source)
@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+
+ROLE_CACHE_PREFIX = "ems:roles:"
+
+
+def role_cache_key(user_id):
+    return f"{ROLE_CACHE_PREFIX}{user_id}"
+
+
+def shared_cache():
+    # A locmem cache lives in one worker process, so clearing an entry there
+    # would leave stale roles (and permissions) in every other worker
+    return not isinstance(caches["default"], LocMemCache)
+
+
+def get_user_roles(user):
+    """Group names for ``user``, loaded at most once per request.
+
+    The result is memoised on the user object (request.user lives for one
+    request) and, with a shared cache backend, cached across requests until
+    the user's groups change.
+    """
+    if not user.is_authenticated:
+        return frozenset()
+    roles = getattr(user, "_ems_roles", None)
+    if roles is None:
+        key = role_cache_key(user.pk)
+        roles = cache.get(key) if shared_cache() else None
+        if roles is None:
+            roles = frozenset(user.groups.values_list("name", flat=True))
+            if shared_cache():
+                cache.set(key, roles, settings.ROLE_CACHE_TIMEOUT)
+        user._ems_roles = roles
+    return roles
+
+
+def user_has_role(user, group_name):
+    return group_name in get_user_roles(user)
+
+
+def invalidate_user_roles(user_ids):
+    cache.delete_many([role_cache_key(user_id) for user_id in user_ids])
@@ -0,0 +1,111 @@
+"""Employee directory search.
+
+On SQLite an FTS5 table (created by migration 0007) mirrors each profile's
+employee ID, name, designation and department, and signal handlers keep it in
+sync. Other databases fall back to case-insensitive LIKE filters.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import EmployeeProfile
+
+FTS_TABLE = "employees_employee_fts"
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def fts_enabled():
+    return connection.vendor == "sqlite"
+
+
+def match_expression(query):
+    # Every word must match as a prefix: "jo eng" -> "jo"* "eng"*
+    return " ".join(f'"{token}"*' for token in TOKEN_PATTERN.findall(query))
+
+
+def filter_profiles(qs, query):
+    query = (query or "").strip()
+    if not query:
+        return qs
+    if fts_enabled():
+        expression = match_expression(query)
+        if not expression:
+            return qs.none()
+        return qs.filter(pk__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [expression]))
+    condition = Q()
+    for token in query.split():
+        condition &= (
+            Q(employee_id__icontains=token)
+            | Q(user__first_name__icontains=token)
+            | Q(user__last_name__icontains=token)
+            | Q(user__username__icontains=token)
+            | Q(designation__icontains=token)
+            | Q(department__name__icontains=token)
+        )
+    return qs.filter(condition)
+
+
+def lookup(query, limit=10):
+    """Best matches for a typeahead box, as plain dicts."""
+    fields = ("pk", "employee_id", "user__first_name", "user__last_name", "designation", "department__name")
+    if fts_enabled():
+        expression = match_expression(query or "")
+        if not expression:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s ORDER BY rank LIMIT %s",
+                [expression, limit],
+            )
+            ranked = [row[0] for row in cursor.fetchall()]
+        rows = {row[0]: row for row in EmployeeProfile.objects.filter(pk__in=ranked).values_list(*fields)}
+        rows = [rows[pk] for pk in ranked if pk in rows]
+    else:
+        rows = filter_profiles(EmployeeProfile.objects.order_by("employee_id"), query).values_list(*fields)[:limit]
+    return [
+        {
+            "id": pk,
+            "employee_id": employee_id,
+            "name": f"{first} {last}".strip(),
+            "designation": designation,
+            "department": department,
+        }
+        for pk, employee_id, first, last, designation, department in rows
+    ]
+
+
+def index_profiles(pks):
+    if not fts_enabled() or not pks:
+        return
+    pks = list(pks)
+    rows = EmployeeProfile.objects.filter(pk__in=pks).values_list(
+        "pk", "employee_id", "user__first_name", "user__last_name", "user__username", "designation", "department__name",
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(pk,) for pk in pks])
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, employee_id, name, designation, department) VALUES (%s, %s, %s, %s, %s)",
+            [
+                (pk, employee_id or "", f"{first} {last} {username}".strip(), designation, department or "")
+                for pk, employee_id, first, last, username, designation, department in rows
+            ],
+        )
+
+
+def unindex_profiles(pks):
+    if fts_enabled():
+        with connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(pk,) for pk in pks])
+
+
+def rebuild_index(batch_size=5000):
+    if not fts_enabled():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+    pks = list(EmployeeProfile.objects.order_by("pk").values_list("pk", flat=True))
+    for start in range(0, len(pks), batch_size):
+        index_profiles(pks[start:start + batch_size])
+    return len(pks)
@@ -0,0 +1,305 @@
+"""Synthetic company data for benchmarks and local testing.
+
+Rows are written with bulk_create or executemany inside one transaction per
+batch, so signals do not fire; the derived tables (metrics rollups, search
+index, leave balances, unread counters, the employee ID sequence) are
+rebuilt once at the end instead. The bench_* and check_* commands seed
+inside ``scratch_database`` so the real database is never touched.
+"""
+import json
+import os
+import random
+import tempfile
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group, User
+from django.db import connection, transaction
+from django.urls import reverse
+from django.utils import timezone
+
+from . import metrics, search
+from .leaves import recount_balances
+from .models import (
+    Attendance,
+    Department,
+    EmployeeProfile,
+    ExportJob,
+    Leave,
+    Notification,
+    Salary,
+    SalaryTemplate,
+)
+from .notifications import recount_unread
+from .onboarding import invite_path
+from .sequences import EMPLOYEE_ID_SEQUENCE, advance_to, format_employee_id
+
+FIRST_NAMES = ["Aarav", "Priya", "Rohan", "Ananya", "Vikram", "Meera", "Arjun", "Kavya", "Rahul", "Sneha", "Imran", "Fatima", "John", "Maria", "Wei", "Yuki"]
+LAST_NAMES = ["Sharma", "Iyer", "Patel", "Reddy", "Khan", "Singh", "Nair", "Gupta", "Das", "Menon", "Smith", "Garcia", "Chen", "Sato"]
+DEPARTMENT_NAMES = ["Engineering", "Sales", "Support", "Finance", "Operations", "Marketing", "People", "Legal", "Research", "Facilities"]
+DESIGNATIONS = ["Associate", "Engineer", "Senior Engineer", "Analyst", "Lead", "Specialist", "Coordinator", "Consultant"]
+ATTENDANCE_STATUSES, ATTENDANCE_WEIGHTS = ("Present", "Absent", "Leave"), (90, 4, 6)
+LEAVE_STATUS_WEIGHTS = ["Approved"] * 7 + ["Rejected"] * 1 + ["Pending"] * 2
+BATCH_SIZE = 5000
+
+
+def _batches(rows, size=BATCH_SIZE):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def _aware(day, rng):
+    moment = datetime.combine(day, time(rng.randrange(8, 19), rng.randrange(60)))
+    return connection.ops.adapt_datetimefield_value(timezone.make_aware(moment))
+
+
+@contextmanager
+def scratch_database(on_disk=False, keepdb=False):
+    """Run the block against a throwaway test database that is destroyed afterwards.
+
+    With ``on_disk`` a SQLite database is a temporary file rather than shared
+    memory, for threads and forked workers that need their own connections
+    and for measurements that should not count the database as process memory.
+    """
+    old_name = connection.settings_dict["NAME"]
+    test_settings = connection.settings_dict["TEST"]
+    old_test_name = test_settings["NAME"]
+    with tempfile.TemporaryDirectory() as tmp:
+        if on_disk and connection.vendor == "sqlite":
+            test_settings["NAME"] = os.path.join(tmp, "scratch.sqlite3")
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb)
+        try:
+            yield
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+            test_settings["NAME"] = old_test_name
+
+
+def seed_company(departments=50, employees=100_000, days=365, months=12, seed=42, password="password",
+                 prefix="emp", progress=None, end=None):
+    """Create a company of ``employees`` across ``departments`` with history.
+
+    ``days`` of weekday attendance and ``months`` of salaries, leaves and
+    notifications end on ``end`` (today by default). Each department has a
+    manager, ``{prefix}-manager<n>``, and ``{prefix}-admin`` is a superuser.
+    Every user gets the same ``password`` (hashed once). Returns the number
+    of rows written per table.
+    """
+    rng = random.Random(seed)
+    report = progress or (lambda stage, count: None)
+    today = end or timezone.localdate()
+    # The raw inserts below bypass auto_now, so they set ``updated`` themselves
+    stamp = connection.ops.adapt_datetimefield_value(timezone.now())
+    hashed = make_password(password)
+    counts = {}
+
+    groups = {name: Group.objects.get_or_create(name=name)[0] for name in ("Admin", "Manager", "Employee")}
+    admin = User.objects.create(
+        username=f"{prefix}-admin", email=f"{prefix}-admin@example.com", password=hashed, is_staff=True, is_superuser=True,
+    )
+    User.objects.bulk_create([
+        User(username=f"{prefix}-manager{i}", email=f"{prefix}-manager{i}@example.com", password=hashed,
+             first_name=rng.choice(FIRST_NAMES), last_name=rng.choice(LAST_NAMES))
+        for i in range(departments)
+    ])
+    managers = list(User.objects.filter(username__startswith=f"{prefix}-manager").order_by("pk"))
+    Department.objects.bulk_create([
+        Department(name=f"{DEPARTMENT_NAMES[i % len(DEPARTMENT_NAMES)]} {i // len(DEPARTMENT_NAMES) + 1}", manager=manager)
+        for i, manager in enumerate(managers)
+    ])
+    dept_pks = list(Department.objects.filter(manager__in=managers).order_by("pk").values_list("pk", flat=True))
+    report("departments", len(dept_pks))
+
+    with transaction.atomic():
+        for batch in _batches(range(employees)):
+            User.objects.bulk_create([
+                User(username=f"{prefix}{i}", email=f"{prefix}{i}@example.com", password=hashed,
+                     first_name=rng.choice(FIRST_NAMES), last_name=rng.choice(LAST_NAMES))
+                for i in batch
+            ])
+    user_pks = list(User.objects.filter(username__regex=rf"^{prefix}[0-9]+$").order_by("pk").values_list("pk", flat=True))
+    Membership = User.groups.through
+    memberships = [Membership(user_id=admin.pk, group_id=groups["Admin"].pk)]
+    memberships += [Membership(user_id=m.pk, group_id=groups["Manager"].pk) for m in managers]
+    memberships += [Membership(user_id=pk, group_id=groups["Employee"].pk) for pk in user_pks]
+    with transaction.atomic():
+        Membership.objects.bulk_create(memberships, batch_size=BATCH_SIZE, ignore_conflicts=True)
+    counts["users"] = len(user_pks) + len(managers) + 1
+    report("users", counts["users"])
+
+    start_number = EmployeeProfile.objects.count() + 1
+    with transaction.atomic():
+        EmployeeProfile.objects.bulk_create([
+            EmployeeProfile(
+                user_id=pk,
+                employee_id=format_employee_id(start_number + i),
+                department_id=dept_pks[i % len(dept_pks)],
+                designation=rng.choice(DESIGNATIONS),
+                phone=f"9{rng.randrange(10 ** 9):09d}",
+                join_date=today - timedelta(days=rng.randrange(days, days + 3650)),
+            )
+            for i, pk in enumerate(user_pks)
+        ], batch_size=BATCH_SIZE)
+    advance_to(EMPLOYEE_ID_SEQUENCE, start_number + len(user_pks) - 1)
+    profiles = list(EmployeeProfile.objects.filter(user_id__in=user_pks).order_by("pk").values_list("pk", "user_id"))
+    profile_pks = [pk for pk, _ in profiles]
+    counts["profiles"] = len(profiles)
+    report("profiles", len(profiles))
+
+    bases = {pk: Decimal(rng.randrange(300, 1500) * 10) for pk in profile_pks}
+    with transaction.atomic():
+        SalaryTemplate.objects.bulk_create(
+            [SalaryTemplate(employee_id=pk, base_salary=base) for pk, base in bases.items()], batch_size=BATCH_SIZE,
+        )
+
+    sql = f"INSERT INTO {Attendance._meta.db_table} (employee_id, date, status, note, updated) VALUES (%s, %s, %s, '', %s)"
+    weekdays = [d.isoformat() for d in (today - timedelta(days=offset) for offset in range(days - 1, -1, -1)) if d.weekday() < 5]
+    counts["attendance"] = 0
+    with connection.cursor() as cursor:
+        # Employee by employee, in the order of the (employee, date) unique index
+        for batch in _batches(profile_pks, max(1, BATCH_SIZE * 10 // max(1, len(weekdays)))):
+            statuses = iter(rng.choices(ATTENDANCE_STATUSES, ATTENDANCE_WEIGHTS, k=len(batch) * len(weekdays)))
+            with transaction.atomic():
+                cursor.executemany(sql, ((pk, day, next(statuses), stamp) for pk in batch for day in weekdays))
+            counts["attendance"] += len(batch) * len(weekdays)
+    report("attendance", counts["attendance"])
+
+    month_starts = []
+    first = today.replace(day=1)
+    for _ in range(months):
+        month_starts.append(first)
+        first = (first - timedelta(days=1)).replace(day=1)
+    sql = (
+        f"INSERT INTO {Salary._meta.db_table} "
+        "(employee_id, month, base_salary, bonus, deductions, total_salary, updated) VALUES (%s, %s, %s, %s, %s, %s, %s)"
+    )
+    with connection.cursor() as cursor:
+        for month_start in month_starts:
+            rows = []
+            for pk in profile_pks:
+                base = bases[pk]
+                bonus = Decimal(rng.choice((0, 0, 0, 500, 1000)))
+                deductions = Decimal(rng.choice((0, 0, 200)))
+                rows.append((pk, month_start.strftime("%Y-%m"), str(base), str(bonus), str(deductions), str(base + bonus - deductions), stamp))
+            with transaction.atomic():
+                cursor.executemany(sql, rows)
+    counts["salaries"] = len(month_starts) * len(profile_pks)
+    report("salaries", counts["salaries"])
+
+    # About one leave per employee every two months, plus one notification a month
+    window = max(1, months * 30)
+    leave_sql = (
+        f"INSERT INTO {Leave._meta.db_table} (employee_id, start_date, end_date, reason, status, applied_on, updated) "
+        "VALUES (%s, %s, %s, %s, %s, %s, %s)"
+    )
+    notification_sql = (
+        f"INSERT INTO {Notification._meta.db_table} (user_id, title, message, created, read, updated) VALUES (%s, %s, %s, %s, %s, %s)"
+    )
+    counts["leaves"] = counts["notifications"] = 0
+    with connection.cursor() as cursor:
+        for batch in _batches(profiles):
+            leaves, notifications = [], []
+            for pk, user_id in batch:
+                for _ in range(max(1, months // 2)):
+                    start = today - timedelta(days=rng.randrange(-30, window))
+                    status = "Pending" if start > today else rng.choice(LEAVE_STATUS_WEIGHTS)
+                    applied = _aware(start - timedelta(days=rng.randrange(1, 20)), rng)
+                    leaves.append((pk, start, start + timedelta(days=rng.randrange(0, 5)), "Personal", status, applied, stamp))
+                for month_start in month_starts:
+                    created = _aware(month_start + timedelta(days=rng.randrange(28)), rng)
+                    notifications.append((user_id, "Salary processed", f"Your salary for {month_start:%Y-%m} has been processed.",
+                                          created, rng.random() < (0.6 if month_start == month_starts[0] else 0.98), stamp))
+            with transaction.atomic():
+                cursor.executemany(leave_sql, leaves)
+                cursor.executemany(notification_sql, notifications)
+            counts["leaves"] += len(leaves)
+            counts["notifications"] += len(notifications)
+    report("leaves and notifications", counts["leaves"] + counts["notifications"])
+
+    years = range(today.year - (window // 365) - 1, today.year + 2)
+    for batch in _batches(profile_pks):
+        with transaction.atomic():
+            recount_balances([(pk, year) for pk in batch for year in years])
+    for batch in _batches(user_pks):
+        recount_unread(batch)
+    metrics.rebuild()
+    search.rebuild_index()
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+    report("rollups and indexes", 0)
+    return counts
+
+
+def sample_requests(fx):
+    """One request per named route in employees/urls.py, pointing at the rows in ``fx``.
+
+    Each item is (route name, url, data); data is None for a GET, a JSON string
+    or a form dict for a POST. POST-only endpoints get a POST covering every
+    employee or leave in ``fx``, so a query per row shows up.
+    """
+    from .urls import urlpatterns
+
+    args = {
+        "department_update": [fx["dept"].pk],
+        "department_delete": [fx["dept"].pk],
+        "employee_update": [fx["profile"].pk],
+        "employee_delete": [fx["profile"].pk],
+        "mark_attendance": [fx["profile"].pk],
+        "process_salary": [fx["profile"].pk],
+        "approve_leave": [fx["leaves"][0]],
+        "export_job_status": [fx["job"].pk],
+        "export_job_download": [fx["job"].pk],
+        "mark_notification_read": [fx["notification"].pk],
+        "api_collection": ["employees"],
+        "api_item": ["employees", fx["profile"].pk],
+    }
+    posts = {
+        "bulk_attendance_api": json.dumps({
+            "date": date.today().isoformat(),
+            "records": [{"employee": pk, "status": "Absent"} for pk in fx["profiles"]],
+        }),
+        "leave_decisions_api": json.dumps({"action": "Approve", "ids": fx["leaves"][1:]}),
+        "approve_leave": {"action": "Reject"},
+        "mark_all_notifications_read": {},
+    }
+    requests = []
+    for pattern in urlpatterns:
+        if pattern.name == "accept_invite":
+            url = invite_path(fx["invitee"])
+        elif pattern.name in args:
+            url = reverse(pattern.name, args=args[pattern.name])
+        elif pattern.pattern.converters:
+            raise ValueError(f"No sample arguments for {pattern.name}; add them to sample_requests()")
+        else:
+            url = reverse(pattern.name)
+        requests.append((pattern.name, url, posts.get(pattern.name)))
+    return requests
+
+
+def sample_fixtures(prefix="emp", leaves=200):
+    """Rows from a seeded company for ``sample_requests``, all in the first manager's department."""
+    manager = User.objects.get(username=f"{prefix}-manager0")
+    admin = User.objects.get(username=f"{prefix}-admin")
+    dept = manager.managed_department
+    profiles = list(EmployeeProfile.objects.filter(department=dept).order_by("pk").values_list("pk", flat=True)[:500])
+    pending = list(
+        Leave.objects.filter(employee__department=dept, status="Pending").order_by("pk").values_list("pk", flat=True)[:leaves]
+    )
+    notification = Notification.objects.filter(user=admin).first() or Notification.objects.create(
+        user=admin, title="Welcome", message="-",
+    )
+    invitee, _ = User.objects.get_or_create(username=f"{prefix}-invitee")
+    return {
+        "admin": admin,
+        "manager": manager,
+        "employee": EmployeeProfile.objects.select_related("user").get(pk=profiles[0]).user,
+        "dept": dept,
+        "profile": EmployeeProfile.objects.get(pk=profiles[1]),
+        "profiles": profiles,
+        "leaves": pending,
+        "job": ExportJob.objects.create(kind="attendance_csv", params_hash="-", requested_by=admin),
+        "notification": notification,
+        "invitee": invitee,
+    }
@@ -0,0 +1,72 @@
+import re
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+from .models import EmployeeProfile, IdSequence
+
+EMPLOYEE_ID_SEQUENCE = "employee_id"
+EMPLOYEE_ID_PATTERN = re.compile(r"^EMP(\d+)$")
+
+
+def next_values(name, count=1, initial=None):
+    """Reserve ``count`` consecutive numbers from sequence ``name``.
+
+    The counter row is bumped with a single UPDATE before it is read, so the
+    row lock is held from the first statement and concurrent callers queue
+    instead of seeing the same value. ``initial`` is a callable giving the
+    starting value for a sequence that does not exist yet.
+    """
+    with transaction.atomic():
+        updated = IdSequence.objects.filter(name=name).update(value=F("value") + count)
+        if not updated:
+            try:
+                with transaction.atomic():
+                    IdSequence.objects.create(name=name, value=(initial() if initial else 0) + count)
+            except IntegrityError:
+                IdSequence.objects.filter(name=name).update(value=F("value") + count)
+        value = IdSequence.objects.filter(name=name).values_list("value", flat=True).get()
+    return range(value - count + 1, value + 1)
+
+
+def advance_to(name, value):
+    # Keep the counter ahead of values that were assigned by hand
+    with transaction.atomic():
+        if not IdSequence.objects.filter(name=name).update(value=Greatest(F("value"), value)):
+            try:
+                with transaction.atomic():
+                    IdSequence.objects.create(name=name, value=max(value, highest_employee_number()))
+            except IntegrityError:
+                IdSequence.objects.filter(name=name).update(value=Greatest(F("value"), value))
+
+
+def format_employee_id(number):
+    return f"EMP{number:04d}"
+
+
+def parse_employee_id(employee_id):
+    match = EMPLOYEE_ID_PATTERN.match(employee_id or "")
+    return int(match.group(1)) if match else None
+
+
+def highest_employee_number():
+    numbers = (
+        parse_employee_id(emp_id)
+        for emp_id in EmployeeProfile.objects.filter(employee_id__startswith="EMP").values_list("employee_id", flat=True)
+    )
+    return max((n for n in numbers if n is not None), default=0)
+
+
+def allocate_employee_ids(count=1):
+    numbers = next_values(EMPLOYEE_ID_SEQUENCE, count, initial=highest_employee_number)
+    return [format_employee_id(n) for n in numbers]
+
+
+def assign_employee_ids(profiles):
+    """Fill in missing employee IDs with one block reservation (for bulk_create)."""
+    missing = [p for p in profiles if not p.employee_id]
+    if missing:
+        for profile, employee_id in zip(missing, allocate_employee_ids(len(missing))):
+            profile.employee_id = employee_id
+    return profiles
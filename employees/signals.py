@@ -1,17 +1,184 @@
-from django.db.models.signals import pre_save
+from functools import partial
+
+from django.contrib.auth.models import Group, User
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
-from .models import EmployeeProfile
+from django.utils import timezone
+from .models import Attendance, Department, EmployeeProfile, Leave, Notification, Salary
+from . import caching, changelog, leaves, metrics, notifications, photos, search
+from .roles import invalidate_user_roles
+from .sequences import EMPLOYEE_ID_SEQUENCE, advance_to, allocate_employee_ids, parse_employee_id
 
 @receiver(pre_save, sender=EmployeeProfile)
-def set_employee_id(sender, instance, **kwargs):
-    if instance.employee_id:
+def set_employee_id(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and "employee_id" not in update_fields:
+        return
+    if not instance.employee_id:
+        instance.employee_id = allocate_employee_ids(1)[0]
         return
-    last = sender.objects.order_by("id").last()
-    if not last or not last.employee_id:
-        instance.employee_id = "EMP0001"
+    if not instance._state.adding and sender.objects.filter(pk=instance.pk, employee_id=instance.employee_id).exists():
+        # Unchanged ID: skip the write to the shared sequence row on every profile edit
         return
-    try:
-        num = int(last.employee_id.replace("EMP", ""))
-        instance.employee_id = f"EMP{num+1:04d}"
-    except Exception:
-        instance.employee_id = f"EMP{(last.id or 0)+1:04d}"
+    number = parse_employee_id(instance.employee_id)
+    if number is not None:
+        advance_to(EMPLOYEE_ID_SEQUENCE, number)
+
+@receiver(m2m_changed, sender=User.groups.through)
+def reset_roles_on_group_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if not reverse:
+        invalidate_user_roles([instance.pk])
+    elif action == "pre_clear":
+        invalidate_user_roles(instance.user_set.values_list("pk", flat=True))
+    else:
+        invalidate_user_roles(pk_set)
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def reset_roles_for_group_members(sender, instance, **kwargs):
+    if instance.pk:
+        invalidate_user_roles(instance.user_set.values_list("pk", flat=True))
+
+# Department metrics: remember the fields that decide which rollup bucket a
+# row belongs to, so an edit refreshes both the old and the new bucket.
+METRIC_FIELDS = {
+    Attendance: ("employee_id", "date"),
+    Salary: ("employee_id", "month"),
+    Leave: ("employee_id", "start_date", "end_date"),
+    EmployeeProfile: ("department_id",),
+}
+
+@receiver(pre_save, sender=Attendance)
+@receiver(pre_save, sender=Salary)
+@receiver(pre_save, sender=Leave)
+@receiver(pre_save, sender=EmployeeProfile)
+def remember_metric_fields(sender, instance, **kwargs):
+    if instance.pk and not instance._state.adding:
+        instance._metrics_previous = sender.objects.filter(pk=instance.pk).values(*METRIC_FIELDS[sender]).first()
+
+def _with_previous(instance, current):
+    previous = getattr(instance, "_metrics_previous", None)
+    return [current] + ([tuple(previous.values())] if previous else [])
+
+@receiver(post_save, sender=Attendance)
+@receiver(post_delete, sender=Attendance)
+def update_attendance_metrics(sender, instance, **kwargs):
+    pairs = _with_previous(instance, (instance.employee_id, instance.date))
+    metrics.mark_employee_months((pk, metrics.month_key(day)) for pk, day in pairs)
+
+@receiver(post_save, sender=Salary)
+@receiver(post_delete, sender=Salary)
+def update_salary_metrics(sender, instance, **kwargs):
+    metrics.mark_employee_months(_with_previous(instance, (instance.employee_id, instance.month)))
+
+@receiver(post_save, sender=Leave)
+@receiver(post_delete, sender=Leave)
+def update_leave_metrics(sender, instance, **kwargs):
+    previous = _with_previous(instance, (instance.employee_id, instance.start_date, instance.end_date))
+    metrics.mark_employee_summaries(pk for pk, _, _ in previous)
+    # Saves outside employees.leaves (new applications, admin edits) rebuild the balances they touch
+    leaves.recount_balances(
+        ((pk, year) for pk, start, end in previous for year in leaves.days_by_year(start, end)),
+        create=kwargs["signal"] is post_save,
+    )
+
+@receiver(post_save, sender=EmployeeProfile)
+def update_profile_metrics(sender, instance, created, **kwargs):
+    if created:
+        metrics.mark_employee_summaries([instance.pk])
+        return
+    previous = getattr(instance, "_metrics_previous", None)
+    if previous and previous["department_id"] != instance.department_id:
+        # History follows the employee, so both departments are recomputed
+        metrics.mark_departments([previous["department_id"], instance.department_id])
+
+@receiver(post_delete, sender=EmployeeProfile)
+def remove_profile_metrics(sender, instance, **kwargs):
+    metrics.mark_departments([instance.department_id])
+
+# Directory search index
+@receiver(post_save, sender=EmployeeProfile)
+def index_profile(sender, instance, **kwargs):
+    search.index_profiles([instance.pk])
+
+@receiver(post_delete, sender=EmployeeProfile)
+def unindex_profile(sender, instance, **kwargs):
+    search.unindex_profiles([instance.pk])
+
+@receiver(post_save, sender=User)
+def reindex_user_profile(sender, instance, created, update_fields=None, **kwargs):
+    # Logins save last_login only; names are what the index cares about
+    if update_fields is not None and not {"first_name", "last_name", "username", "email"} & set(update_fields):
+        return
+    if not created:
+        profiles = EmployeeProfile.objects.filter(user=instance)
+        # The API serves these user fields as part of the employee, so the profile counts as changed
+        profiles.update(updated=timezone.now())
+        changelog.log_rows(profiles)
+        search.index_profiles(profiles.values_list("pk", flat=True))
+
+@receiver(post_save, sender=Department)
+def reindex_department_profiles(sender, instance, created, **kwargs):
+    if not created:
+        search.index_profiles(EmployeeProfile.objects.filter(department=instance).values_list("pk", flat=True))
+
+@receiver(pre_delete, sender=Department)
+def remember_department_profiles(sender, instance, **kwargs):
+    instance._search_profile_pks = list(EmployeeProfile.objects.filter(department=instance).values_list("pk", flat=True))
+
+@receiver(post_delete, sender=Department)
+def reindex_orphaned_profiles(sender, instance, **kwargs):
+    search.index_profiles(getattr(instance, "_search_profile_pks", []))
+
+@receiver(post_save, sender=Notification)
+def count_new_notification(sender, instance, created, **kwargs):
+    if created:
+        if not instance.read:
+            notifications.adjust_unread([instance.user_id], 1)
+    else:
+        # Edits outside employees.notifications (e.g. the admin) may flip read
+        notifications.recount_unread([instance.user_id])
+
+@receiver(post_delete, sender=Notification)
+def count_deleted_notification(sender, instance, **kwargs):
+    if not instance.read:
+        notifications.adjust_unread([instance.user_id], -1)
+
+# Cached department list and directory pages
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+@receiver(post_save, sender=EmployeeProfile)
+@receiver(post_delete, sender=EmployeeProfile)
+def expire_directory_pages(sender, **kwargs):
+    caching.bump_versions(caching.DEPARTMENTS, caching.DIRECTORY)
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def expire_pages_for_user(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not {"first_name", "last_name", "username"} & set(update_fields):
+        return
+    caching.bump_versions(caching.DEPARTMENTS, caching.DIRECTORY)
+
+# Photo pipeline: new uploads are processed off-request once saved
+@receiver(pre_save, sender=EmployeeProfile)
+def drop_thumbnail_without_photo(sender, instance, **kwargs):
+    if not instance.photo:
+        instance.photo_thumbnail = None
+
+@receiver(post_save, sender=EmployeeProfile)
+def process_uploaded_photo(sender, instance, **kwargs):
+    if instance.photo and not photos.is_processed(instance.photo.name):
+        transaction.on_commit(partial(photos.schedule, instance.pk, instance.photo.name))
+
+# Change log for downstream sync; bulk writers log their own rows
+def log_change(sender, instance, **kwargs):
+    changelog.log_saved([instance])
+
+def log_delete(sender, instance, **kwargs):
+    changelog.log_deleted(instance)
+
+for tracked in changelog.TRACKED.values():
+    post_save.connect(log_change, sender=tracked, dispatch_uid=f"changelog_save_{tracked.__name__}")
+    post_delete.connect(log_delete, sender=tracked, dispatch_uid=f"changelog_delete_{tracked.__name__}")
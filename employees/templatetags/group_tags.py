@@ -1,7 +1,9 @@
 from django import template
 
+from employees.roles import user_has_role
+
 register = template.Library()
 
 @register.filter(name="has_group")
 def has_group(user, group_name):
-    return user.groups.filter(name=group_name).exists()
+    return user_has_role(user, group_name)
@@ -5,6 +5,7 @@ urlpatterns = [
     path("", views.login_view, name="home"),
     path("login/", views.login_view, name="login"),
     path("logout/", views.logout_view, name="logout"),
+    path("invite/<uidb64>/<token>/", views.accept_invite, name="accept_invite"),
     path("no-permission/", views.no_permission, name="no_permission"),
 
     path("admin/dashboard/", views.admin_dashboard, name="admin_dashboard"),
@@ -13,6 +14,8 @@ urlpatterns = [
     path("admin/departments/<int:pk>/edit/", views.department_update, name="department_update"),
     path("admin/departments/<int:pk>/delete/", views.department_delete, name="department_delete"),
 
+    path("admin/metrics/", views.request_metrics, name="request_metrics"),
+
     path("admin/managers/", views.manager_list, name="manager_list"),
     path("admin/managers/create/", views.manager_create, name="manager_create"),
 
@@ -21,23 +24,40 @@ urlpatterns = [
     path("employee/profile/edit/", views.employee_profile_edit, name="employee_profile_edit"),
 
     path("employees/", views.employee_list, name="employee_list"),
+    path("employees/lookup/", views.employee_lookup, name="employee_lookup"),
+    path("employees/import/", views.employee_import, name="employee_import"),
     path("employees/create/", views.employee_create, name="employee_create"),
     path("employees/<int:pk>/update/", views.employee_update, name="employee_update"),
     path("employees/<int:pk>/delete/", views.employee_delete, name="employee_delete"),
 
     path("manager/employees/create/", views.manager_employee_create, name="manager_employee_create"),
     path("manager/attendance/<int:emp_id>/", views.mark_attendance, name="mark_attendance"),
+    path("manager/attendance/bulk/", views.bulk_attendance, name="bulk_attendance"),
+    path("api/attendance/bulk/", views.bulk_attendance_api, name="bulk_attendance_api"),
     path("manager/salary/<int:emp_id>/", views.process_salary, name="process_salary"),
     path("manager/leave/<int:leave_id>/", views.approve_leave, name="approve_leave"),
+    path("manager/leaves/", views.leave_queue, name="leave_queue"),
+    path("api/leaves/decide/", views.leave_decisions_api, name="leave_decisions_api"),
 
     path("employee/apply-leave/", views.apply_leave, name="apply_leave"),
 
     path("export/attendance/csv/", views.export_attendance_csv, name="export_attendance_csv"),
     path("export/salary/excel/", views.export_salary_excel, name="export_salary_excel"),
     path("export/salary/pdf/", views.export_salary_pdf, name="export_salary_pdf"),
+    path("export/jobs/", views.export_jobs, name="export_jobs"),
+    path("export/jobs/<int:job_id>/", views.export_job_status, name="export_job_status"),
+    path("export/jobs/<int:job_id>/download/", views.export_job_download, name="export_job_download"),
+
+    path("reports/attendance-matrix/", views.attendance_matrix, name="attendance_matrix"),
 
     path("calendar/events/", views.attendance_events, name="attendance_events"),
 
     path("notifications/", views.notifications_list, name="notifications"),
+    path("notifications/announce/", views.send_announcement, name="send_announcement"),
+    path("notifications/read-all/", views.mark_all_notifications_read, name="mark_all_notifications_read"),
     path("notifications/read/<int:nid>/", views.mark_notification_read, name="mark_notification_read"),
+
+    path("api/v1/changes/", views.api_changes, name="api_changes"),
+    path("api/v1/<str:resource>/", views.api_collection, name="api_collection"),
+    path("api/v1/<str:resource>/<int:pk>/", views.api_item, name="api_item"),
 ]
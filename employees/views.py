@@ -1,17 +1,26 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.functional import SimpleLazyObject
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import condition, require_POST
+from django.views.static import serve
+from django.conf import settings
 from django.contrib.auth import authenticate, login, logout
+from django.contrib.auth.forms import SetPasswordForm
+from django.contrib.auth.tokens import default_token_generator
+from django.utils.http import url_has_allowed_host_and_scheme, urlsafe_base64_decode
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.core.exceptions import ValidationError
 from django.contrib.auth.models import User, Group
-from django.http import HttpResponse, JsonResponse
-from django.db.models import Count, Avg
-import csv
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+from django.db.models import Count, Sum
 import io
-from openpyxl import Workbook
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
+import json
 
-from .models import EmployeeProfile, Department, Attendance, Leave, Salary, Notification
+from .models import EmployeeProfile, Department, Attendance, Salary, Notification, ExportJob
 from .forms import (
     UserCreateForm,
     EmployeeProfileForm,
@@ -21,8 +30,37 @@ from .forms import (
     SalaryForm,
     LeaveForm,
     DepartmentForm,
+    AttendanceExportFilterForm,
+    SalaryExportFilterForm,
+    BulkAttendanceDateForm,
+    BulkAttendanceFormSet,
+    EmployeeImportForm,
+    AnnouncementForm,
+    AttendanceMatrixForm,
 )
-from .decorators import admin_required, manager_required, employee_required
+from .decorators import admin_required, manager_required, employee_required, staff_required
+from .roles import get_user_roles
+from . import api
+from .metrics import department_summaries
+from . import caching, dashboards
+from .caching import get_version
+from .pagination import keyset_page
+from .search import filter_profiles, lookup
+from .calendar_feed import detail_events, feed_validators, summary_events
+from .attendance import allowed_employee_pks, upsert_attendance
+from .exports import (
+    attendance_csv_stream,
+    filter_attendance,
+    filter_salary,
+    salary_workbook_file,
+    write_salary_pdf,
+)
+from .onboarding import import_employees
+from .notifications import LIST_ORDER, mark_all_read, mark_read, notify
+from .matrix import AttendanceMatrix
+from .leaves import DECISIONS, QUEUE_ORDER, apply_for_leave, decide_leaves, get_balances, pending_leaves_for
+from .jobs import EXPORT_FILTER_FORMS, enqueue_export, normalize_params
+from . import instrumentation
 
 def login_view(request):
     if request.method == "POST":
@@ -31,11 +69,12 @@ def login_view(request):
         user = authenticate(request, username=uname, password=pwd)
         if user:
             login(request, user)
-            if user.is_superuser or user.groups.filter(name="Admin").exists():
+            roles = get_user_roles(user)
+            if user.is_superuser or "Admin" in roles:
                 return redirect("admin_dashboard")
-            if user.groups.filter(name="Manager").exists():
+            if "Manager" in roles:
                 return redirect("manager_dashboard")
-            if user.groups.filter(name="Employee").exists():
+            if "Employee" in roles:
                 return redirect("employee_dashboard")
             return redirect("no_permission")
         messages.error(request, "Invalid username or password")
@@ -45,16 +84,34 @@ def logout_view(request):
     logout(request)
     return redirect("login")
 
+def accept_invite(request, uidb64, token):
+    try:
+        user = User.objects.get(pk=urlsafe_base64_decode(uidb64).decode())
+    except (ValueError, User.DoesNotExist):
+        user = None
+    if user is None or not default_token_generator.check_token(user, token):
+        messages.error(request, "This invite link is invalid or has expired.")
+        return redirect("login")
+    form = SetPasswordForm(user, request.POST or None)
+    if request.method == "POST" and form.is_valid():
+        form.save()
+        messages.success(request, "Password set. You can now log in.")
+        return redirect("login")
+    return render(request, "employees/accept_invite.html", {"form": form, "invited": user})
+
 def no_permission(request):
     return render(request, "employees/no_permission.html")
 
 @login_required
 @admin_required
 def admin_dashboard(request):
-    departments = Department.objects.all().annotate(emp_count=Count("employeeprofile"))
+    departments = list(Department.objects.all())
+    summaries = department_summaries(departments)
+    for d in departments:
+        d.emp_count = summaries[d.pk].headcount
     emp_total = EmployeeProfile.objects.count()
-    leave_pending = Leave.objects.filter(status="Pending").count()
-    recent_notifs = Notification.objects.filter(user=request.user).order_by("-created")[:5]
+    leave_pending = sum(summary.pending_leaves for summary in summaries.values())
+    recent_notifs = dashboards.recent_notifications(request.user)
     return render(request, "employees/admin_dashboard.html", {
         "departments": departments,
         "emp_total": emp_total,
@@ -62,14 +119,30 @@ def admin_dashboard(request):
         "recent_notifs": recent_notifs,
     })
 
+@login_required
+@admin_required
+def request_metrics(request):
+    data = instrumentation.summary()
+    if request.GET.get("format") == "prometheus":
+        return HttpResponse(instrumentation.prometheus_text(data), content_type="text/plain; version=0.0.4")
+    return JsonResponse(data)
+
 @login_required
 @manager_required
 def manager_dashboard(request):
     dept = getattr(request.user, "managed_department", None)
-    employees = EmployeeProfile.objects.filter(department=dept) if dept else EmployeeProfile.objects.none()
-    attendance_count = Attendance.objects.filter(employee__department=dept).count() if dept else 0
-    avg_salary = Salary.objects.filter(employee__department=dept).aggregate(Avg("total_salary"))["total_salary__avg"] or 0
-    leaves = Leave.objects.filter(employee__department=dept).order_by("-applied_on")[:10] if dept else []
+    employees = dashboards.department_employees(dept) if dept else EmployeeProfile.objects.none()
+    attendance_count, avg_salary = 0, 0
+    if dept:
+        department_summaries([dept])
+        totals = dashboards.department_monthly_metrics(dept).aggregate(
+            present=Sum("present"), absent=Sum("absent"), on_leave=Sum("on_leave"),
+            payroll_total=Sum("payroll_total"), payroll_count=Sum("payroll_count"),
+        )
+        attendance_count = (totals["present"] or 0) + (totals["absent"] or 0) + (totals["on_leave"] or 0)
+        if totals["payroll_count"]:
+            avg_salary = totals["payroll_total"] / totals["payroll_count"]
+    leaves = dashboards.department_recent_leaves(dept) if dept else []
     return render(request, "employees/manager_dashboard.html", {
         "department": dept,
         "employees": employees,
@@ -81,15 +154,17 @@ def manager_dashboard(request):
 @login_required
 @employee_required
 def employee_dashboard(request):
-    profile = get_object_or_404(EmployeeProfile, user=request.user)
-    attendance = Attendance.objects.filter(employee=profile).order_by("-date")[:30]
-    salary = Salary.objects.filter(employee=profile).order_by("-month")[:12]
-    leaves = Leave.objects.filter(employee=profile).order_by("-applied_on")[:10]
+    profile = get_object_or_404(EmployeeProfile.objects.select_related("user", "department__manager"), user=request.user)
+    attendance = dashboards.employee_recent_attendance(profile)
+    salary = dashboards.employee_recent_salary(profile)
+    leaves = dashboards.employee_recent_leaves(profile)
+    year = timezone.localdate().year
     return render(request, "employees/employee_dashboard.html", {
         "profile": profile,
         "attendance": attendance,
         "salary": salary,
         "leaves": leaves,
+        "leave_balance": get_balances([(profile.pk, year)])[profile.pk, year],
     })
 
 @login_required
@@ -107,11 +182,31 @@ def employee_profile_edit(request):
     return render(request, "employees/employee_profile_edit.html", {"form": form, "profile": profile})
 
 # Admin employee management
+EMPLOYEE_PAGE_SIZE = 50
+
 @login_required
 @admin_required
 def employee_list(request):
-    employees = EmployeeProfile.objects.select_related("user", "department").all()
-    return render(request, "employees/employee_list.html", {"employees": employees})
+    query = request.GET.get("q", "").strip()
+    employees = filter_profiles(EmployeeProfile.objects.select_related("user", "department"), query)
+    # Only queried when the cached page is missing or stale
+    page = SimpleLazyObject(lambda: keyset_page(
+        employees,
+        ["employee_id", "id"],
+        after=request.GET.get("after"),
+        before=request.GET.get("before"),
+        size=EMPLOYEE_PAGE_SIZE,
+    ))
+    return render(request, "employees/employee_list.html", {
+        "page": page,
+        "query": query,
+        "cache_version": get_version(caching.DIRECTORY),
+    })
+
+@login_required
+@staff_required
+def employee_lookup(request):
+    return JsonResponse({"results": lookup(request.GET.get("q", ""))})
 
 @login_required
 @admin_required
@@ -133,6 +228,26 @@ def employee_create(request):
         prof_form = EmployeeProfileForm()
     return render(request, "employees/employee_create.html", {"user_form": user_form, "profile_form": prof_form})
 
+@login_required
+@admin_required
+def employee_import(request):
+    form = EmployeeImportForm(request.POST or None, request.FILES or None)
+    result = None
+    if request.method == "POST" and form.is_valid():
+        upload = form.cleaned_data["file"]
+        try:
+            result = import_employees(upload.file, upload.name, base_url=request.build_absolute_uri("/"))
+        except ValueError as exc:
+            form.add_error("file", str(exc))
+        else:
+            if form.cleaned_data["report"]:
+                response = HttpResponse(content_type="text/csv")
+                response["Content-Disposition"] = 'attachment; filename="employee_import_report.csv"'
+                result.write_report(response)
+                return response
+            messages.success(request, f"Imported {result.created} employees; {result.failed} rows rejected.")
+    return render(request, "employees/employee_import.html", {"form": form, "result": result})
+
 @login_required
 @admin_required
 def employee_update(request, pk):
@@ -164,8 +279,14 @@ def employee_delete(request, pk):
 @login_required
 @admin_required
 def department_list(request):
-    departments = Department.objects.all().annotate(emp_count=Count("employeeprofile"))
-    return render(request, "employees/department_list.html", {"departments": departments})
+    # Only queried when the cached table is missing or stale
+    departments = SimpleLazyObject(
+        lambda: list(Department.objects.select_related("manager").annotate(emp_count=Count("employeeprofile")).order_by("name"))
+    )
+    return render(request, "employees/department_list.html", {
+        "departments": departments,
+        "cache_version": get_version(caching.DEPARTMENTS),
+    })
 
 @login_required
 @admin_required
@@ -285,20 +406,130 @@ def process_salary(request, emp_id):
         form = SalaryForm(initial={"employee": profile})
     return render(request, "employees/process_salary.html", {"form": form, "profile": profile})
 
+LEAVE_QUEUE_PAGE_SIZE = 100
+
+def _decide(request, ids):
+    status = DECISIONS.get(request.POST.get("action"))
+    if status is None:
+        return None, []
+    # Permission is checked for the whole batch in the same query that picks the leaves
+    allowed = list(pending_leaves_for(request.user).filter(pk__in=ids).values_list("pk", flat=True))
+    return status, decide_leaves(allowed, status)
+
 @login_required
 @manager_required
+@require_POST
 def approve_leave(request, leave_id):
-    leave = get_object_or_404(Leave, pk=leave_id)
-    if request.user.managed_department != leave.employee.department and not request.user.is_superuser:
-        messages.error(request, "You are not allowed to modify this leave.")
-        return redirect("manager_dashboard")
-    action = request.GET.get("action")
-    if action in ["Approve", "Reject"]:
-        leave.status = "Approved" if action == "Approve" else "Rejected"
-        leave.save()
-        messages.success(request, f"Leave {leave.status}.")
+    status, decided = _decide(request, [leave_id])
+    if decided:
+        messages.success(request, f"Leave {status}.")
+    else:
+        messages.error(request, "This leave is no longer pending or is not in your department.")
+    # Only follow "next" back into this site
+    next_url = request.POST.get("next")
+    if next_url and url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()}, require_https=request.is_secure()):
+        return redirect(next_url)
     return redirect("manager_dashboard")
 
+@login_required
+@manager_required
+def leave_queue(request):
+    if request.method == "POST":
+        ids = [int(pk) for pk in request.POST.getlist("leaves") if pk.isdigit()]
+        status, decided = _decide(request, ids)
+        if status:
+            messages.success(request, f"{len(decided)} leaves {status.lower()}; {len(ids) - len(decided)} skipped.")
+        return redirect(request.get_full_path())
+    page = keyset_page(
+        pending_leaves_for(request.user).select_related("employee__user", "employee__department"),
+        QUEUE_ORDER,
+        after=request.GET.get("after"),
+        before=request.GET.get("before"),
+        size=LEAVE_QUEUE_PAGE_SIZE,
+    )
+    return render(request, "employees/leave_queue.html", {"leaves": page, "page": page})
+
+@login_required
+@manager_required
+@require_POST
+def leave_decisions_api(request):
+    try:
+        payload = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({"error": "Invalid JSON"}, status=400)
+    if not isinstance(payload, dict) or payload.get("action") not in DECISIONS:
+        return JsonResponse({"error": "Expected {\"action\": \"Approve\" or \"Reject\", \"ids\": [...]}"}, status=400)
+    ids = payload.get("ids")
+    # type() rather than isinstance(): JSON true/false would otherwise pass as ids 1 and 0
+    if not isinstance(ids, list) or not all(type(pk) is int for pk in ids):
+        return JsonResponse({"error": "ids must be a list of leave ids"}, status=400)
+    if len(ids) > settings.API_MAX_BATCH:
+        return JsonResponse({"error": f"At most {settings.API_MAX_BATCH} leaves per request"}, status=400)
+    status = DECISIONS[payload["action"]]
+    allowed = list(pending_leaves_for(request.user).filter(pk__in=ids).values_list("pk", flat=True))
+    decided = [leave.pk for leave in decide_leaves(allowed, status)]
+    return JsonResponse({"status": status, "decided": decided, "skipped": sorted(set(ids) - set(decided))})
+
+@login_required
+@manager_required
+def bulk_attendance(request):
+    dept = getattr(request.user, "managed_department", None)
+    if not dept:
+        messages.error(request, "You are not assigned to any department.")
+        return redirect("manager_dashboard")
+    date_form = BulkAttendanceDateForm(request.POST or request.GET or {"date": timezone.localdate()})
+    day = date_form.cleaned_data["date"] if date_form.is_valid() else timezone.localdate()
+    employees = {e.pk: e for e in EmployeeProfile.objects.filter(department=dept).select_related("user").order_by("employee_id")}
+    if request.method == "POST":
+        formset = BulkAttendanceFormSet(request.POST)
+        if formset.is_valid() and date_form.is_valid():
+            rows = [f.cleaned_data for f in formset]
+            allowed = allowed_employee_pks(request.user, [row["employee"] for row in rows])
+            saved = upsert_attendance(
+                (row["employee"], day, row["status"], row["note"]) for row in rows if row["employee"] in allowed
+            )
+            messages.success(request, f"Attendance for {day} saved for {saved} employees.")
+            return redirect("manager_dashboard")
+    else:
+        existing = {
+            pk: (status, note)
+            for pk, status, note in dashboards.department_day_attendance(dept, day)
+            .values_list("employee_id", "status", "note")
+        }
+        formset = BulkAttendanceFormSet(initial=[
+            {"employee": pk, "status": existing.get(pk, ("Present", ""))[0], "note": existing.get(pk, ("", ""))[1]}
+            for pk in employees
+        ])
+    # Posted rows are matched through cleaned_data, so a tampered employee value shows as a form error
+    rows = [
+        (employees.get(form.cleaned_data.get("employee") if formset.is_bound else form.initial["employee"]), form)
+        for form in formset
+    ]
+    return render(request, "employees/bulk_attendance.html", {
+        "department": dept,
+        "date_form": date_form,
+        "day": day,
+        "formset": formset,
+        "rows": rows,
+    })
+
+# JSON API: token or session auth (sessions are CSRF-checked inside api.authenticate)
+@csrf_exempt
+def bulk_attendance_api(request):
+    return api.bulk_attendance(request)
+
+@csrf_exempt
+def api_collection(request, resource):
+    return api.dispatch(request, resource)
+
+@csrf_exempt
+def api_item(request, resource, pk):
+    return api.dispatch(request, resource, pk)
+
+@csrf_exempt
+def api_changes(request):
+    return api.change_feed(request)
+
 # Employee: apply leave
 @login_required
 @employee_required
@@ -307,104 +538,195 @@ def apply_leave(request):
     if request.method == "POST":
         form = LeaveForm(request.POST)
         if form.is_valid():
-            leave = form.save(commit=False)
-            leave.employee = profile
-            leave.save()
-            messages.success(request, "Leave applied.")
-            return redirect("employee_dashboard")
+            try:
+                apply_for_leave(profile, form.cleaned_data["start_date"], form.cleaned_data["end_date"], form.cleaned_data["reason"])
+            except ValidationError as exc:
+                form.add_error(None, exc)
+            else:
+                messages.success(request, "Leave applied.")
+                return redirect("employee_dashboard")
     else:
         form = LeaveForm()
-    return render(request, "employees/apply_leave.html", {"form": form})
+    year = timezone.localdate().year
+    balance = get_balances([(profile.pk, year)])[profile.pk, year]
+    return render(request, "employees/apply_leave.html", {"form": form, "balance": balance})
 
 # Exports
 @login_required
 def export_attendance_csv(request):
-    qs = Attendance.objects.select_related("employee__user")
-    response = HttpResponse(content_type="text/csv")
+    form = AttendanceExportFilterForm(request.GET)
+    if not form.is_valid():
+        return HttpResponseBadRequest(form.errors.as_text())
+    qs = filter_attendance(Attendance.objects.all(), **form.cleaned_data)
+    response = StreamingHttpResponse(attendance_csv_stream(qs), content_type="text/csv")
     response["Content-Disposition"] = "attachment; filename=attendance.csv"
-    writer = csv.writer(response)
-    writer.writerow(["EMP ID", "Name", "Date", "Status", "Note"])
-    for a in qs:
-        writer.writerow([a.employee.employee_id, a.employee.user.get_full_name(), a.date, a.status, a.note])
     return response
 
+@login_required
+@staff_required
+def attendance_matrix(request):
+    form = AttendanceMatrixForm(request.GET or {"month": timezone.localdate().strftime("%Y-%m")})
+    is_admin = request.user.is_superuser or "Admin" in get_user_roles(request.user)
+    department = None if is_admin else getattr(request.user, "managed_department", None)
+    matrix = None
+    if form.is_valid():
+        department = form.cleaned_data["department"] if is_admin else department
+        if department:
+            matrix = AttendanceMatrix(department, form.cleaned_data["month"])
+    export = request.GET.get("format")
+    if matrix and export == "csv":
+        response = HttpResponse(content_type="text/csv")
+        response["Content-Disposition"] = f'attachment; filename="attendance_{matrix.month}.csv"'
+        matrix.write_csv(response)
+        return response
+    if matrix and export == "xlsx":
+        return FileResponse(
+            matrix.workbook_file(),
+            as_attachment=True,
+            filename=f"attendance_{matrix.month}.xlsx",
+            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
+    return render(request, "employees/attendance_matrix.html", {
+        "form": form,
+        "is_admin": is_admin,
+        "department": department,
+        "matrix": matrix,
+    })
+
 @login_required
 def export_salary_excel(request):
-    qs = Salary.objects.select_related("employee__user")
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Salary"
-    ws.append(["EMP ID", "Name", "Month", "Base", "Bonus", "Deductions", "Total"])
-    for s in qs:
-        ws.append([
-            s.employee.employee_id,
-            s.employee.user.get_full_name(),
-            s.month,
-            float(s.base_salary),
-            float(s.bonus),
-            float(s.deductions),
-            float(s.total_salary),
-        ])
-    buffer = io.BytesIO()
-    wb.save(buffer)
-    buffer.seek(0)
-    response = HttpResponse(
-        buffer.getvalue(),
+    form = SalaryExportFilterForm(request.GET)
+    if not form.is_valid():
+        return HttpResponseBadRequest(form.errors.as_text())
+    filters = form.cleaned_data
+    qs = filter_salary(Salary.objects.all(), month=filters["month"], department=filters["department"])
+    return FileResponse(
+        salary_workbook_file(qs, per_month=filters["per_month"]),
+        as_attachment=True,
+        filename="salary.xlsx",
         content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
     )
-    response["Content-Disposition"] = 'attachment; filename="salary.xlsx"'
-    return response
 
 @login_required
 def export_salary_pdf(request):
-    qs = Salary.objects.select_related("employee__user")
     buffer = io.BytesIO()
-    p = canvas.Canvas(buffer, pagesize=letter)
-    y = 750
-    p.setFont("Helvetica-Bold", 14)
-    p.drawString(200, y, "Salary Report")
-    y -= 40
-    p.setFont("Helvetica", 10)
-    p.drawString(30, y, "EMP ID")
-    p.drawString(100, y, "Name")
-    p.drawString(260, y, "Month")
-    p.drawString(330, y, "Total")
-    y -= 20
-    for s in qs:
-        p.drawString(30, y, str(s.employee.employee_id))
-        p.drawString(100, y, s.employee.user.get_full_name())
-        p.drawString(260, y, s.month)
-        p.drawString(330, y, str(s.total_salary))
-        y -= 18
-        if y < 50:
-            p.showPage()
-            y = 750
-    p.save()
+    write_salary_pdf(Salary.objects.all(), buffer)
     buffer.seek(0)
     return HttpResponse(buffer, content_type="application/pdf")
 
+# Background exports
+@login_required
+@admin_required
+def export_jobs(request):
+    if request.method == "POST":
+        kind = request.POST.get("kind")
+        if kind not in EXPORT_FILTER_FORMS:
+            return HttpResponseBadRequest("Unknown export kind")
+        form = EXPORT_FILTER_FORMS[kind](request.POST)
+        if form.is_valid():
+            job, created = enqueue_export(kind, normalize_params(form.cleaned_data), request.user)
+            if created:
+                messages.success(request, f"Export #{job.pk} queued.")
+            else:
+                messages.success(request, f"An identical export (#{job.pk}) is already in progress.")
+        else:
+            messages.error(request, "Invalid export filters.")
+        return redirect("export_jobs")
+    jobs = ExportJob.objects.select_related("requested_by")[:25]
+    return render(request, "employees/export_jobs.html", {
+        "jobs": jobs,
+        "attendance_form": AttendanceExportFilterForm(),
+        "salary_form": SalaryExportFilterForm(),
+    })
+
+@login_required
+@admin_required
+def export_job_status(request, job_id):
+    job = get_object_or_404(ExportJob, pk=job_id)
+    return JsonResponse({
+        "id": job.pk,
+        "kind": job.kind,
+        "status": job.status,
+        "progress": job.progress,
+        "error": job.error,
+        "download_url": reverse("export_job_download", args=[job.pk]) if job.status == "Done" else None,
+    })
+
+@login_required
+@admin_required
+def export_job_download(request, job_id):
+    job = get_object_or_404(ExportJob, pk=job_id, status="Done")
+    if not job.file or not job.file.storage.exists(job.file.name):
+        raise Http404("The export file is no longer available.")
+    return FileResponse(job.file.open("rb"), as_attachment=True, filename=job.file.name.rsplit("/", 1)[-1])
+
 # FullCalendar attendance events
+def _calendar_etag(request):
+    return feed_validators(request)[3]
+
+def _calendar_last_modified(request):
+    return feed_validators(request)[4]
+
 @login_required
+@condition(etag_func=_calendar_etag, last_modified_func=_calendar_last_modified)
 def attendance_events(request):
-    qs = Attendance.objects.select_related("employee__user")[:1000]
-    events = []
-    for a in qs:
-        events.append({
-            "title": f"{a.employee.employee_id} - {a.status}",
-            "start": str(a.date),
-            "allDay": True,
-        })
-    return JsonResponse(events, safe=False)
+    scope, start, end, _, _ = feed_validators(request)
+    if request.GET.get("mode") == "summary" and scope.kind in ("all", "department"):
+        events = summary_events(scope, start, end)
+    else:
+        events = detail_events(scope, start, end)
+    response = JsonResponse(events, safe=False)
+    # Let the browser keep the feed but revalidate it with If-None-Match each time
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
 
 # Notifications
+NOTIFICATION_PAGE_SIZE = 50
+
 @login_required
 def notifications_list(request):
-    notifs = Notification.objects.filter(user=request.user).order_by("-created")[:50]
-    return render(request, "employees/notifications.html", {"notifications": notifs})
+    page = keyset_page(
+        Notification.objects.filter(user=request.user),
+        LIST_ORDER,
+        after=request.GET.get("after"),
+        before=request.GET.get("before"),
+        size=NOTIFICATION_PAGE_SIZE,
+    )
+    return render(request, "employees/notifications.html", {"notifications": page, "page": page})
 
 @login_required
 def mark_notification_read(request, nid):
-    notif = get_object_or_404(Notification, pk=nid, user=request.user)
-    notif.read = True
-    notif.save()
+    mark_read(request.user, nid)
+    return redirect("notifications")
+
+@login_required
+@admin_required
+def send_announcement(request):
+    form = AnnouncementForm(request.POST or None)
+    if request.method == "POST" and form.is_valid():
+        data = form.cleaned_data
+        result = notify(
+            data["title"],
+            data["message"],
+            department=data["department"],
+            group=data["group"],
+            everyone=not (data["department"] or data["group"]),
+            email=data["email"],
+        )
+        messages.success(request, f"Announcement sent to {result.recipients} users.")
+        return redirect("notifications")
+    return render(request, "employees/announcement.html", {"form": form})
+
+@login_required
+@require_POST
+def mark_all_notifications_read(request):
+    count = mark_all_read(request.user)
+    messages.success(request, f"Marked {count} notifications as read.")
     return redirect("notifications")
+
+# Development server only (see employee_mgmt/urls.py): processed photos are
+# named after their content, so browsers may keep them for a year
+def serve_photo(request, path):
+    response = serve(request, path, document_root=settings.MEDIA_ROOT)
+    patch_cache_control(response, public=True, max_age=365 * 24 * 3600, immutable=True)
+    return response